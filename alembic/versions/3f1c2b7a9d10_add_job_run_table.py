@@ -0,0 +1,30 @@
+"""add job_run table
+Revision ID: 3f1c2b7a9d10
+Revises: d5090582a336
+Create Date: 2024-09-20 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2b7a9d10'
+down_revision = 'd5090582a336'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_run',
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('next_run_at', sa.DateTime(), nullable=True),
+        sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('job_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_run')
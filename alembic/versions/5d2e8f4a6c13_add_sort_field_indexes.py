@@ -0,0 +1,44 @@
+"""add sort field indexes
+Revision ID: 5d2e8f4a6c13
+Revises: c7a91e3d5b24
+Create Date: 2024-09-25 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8f4a6c13'
+down_revision = 'c7a91e3d5b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_user_last_name'), 'user', ['last_name'], unique=False)
+    op.create_index(op.f('ix_user_created_at'), 'user', ['created_at'], unique=False)
+    op.create_index(
+        op.f('ix_property_property_value'), 'property', ['property_value'], unique=False
+    )
+    op.create_index(
+        op.f('ix_property_created_at'), 'property', ['created_at'], unique=False
+    )
+    op.create_index(op.f('ix_lease_start_date'), 'lease', ['start_date'], unique=False)
+    op.create_index(op.f('ix_lease_end_date'), 'lease', ['end_date'], unique=False)
+    op.create_index(
+        op.f('ix_payment_created_at'), 'payment', ['created_at'], unique=False
+    )
+    op.create_index(
+        op.f('ix_payment_payment_date'), 'payment', ['payment_date'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payment_payment_date'), table_name='payment')
+    op.drop_index(op.f('ix_payment_created_at'), table_name='payment')
+    op.drop_index(op.f('ix_lease_end_date'), table_name='lease')
+    op.drop_index(op.f('ix_lease_start_date'), table_name='lease')
+    op.drop_index(op.f('ix_property_created_at'), table_name='property')
+    op.drop_index(op.f('ix_property_property_value'), table_name='property')
+    op.drop_index(op.f('ix_user_created_at'), table_name='user')
+    op.drop_index(op.f('ix_user_last_name'), table_name='user')
@@ -0,0 +1,41 @@
+"""add lease scheduler indexes
+Revision ID: 8b4e6d2f1a57
+Revises: 3f1c2b7a9d10
+Create Date: 2024-09-21 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2f1a57'
+down_revision = '3f1c2b7a9d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_lease_expired_next_payment_date',
+        'lease',
+        ['lease_expired', 'next_payment_date'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_lease_expired_lease_expiration_date',
+        'lease',
+        ['lease_expired', 'lease_expiration_date'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_lease_expired_start_date',
+        'lease',
+        ['lease_expired', 'start_date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lease_expired_start_date', table_name='lease')
+    op.drop_index('ix_lease_expired_lease_expiration_date', table_name='lease')
+    op.drop_index('ix_lease_expired_next_payment_date', table_name='lease')
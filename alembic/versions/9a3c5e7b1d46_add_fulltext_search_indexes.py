@@ -0,0 +1,36 @@
+"""add fulltext search indexes
+Revision ID: 9a3c5e7b1d46
+Revises: 5d2e8f4a6c13
+Create Date: 2024-09-26 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3c5e7b1d46'
+down_revision = '5d2e8f4a6c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_property_description_fulltext',
+        'property',
+        ['short_description', 'description'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+    )
+    op.create_index(
+        'ix_address_city_country_fulltext',
+        'address',
+        ['city', 'country'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_address_city_country_fulltext', table_name='address')
+    op.drop_index('ix_property_description_fulltext', table_name='property')
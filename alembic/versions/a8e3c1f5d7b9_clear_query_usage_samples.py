@@ -0,0 +1,26 @@
+"""clear query usage samples
+Revision ID: a8e3c1f5d7b9
+Revises: f2d4b6a8c0e1
+Create Date: 2024-10-22 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e3c1f5d7b9'
+down_revision = 'f2d4b6a8c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # the samples recorded before kept the bound values of the users,
+    # they are recorded again with the typed placeholders
+    op.execute(
+        "UPDATE query_usage SET sample_statement = NULL, sample_parameters = NULL"
+    )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,50 @@
+"""add property occupancy
+Revision ID: b2d8f6a4c1e9
+Revises: e4b7a2c9f815
+Create Date: 2024-10-02 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d8f6a4c1e9'
+down_revision = 'e4b7a2c9f815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'property_occupancy',
+        sa.Column('lease_id', sa.String(length=50), nullable=False),
+        sa.Column('property_id', sa.String(length=50), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['lease_id'], ['lease.id'], onupdate='cascade', ondelete='cascade'
+        ),
+        sa.ForeignKeyConstraint(
+            ['property_id'], ['property.id'], onupdate='cascade', ondelete='cascade'
+        ),
+        sa.PrimaryKeyConstraint('lease_id'),
+    )
+    op.create_index(
+        'ix_property_occupancy_property_id_start_date_end_date',
+        'property_occupancy',
+        ['property_id', 'start_date', 'end_date'],
+        unique=False,
+    )
+    op.execute(
+        'INSERT INTO property_occupancy (lease_id, property_id, start_date, end_date) '
+        'SELECT id, property_id, start_date, lease_expiration_date FROM lease '
+        'WHERE lease_expired = false AND property_id IS NOT NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_property_occupancy_property_id_start_date_end_date',
+        table_name='property_occupancy',
+    )
+    op.drop_table('property_occupancy')
@@ -0,0 +1,25 @@
+"""add payment checkout failed
+Revision ID: b6d2f8a4c0e3
+Revises: a8e3c1f5d7b9
+Create Date: 2024-10-23 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f8a4c0e3'
+down_revision = 'a8e3c1f5d7b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'payment',
+        sa.Column('checkout_failed', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('payment', 'checkout_failed')
@@ -0,0 +1,29 @@
+"""add version columns
+Revision ID: c5e1a9d3f7b2
+Revises: b2d8f6a4c1e9
+Create Date: 2024-10-14 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1a9d3f7b2'
+down_revision = 'b2d8f6a4c1e9'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('lease', 'payment', 'property', 'user')
+
+
+def upgrade() -> None:
+    for table_name in VERSIONED_TABLES:
+        op.add_column(
+            table_name,
+            sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        )
+
+
+def downgrade() -> None:
+    for table_name in reversed(VERSIONED_TABLES):
+        op.drop_column(table_name, 'version')
@@ -0,0 +1,34 @@
+"""add query_usage table
+Revision ID: c7a91e3d5b24
+Revises: 8b4e6d2f1a57
+Create Date: 2024-09-24 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a91e3d5b24'
+down_revision = '8b4e6d2f1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'query_usage',
+        sa.Column('id', sa.String(length=40), nullable=False),
+        sa.Column('model_name', sa.String(length=100), nullable=False),
+        sa.Column('pattern', sa.Text(), nullable=False),
+        sa.Column('calls', sa.Integer(), nullable=False),
+        sa.Column('total_time', sa.Float(), nullable=False),
+        sa.Column('max_time', sa.Float(), nullable=False),
+        sa.Column('sample_statement', sa.Text(), nullable=True),
+        sa.Column('sample_parameters', sa.Text(), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('query_usage')
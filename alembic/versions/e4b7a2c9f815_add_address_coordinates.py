@@ -0,0 +1,32 @@
+"""add address coordinates
+Revision ID: e4b7a2c9f815
+Revises: 9a3c5e7b1d46
+Create Date: 2024-09-30 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7a2c9f815'
+down_revision = '9a3c5e7b1d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('address', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('address', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column(
+        'address', sa.Column('geohash', sa.String(length=12), nullable=True)
+    )
+    op.create_index(
+        op.f('ix_address_geohash'), 'address', ['geohash'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_address_geohash'), table_name='address')
+    op.drop_column('address', 'geohash')
+    op.drop_column('address', 'longitude')
+    op.drop_column('address', 'latitude')
@@ -0,0 +1,25 @@
+"""add payment checkout attempt
+Revision ID: f2d4b6a8c0e1
+Revises: c5e1a9d3f7b2
+Create Date: 2024-10-21 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d4b6a8c0e1'
+down_revision = 'c5e1a9d3f7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'payment',
+        sa.Column('checkout_attempt', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('payment', 'checkout_attempt')
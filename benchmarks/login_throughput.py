@@ -0,0 +1,95 @@
+"""
+login throughput benchmark - bursts of logins are sent to the test app
+and the latency of a cheap endpoint is measured at the same time,
+with --inline the password is verified on the event loop (the old behaviour)
+
+usage: python -m benchmarks.login_throughput [--logins 40] [--concurrency 20] [--inline]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.core.utils.crypt import (
+    get_password_hashing_metrics,
+    passwd_context,
+    verify_user_password,
+)
+
+PASSWORD = "benchmark-password"
+HASHED_PASSWORD = passwd_context.hash(PASSWORD)
+
+
+def create_app(inline: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login() -> dict:
+        if inline:
+            verified = passwd_context.verify(PASSWORD, HASHED_PASSWORD)
+        else:
+            verified = await verify_user_password(PASSWORD, HASHED_PASSWORD)
+        return {"verified": verified}
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ping": "pong"}
+
+    return app
+
+
+async def send_logins(client: AsyncClient, logins: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_login() -> None:
+        async with semaphore:
+            response = await client.post("/login")
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send_login() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+async def measure_ping_latency(client: AsyncClient, stop: asyncio.Event) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/ping")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run(logins: int, concurrency: int, inline: bool) -> None:
+    async with AsyncClient(
+        app=create_app(inline), base_url="http://benchmark"
+    ) as client:
+        stop = asyncio.Event()
+        ping_task = asyncio.create_task(measure_ping_latency(client, stop))
+        duration = await send_logins(client, logins, concurrency)
+        stop.set()
+        latencies = sorted(await ping_task)
+
+    print(f"mode: {'inline' if inline else 'thread pool'}")
+    print(f"logins: {logins} in {duration:.2f} s ({logins / duration:.1f} logins/s)")
+    print(
+        f"ping latency under load: p50={statistics.median(latencies):.1f} ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.1f} ms "
+        f"max={latencies[-1]:.1f} ms ({len(latencies)} requests)"
+    )
+    if not inline:
+        print(f"hashing pool metrics: {get_password_hashing_metrics()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.inline))
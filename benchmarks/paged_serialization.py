@@ -0,0 +1,210 @@
+"""
+paged response serialization benchmark - the rows per second of turning
+a page of ORM instances into the JSON body for every output schema,
+the old path (from_orm per row, the response_model validation and jsonable_encoder
+of FastAPI, JSONResponse) and the row builders with PagedJSONResponse
+
+usage: python -m benchmarks.paged_serialization [--pages 50] [--size 100]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import time
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.apps.addresses.models import Address
+from src.apps.addresses.schemas import AddressBasicOutputSchema, AddressOutputSchema
+from src.apps.companies.models import Company
+from src.apps.companies.schemas import CompanyBasicOutputSchema, CompanyOutputSchema
+from src.apps.leases.enums import BillingPeriodEnum
+from src.apps.leases.models import Lease
+from src.apps.leases.schemas import LeaseBasicOutputSchema, LeaseOutputSchema
+from src.apps.payments.models import Payment
+from src.apps.payments.schemas import PaymentBaseOutputSchema, PaymentOutputSchema
+from src.apps.properties.enums import PropertyStatusEnum, PropertyTypeEnum
+from src.apps.properties.models import Property
+from src.apps.properties.schemas import PropertyBasicOutputSchema, PropertyOutputSchema
+from src.apps.users.models import User
+from src.apps.users.schemas import UserInfoOutputSchema, UserOutputSchema
+from src.core.pagination.responses import PagedJSONResponse
+from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils.serialization import get_row_builder
+from src.settings.alembic import *
+
+START_DATE = datetime.date.today() + datetime.timedelta(days=30)
+
+
+def get_address(number: int) -> Address:
+    return Address(
+        id=f"address-{number}",
+        country="Poland",
+        state="Mazowieckie",
+        city="Warsaw",
+        postal_code="00-001",
+        street="Marszalkowska",
+        house_number=str(number),
+        apartment_number="1",
+        latitude=52.23,
+        longitude=21.01,
+    )
+
+
+def get_company(number: int) -> Company:
+    return Company(
+        id=f"company-{number}",
+        company_name=f"Company {number}",
+        foundation_year=2000,
+        phone_number="123456789",
+        users=[],
+        address=get_address(number),
+    )
+
+
+def get_user(number: int) -> User:
+    return User(
+        id=f"user-{number}",
+        first_name="John",
+        last_name="Smith",
+        email=f"user{number}@mail.com",
+        birth_date=datetime.date(1990, 1, 1),
+        phone_number="123456789",
+        is_active=True,
+        is_superuser=False,
+        is_staff=False,
+        created_at=datetime.datetime(2024, 1, 1, 12),
+        company=None,
+    )
+
+
+def get_property(number: int) -> Property:
+    return Property(
+        id=f"property-{number}",
+        property_type=PropertyTypeEnum.APARTMENT,
+        property_status=PropertyStatusEnum.AVAILABLE,
+        short_description="Apartment in the city center",
+        description="Apartment in the city center with the balcony",
+        property_value=Decimal("350000.00"),
+        square_meter=Decimal("54.50"),
+        rooms_amount=3,
+        year_built=2010,
+        created_at=datetime.datetime(2024, 1, 1, 12),
+        owner=get_user(number),
+        address=get_address(number),
+    )
+
+
+def get_lease(number: int) -> Lease:
+    return Lease(
+        id=f"lease-{number}",
+        start_date=START_DATE,
+        end_date=START_DATE + datetime.timedelta(days=365),
+        rent_amount=Decimal("2500.00"),
+        initial_deposit_amount=Decimal("5000.00"),
+        billing_period=BillingPeriodEnum.MONTHLY,
+        payment_bank_account="PL61109010140000071219812874",
+        next_payment_date=START_DATE + datetime.timedelta(days=30),
+        renewal_accepted=False,
+        lease_expired=False,
+        lease_expiration_date=START_DATE + datetime.timedelta(days=365),
+        owner_id=f"user-{number}",
+        owner=get_user(number),
+        tenant_id=f"tenant-{number}",
+        tenant=get_user(number),
+        property_id=f"property-{number}",
+        property=get_property(number),
+    )
+
+
+def get_payment(number: int) -> Payment:
+    return Payment(
+        id=f"payment-{number}",
+        stripe_charge_id=f"ch_{number}",
+        amount=Decimal("2500.00"),
+        created_at=START_DATE,
+        payment_date=START_DATE,
+        waiting_for_payment=True,
+        payment_accepted=False,
+        payment_checkout_url="https://checkout.stripe.com/pay",
+        tenant=get_user(number),
+        lease=get_lease(number),
+    )
+
+
+OUTPUT_SCHEMAS = [
+    (AddressBasicOutputSchema, get_address),
+    (AddressOutputSchema, get_address),
+    (CompanyBasicOutputSchema, get_company),
+    (CompanyOutputSchema, get_company),
+    (LeaseBasicOutputSchema, get_lease),
+    (LeaseOutputSchema, get_lease),
+    (PaymentBaseOutputSchema, get_payment),
+    (PaymentOutputSchema, get_payment),
+    (PropertyBasicOutputSchema, get_property),
+    (PropertyOutputSchema, get_property),
+    (UserInfoOutputSchema, get_user),
+    (UserOutputSchema, get_user),
+]
+
+
+def get_page(results: list) -> dict:
+    return dict(total=len(results), page=1, size=len(results), has_next_page=False)
+
+
+async def render_validated_page(schema, instances: list, response_field) -> bytes:
+    page = PagedResponseSchema(
+        **get_page(instances),
+        results=[schema.from_orm(instance) for instance in instances],
+    )
+    content = await serialize_response(field=response_field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def render_built_page(schema, instances: list, response_field) -> bytes:
+    build_row = get_row_builder(schema)
+    page = PagedResponseSchema.construct(
+        **get_page(instances), results=[build_row(instance) for instance in instances]
+    )
+    return PagedJSONResponse(page).body
+
+
+async def measure(render_page, schema, instances: list, pages: int) -> float:
+    response_field = create_response_field(
+        name=f"Response_{schema.__name__}", type_=PagedResponseSchema[schema]
+    )
+    await render_page(schema, instances, response_field)
+    start = time.perf_counter()
+    for _ in range(pages):
+        await render_page(schema, instances, response_field)
+    return pages * len(instances) / (time.perf_counter() - start)
+
+
+async def run(pages: int, size: int) -> None:
+    print(f"pages: {pages}, rows per page: {size}")
+    print(f"{'schema':<28}{'validated rows/s':>18}{'built rows/s':>16}{'speedup':>10}")
+    for schema, get_instance in OUTPUT_SCHEMAS:
+        instances = [get_instance(number) for number in range(size)]
+        """
+        the validators of the lease schemas print the dates
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            validated = await measure(render_validated_page, schema, instances, pages)
+            built = await measure(render_built_page, schema, instances, pages)
+        print(
+            f"{schema.__name__:<28}{validated:>18,.0f}{built:>16,.0f}"
+            f"{built / validated:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.pages, args.size))
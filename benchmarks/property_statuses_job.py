@@ -0,0 +1,117 @@
+"""
+property statuses job benchmark - the per-lease job (one SELECT per lease)
+is compared with the single UPDATE statement on the temporary SQLite database
+filled with the leases starting today
+
+usage: python -m benchmarks.property_statuses_job [--leases 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.apps.leases.models import Lease
+from src.apps.leases.services import (
+    manage_property_statuses_for_lease_with_the_start_date_being_today,
+)
+from src.apps.properties.enums import PropertyStatusEnum
+from src.apps.properties.models import Property
+from src.core.utils.orm import if_exists
+from src.core.utils.utils import generate_uuid
+from src.database.db_connection import Base
+from src.settings.alembic import *
+
+
+async def legacy_manage_property_statuses(session: AsyncSession) -> None:
+    statement = select(Lease).filter(
+        Lease.lease_expired == False, Lease.start_date == date.today()
+    )
+    leases_with_the_first_day = (await session.scalars(statement)).unique().all()
+    for lease in leases_with_the_first_day:
+        property = await if_exists(Property, "id", lease.property_id, session)
+        property.property_status = PropertyStatusEnum.RENTED
+        session.add(property)
+    await session.commit()
+
+
+async def populate_database(session: AsyncSession, leases: int) -> None:
+    property_ids = [generate_uuid() for _ in range(leases)]
+    await session.execute(
+        insert(Property),
+        [
+            {
+                "id": property_id,
+                "short_description": "benchmark property",
+                "property_value": Decimal(100000),
+                "square_meter": Decimal(50),
+                "property_status": PropertyStatusEnum.RESERVED,
+            }
+            for property_id in property_ids
+        ],
+    )
+    await session.execute(
+        insert(Lease),
+        [
+            {
+                "start_date": date.today(),
+                "end_date": date.today() + timedelta(days=365),
+                "rent_amount": Decimal(1000),
+                "payment_bank_account": "benchmark account",
+                "property_id": property_id,
+            }
+            for property_id in property_ids
+        ],
+    )
+    await session.commit()
+
+
+async def reset_property_statuses(session: AsyncSession) -> None:
+    await session.execute(
+        update(Property).values(property_status=PropertyStatusEnum.RESERVED)
+    )
+    await session.commit()
+
+
+async def run(leases: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'benchmark.db')}"
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await populate_database(session, leases)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            await legacy_manage_property_statuses(session)
+            legacy_duration = time.perf_counter() - start
+            await reset_property_statuses(session)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            updated_properties = await manage_property_statuses_for_lease_with_the_start_date_being_today(
+                session
+            )
+            duration = time.perf_counter() - start
+
+        await engine.dispose()
+
+    print(f"leases starting today: {leases}")
+    print(f"per-lease job: {legacy_duration:.2f} s")
+    print(f"single UPDATE job: {duration:.2f} s ({updated_properties} properties)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leases", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(run(args.leases))
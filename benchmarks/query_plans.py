@@ -0,0 +1,77 @@
+"""
+filter and sort plan benchmark - the time of building the filtered
+and sorted Select per request, with the compiled plan taken from the cache
+and with the plan compiled from scratch (every request has new params)
+
+usage: python -m benchmarks.query_plans [--requests 5000]
+"""
+
+import argparse
+import time
+
+from sqlalchemy import select
+
+from src.apps.leases.models import Lease
+from src.apps.properties.models import Property
+from src.core.utils.model_registry import build_model_registry
+from src.core.utils.query_plan import compile_query_plan, get_query_plan
+from src.settings.alembic import *
+
+QUERY_PARAMS = [
+    (
+        Property,
+        [
+            ("page", "1"),
+            ("size", "20"),
+            ("property_status", "AVAILABLE"),
+            ("rooms_amount__ge", "2"),
+            ("year_built__lt", "2010"),
+            ("sort", "year_built__asc,created_at__desc"),
+        ],
+    ),
+    (
+        Property,
+        [
+            ("owner__last_name", "Smith"),
+            ("owner__is_active", "true"),
+            ("sort", "owner__email__desc"),
+        ],
+    ),
+    (
+        Lease,
+        [
+            ("start_date__ge", "2023-01-01"),
+            ("property__rooms_amount__gt", "1"),
+            ("sort", "end_date__desc"),
+        ],
+    ),
+]
+
+
+def measure(requests: int, cached: bool) -> float:
+    if not cached:
+        compile_query_plan.cache_clear()
+    start = time.perf_counter()
+    for request_number in range(requests):
+        model, query_params = QUERY_PARAMS[request_number % len(QUERY_PARAMS)]
+        if not cached:
+            compile_query_plan.cache_clear()
+        get_query_plan(model, query_params).apply(select(model))
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def run(requests: int) -> None:
+    build_model_registry()
+    uncached = measure(requests, cached=False)
+    cached = measure(requests, cached=True)
+    print(f"requests: {requests}")
+    print(f"compiled per request: {uncached:.1f} us")
+    print(f"cached plan: {cached:.1f} us ({uncached / cached:.1f}x faster)")
+    print(f"plan cache: {compile_query_plan.cache_info()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.requests)
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -6,6 +8,10 @@ from fastapi_jwt_auth.exceptions import AuthJWTException
 from src.apps.addresses.routers import address_router
 from src.apps.companies.routers import company_router
 from src.apps.emails.routers import email_router
+from src.apps.index_advisor.services import (
+    flush_query_usage_safely,
+    run_query_usage_flushing,
+)
 from src.apps.jwt.routers import jwt_router
 from src.apps.leases.routers import lease_router
 from src.apps.payments.routers import payment_router, stripe_router
@@ -23,8 +29,12 @@ from src.core.exceptions import (
     CantModifyExpiredLeaseException,
     DoesNotExist,
     IncorrectCompanyOrPropertyValueException,
+    IncorrectCoordinatesException,
+    IncorrectDateRangeException,
     IncorrectEnumValueException,
+    IncorrectFilterValueException,
     IncorrectLeaseDatesException,
+    InvalidCursorException,
     IsOccupied,
     NoSuchFieldException,
     OwnerAlreadyHasTheOwnershipException,
@@ -35,6 +45,7 @@ from src.core.exceptions import (
     TenantAlreadyAcceptedRenewalException,
     TenantAlreadyDiscardedRenewalException,
     UnavailableFilterFieldException,
+    UnavailableFilterOperationException,
     UnavailableSortFieldException,
     UserAlreadyHasCompanyException,
     UserCannotLeaseNotTheirPropertyException,
@@ -43,7 +54,8 @@ from src.core.exceptions import (
     UserCantDeactivateTheirAccountException,
     UserHasNoCompanyException,
 )
-from src.core.tasks import scheduler
+from src.core.utils.model_registry import build_model_registry
+from src.settings.general import settings
 
 app = FastAPI(title="RealEstateAPI", description="Real Estate API", version="1.0")
 
@@ -63,6 +75,24 @@ root_router.include_router(stripe_router)
 app.include_router(root_router)
 
 
+@app.on_event("startup")
+async def build_query_plan_registry() -> None:
+    build_model_registry()
+
+
+@app.on_event("startup")
+async def start_query_usage_flushing() -> None:
+    if settings.QUERY_USAGE_TRACKING:
+        app.state.query_usage_flushing = asyncio.create_task(run_query_usage_flushing())
+
+
+@app.on_event("shutdown")
+async def stop_query_usage_flushing() -> None:
+    if settings.QUERY_USAGE_TRACKING:
+        app.state.query_usage_flushing.cancel()
+        await flush_query_usage_safely()
+
+
 @app.exception_handler(AuthJWTException)
 async def handle_auth_jwt_exception(
     request: Request, exception: AuthJWTException
@@ -187,6 +217,24 @@ async def unavailable_filter_field_exception(
     )
 
 
+@app.exception_handler(UnavailableFilterOperationException)
+async def unavailable_filter_operation_exception(
+    request: Request, exception: UnavailableFilterOperationException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exception)}
+    )
+
+
+@app.exception_handler(IncorrectFilterValueException)
+async def incorrect_filter_value_exception(
+    request: Request, exception: IncorrectFilterValueException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exception)}
+    )
+
+
 @app.exception_handler(UnavailableSortFieldException)
 async def unavailable_sort_field_exception(
     request: Request, exception: UnavailableSortFieldException
@@ -196,6 +244,33 @@ async def unavailable_sort_field_exception(
     )
 
 
+@app.exception_handler(IncorrectCoordinatesException)
+async def incorrect_coordinates_exception(
+    request: Request, exception: IncorrectCoordinatesException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exception)}
+    )
+
+
+@app.exception_handler(IncorrectDateRangeException)
+async def incorrect_date_range_exception(
+    request: Request, exception: IncorrectDateRangeException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exception)}
+    )
+
+
+@app.exception_handler(InvalidCursorException)
+async def invalid_cursor_exception(
+    request: Request, exception: InvalidCursorException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exception)}
+    )
+
+
 @app.exception_handler(OwnerAlreadyHasTheOwnershipException)
 async def owner_already_has_the_ownership_exception(
     request: Request, exception: OwnerAlreadyHasTheOwnershipException
@@ -0,0 +1,38 @@
+"""
+offline geocoding import - the coordinates from the CSV file
+(columns: country, city, postal_code, street, house_number, latitude, longitude,
+the empty address columns match every value) are assigned to the addresses
+
+usage: python -m src.apps.addresses geocoding.csv [--overwrite]
+"""
+
+import argparse
+import asyncio
+import csv
+
+from src.apps.addresses.schemas import AddressGeocodingRowSchema
+from src.apps.addresses.services import import_address_coordinates
+from src.dependencies.get_db import get_db
+from src.settings.alembic import *
+
+
+def read_geocoding_csv(path: str) -> list[AddressGeocodingRowSchema]:
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        return [AddressGeocodingRowSchema(**row) for row in csv.DictReader(csv_file)]
+
+
+async def run(path: str, overwrite: bool) -> None:
+    geocoding_rows = read_geocoding_csv(path)
+    async for session in get_db():
+        updated_amount = await import_address_coordinates(
+            session, geocoding_rows, overwrite
+        )
+    print(f"geocoded addresses: {updated_amount}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.path, args.overwrite))
@@ -1,6 +1,6 @@
 import datetime as dt
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, Date, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
@@ -10,6 +10,21 @@ from src.database.db_connection import Base
 
 class Address(Base):
     __tablename__ = "address"
+    __sortable_fields__ = (
+        "country",
+        "state",
+        "city",
+        "postal_code",
+        "street",
+    )
+    __table_args__ = (
+        Index(
+            "ix_address_city_country_fulltext",
+            "city",
+            "country",
+            mysql_prefix="FULLTEXT",
+        ),
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -25,15 +40,18 @@ class Address(Base):
     street = Column(String(length=100), nullable=True)
     house_number = Column(String(length=15), nullable=False)
     apartment_number = Column(String(length=10), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(length=12), nullable=True, index=True)
     company_id = Column(
         String(length=50),
         ForeignKey("company.id", ondelete="cascade", onupdate="cascade"),
         nullable=True,
     )
-    company = relationship("Company", back_populates="address", lazy="subquery")
+    company = relationship("Company", back_populates="address", lazy="raise")
     property_id = Column(
         String(length=50),
         ForeignKey("property.id", ondelete="cascade", onupdate="cascade"),
         nullable=True,
     )
-    property = relationship("Property", back_populates="address", lazy="subquery")
+    property = relationship("Property", back_populates="address", lazy="raise")
@@ -17,9 +17,9 @@ from src.apps.addresses.services import (
     get_single_address,
     update_single_address,
 )
-from src.apps.users.models import User
-from src.apps.users.schemas import UserIdSchema
+from src.apps.users.schemas import UserIdSchema, UserPrincipalSchema
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.permissions import check_if_staff
 from src.dependencies.get_db import get_db
@@ -36,7 +36,7 @@ address_router = APIRouter(prefix="/addresses", tags=["address"])
 async def post_address(
     address: AddressInputSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> AddressBasicOutputSchema:
     await check_if_staff(request_user)
     return await create_address(session, address)
@@ -51,10 +51,12 @@ async def get_addresses(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[AddressBasicOutputSchema]:
-    return await get_all_addresses(
-        session, page_params, query_params=request.query_params.multi_items()
+    return PagedJSONResponse(
+        await get_all_addresses(
+            session, page_params, query_params=request.query_params.multi_items()
+        )
     )
 
 
@@ -66,7 +68,7 @@ async def get_addresses(
 async def get_address(
     address_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[AddressOutputSchema, AddressBasicOutputSchema]:
     if request_user.is_staff:
         return await get_single_address(session, address_id)
@@ -84,7 +86,7 @@ async def update_address(
     address_id: str,
     address_input: AddressUpdateSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> AddressBasicOutputSchema:
     await check_if_staff(request_user)
     return await update_single_address(session, address_input, address_id)
@@ -12,6 +12,8 @@ class AddressBaseSchema(BaseModel):
     street: Optional[str]
     house_number: str
     apartment_number: Optional[str]
+    latitude: Optional[float] = Field(ge=-90, le=90)
+    longitude: Optional[float] = Field(ge=-180, le=180)
 
 
 class AddressInputSchema(AddressBaseSchema):
@@ -30,6 +32,28 @@ class AddressUpdateSchema(BaseModel):
     street: Optional[str]
     house_number: Optional[str]
     apartment_number: Optional[str]
+    latitude: Optional[float] = Field(ge=-90, le=90)
+    longitude: Optional[float] = Field(ge=-180, le=180)
+
+
+class AddressGeocodingRowSchema(BaseModel):
+    """
+    the row of the offline geocoding CSV file, the empty address fields
+    match every value (e.g. the row with the country and the city only
+    geocodes all the addresses in the city)
+    """
+
+    country: str
+    city: Optional[str]
+    postal_code: Optional[str]
+    street: Optional[str]
+    house_number: Optional[str]
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+    @validator("city", "postal_code", "street", "house_number")
+    def empty_value_to_none(cls, value: Optional[str]) -> Optional[str]:
+        return value or None
 
 
 class AddressBasicOutputSchema(AddressBaseSchema):
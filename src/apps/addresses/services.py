@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 
 from pydantic import BaseModel
 from sqlalchemy import delete, select, update
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.apps.addresses.models import Address
 from src.apps.addresses.schemas import (
     AddressBasicOutputSchema,
+    AddressGeocodingRowSchema,
     AddressInputSchema,
     AddressOutputSchema,
     AddressUpdateSchema,
@@ -20,6 +21,7 @@ from src.core.exceptions import (
     AlreadyExists,
     DoesNotExist,
     IncorrectCompanyOrPropertyValueException,
+    IncorrectCoordinatesException,
     IsOccupied,
     ServiceException,
 )
@@ -27,7 +29,20 @@ from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.pagination.services import paginate
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.geo import encode_geohash
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import ADDRESS_CACHE_TAG, invalidate_cache_tags
+
+GEOCODING_ADDRESS_FIELDS = {"country", "city", "postal_code", "street", "house_number"}
+
+
+def get_geohash(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    if (latitude is None) != (longitude is None):
+        raise IncorrectCoordinatesException
+    if latitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
 
 
 async def create_address(
@@ -37,9 +52,6 @@ async def create_address(
     single address can be created for company or property object
     but not for both or none of them
     """
-    company_object = None
-    property_object = None
-
     address_data = address_input.dict()
 
     company_id = address_data.get("company_id")
@@ -49,25 +61,27 @@ async def create_address(
         raise IncorrectCompanyOrPropertyValueException
 
     if company_id:
-        if not (company_object := await if_exists(Company, "id", company_id, session)):
+        if not (await if_exists(Company, "id", company_id, session)):
             raise DoesNotExist(Company.__name__, "id", company_id)
-        if company_object.address is not None:
+        if await if_exists(Address, "company_id", company_id, session):
             raise AddressAlreadyAssignedException(object="Company")
 
     if property_id:
-        if not (
-            property_object := await if_exists(Property, "id", property_id, session)
-        ):
+        if not (await if_exists(Property, "id", property_id, session)):
             raise DoesNotExist(Property.__name__, "id", property_id)
-        if property_object and property_object.address is not None:
+        if await if_exists(Address, "property_id", property_id, session):
             raise AddressAlreadyAssignedException(object="Property")
 
-    new_address = Address(**address_data)
+    new_address = Address(
+        **address_data,
+        geohash=get_geohash(address_data["latitude"], address_data["longitude"]),
+    )
     new_address.company_id = company_id
     new_address.property_id = property_id
     session.add(new_address)
     await session.commit()
     await session.refresh(new_address)
+    await invalidate_cache_tags(ADDRESS_CACHE_TAG)
 
     return AddressOutputSchema.from_orm(new_address)
 
@@ -77,7 +91,15 @@ async def get_single_address(
     address_id: str,
     output_schema: BaseModel = AddressOutputSchema,
 ) -> Union[AddressBasicOutputSchema, AddressOutputSchema]:
-    if not (address_object := await if_exists(Address, "id", address_id, session)):
+    if not (
+        address_object := await if_exists(
+            Address,
+            "id",
+            address_id,
+            session,
+            options=get_load_plan(Address, output_schema),
+        )
+    ):
         raise DoesNotExist(Address.__name__, "id", address_id)
 
     return output_schema.from_orm(address_object)
@@ -86,7 +108,7 @@ async def get_single_address(
 async def get_all_addresses(
     session: AsyncSession, page_params: PageParams, query_params: list[tuple] = None
 ) -> PagedResponseSchema[AddressBasicOutputSchema]:
-    query = select(Address)
+    query = get_output_query(Address, AddressBasicOutputSchema)
 
     if query_params:
         query = filter_and_sort_instances(query_params, query, Address)
@@ -97,6 +119,7 @@ async def get_all_addresses(
         table=Address,
         page_params=page_params,
         session=session,
+        query_params=query_params,
     )
 
 
@@ -108,6 +131,12 @@ async def update_single_address(
 
     address_data = address_input.dict(exclude_unset=True, exclude_none=True)
 
+    if {"latitude", "longitude"} & address_data.keys():
+        address_data["geohash"] = get_geohash(
+            address_data.get("latitude", address_object.latitude),
+            address_data.get("longitude", address_object.longitude),
+        )
+
     if address_data:
         statement = (
             update(Address).filter(Address.id == address_id).values(**address_data)
@@ -116,7 +145,53 @@ async def update_single_address(
         await session.execute(statement)
         await session.commit()
         await session.refresh(address_object)
+        await invalidate_cache_tags(ADDRESS_CACHE_TAG)
 
     return await get_single_address(
         session, address_id=address_id, output_schema=AddressBasicOutputSchema
     )
+
+
+async def import_address_coordinates(
+    session: AsyncSession,
+    geocoding_rows: list[AddressGeocodingRowSchema],
+    overwrite: bool = False,
+) -> int:
+    """
+    offline geocoding hook - the coordinates of the CSV rows are assigned
+    to the matching addresses, by default only the addresses without
+    coordinates are geocoded and the most specific rows are applied first,
+    with overwrite the most specific rows are applied last, so they win
+    """
+    geocoding_rows = sorted(
+        geocoding_rows,
+        key=lambda row: len(
+            row.dict(include=GEOCODING_ADDRESS_FIELDS, exclude_none=True)
+        ),
+        reverse=not overwrite,
+    )
+    updated_amount = 0
+    for geocoding_row in geocoding_rows:
+        conditions = [
+            getattr(Address, field) == value
+            for field, value in geocoding_row.dict(
+                include=GEOCODING_ADDRESS_FIELDS, exclude_none=True
+            ).items()
+        ]
+        if not overwrite:
+            conditions.append(Address.latitude.is_(None))
+
+        result = await session.execute(
+            update(Address)
+            .filter(*conditions)
+            .values(
+                latitude=geocoding_row.latitude,
+                longitude=geocoding_row.longitude,
+                geohash=encode_geohash(geocoding_row.latitude, geocoding_row.longitude),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        updated_amount += result.rowcount
+    await session.commit()
+    await invalidate_cache_tags(ADDRESS_CACHE_TAG)
+    return updated_amount
@@ -10,6 +10,10 @@ from src.database.db_connection import Base
 
 class Company(Base):
     __tablename__ = "company"
+    __sortable_fields__ = (
+        "company_name",
+        "foundation_year",
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -21,7 +25,7 @@ class Company(Base):
     company_name = Column(String(length=100), nullable=False, unique=True)
     foundation_year = Column(Integer, nullable=False)
     phone_number = Column(String(length=50), nullable=False)
-    users = relationship("User", back_populates="company", lazy="joined")
+    users = relationship("User", back_populates="company", lazy="raise")
     address = relationship(
-        "Address", uselist=False, back_populates="company", lazy="subquery"
+        "Address", uselist=False, back_populates="company", lazy="raise"
     )
@@ -19,11 +19,18 @@ from src.apps.companies.services import (
     remove_single_user_from_company,
     update_single_company,
 )
-from src.apps.users.models import User
-from src.apps.users.schemas import UserIdSchema
+from src.apps.users.schemas import UserIdSchema, UserPrincipalSchema
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.permissions import check_if_staff
+from src.core.utils.response_cache import (
+    ADDRESS_CACHE_TAG,
+    COMPANY_CACHE_TAG,
+    USER_CACHE_TAG,
+    get_cached_response,
+    get_permission_tier,
+)
 from src.dependencies.get_db import get_db
 from src.dependencies.user import authenticate_user
 
@@ -38,7 +45,7 @@ company_router = APIRouter(prefix="/companies", tags=["company"])
 async def post_company(
     company: CompanyInputSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> CompanyBasicOutputSchema:
     await check_if_staff(request_user)
     return await create_company(session, company)
@@ -53,10 +60,17 @@ async def get_companies(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[CompanyBasicOutputSchema]:
-    return await get_all_companies(
-        session, page_params, query_params=request.query_params.multi_items()
+    return PagedJSONResponse(
+        await get_cached_response(
+            request,
+            get_permission_tier(request_user),
+            (COMPANY_CACHE_TAG,),
+            lambda: get_all_companies(
+                session, page_params, query_params=request.query_params.multi_items()
+            ),
+        )
     )
 
 
@@ -66,15 +80,20 @@ async def get_companies(
     status_code=status.HTTP_200_OK,
 )
 async def get_company(
+    request: Request,
     company_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[CompanyOutputSchema, CompanyBasicOutputSchema]:
-    if request_user.is_staff or request_user.company_id == company_id:
-        return await get_single_company(session, company_id)
-    return await get_single_company(
-        session, company_id, output_schema=CompanyBasicOutputSchema
+    company = await get_cached_response(
+        request,
+        "full",
+        (COMPANY_CACHE_TAG, ADDRESS_CACHE_TAG, USER_CACHE_TAG),
+        lambda: get_single_company(session, company_id),
     )
+    if request_user.is_staff or request_user.company_id == company_id:
+        return company
+    return CompanyBasicOutputSchema(**company)
 
 
 @company_router.patch(
@@ -86,7 +105,7 @@ async def update_company(
     company_id: str,
     company_input: CompanyUpdateSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> CompanyOutputSchema:
     await check_if_staff(request_user)
     return await update_single_company(session, company_input, company_id)
@@ -100,7 +119,7 @@ async def add_user_to_company(
     company_id: str,
     user_company_input: UserIdSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> JSONResponse:
     await check_if_staff(request_user)
     await add_single_user_to_company(session, user_company_input, company_id)
@@ -118,7 +137,7 @@ async def remove_user_from_company(
     company_id: str,
     user_company_input: UserIdSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> JSONResponse:
     await check_if_staff(request_user)
     await remove_single_user_from_company(session, user_company_input, company_id)
@@ -13,6 +13,7 @@ from src.apps.companies.schemas import (
 )
 from src.apps.users.models import User
 from src.apps.users.schemas import UserIdSchema
+from src.apps.users.services.principal_services import invalidate_user_principal
 from src.core.exceptions import (
     AlreadyExists,
     DoesNotExist,
@@ -25,7 +26,9 @@ from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.pagination.services import paginate
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import COMPANY_CACHE_TAG, invalidate_cache_tags
 
 
 async def create_company(
@@ -43,6 +46,7 @@ async def create_company(
     new_company = Company(**company_data)
     session.add(new_company)
     await session.commit()
+    await invalidate_cache_tags(COMPANY_CACHE_TAG)
 
     return CompanyBasicOutputSchema.from_orm(new_company)
 
@@ -52,7 +56,15 @@ async def get_single_company(
     company_id: str,
     output_schema: BaseModel = CompanyOutputSchema,
 ) -> Union[CompanyOutputSchema, CompanyBasicOutputSchema]:
-    if not (company_object := await if_exists(Company, "id", company_id, session)):
+    if not (
+        company_object := await if_exists(
+            Company,
+            "id",
+            company_id,
+            session,
+            options=get_load_plan(Company, output_schema),
+        )
+    ):
         raise DoesNotExist(Company.__name__, "id", company_id)
 
     return output_schema.from_orm(company_object)
@@ -64,7 +76,7 @@ async def get_all_companies(
     output_schema: BaseModel = CompanyBasicOutputSchema,
     query_params: list[tuple] = None,
 ) -> PagedResponseSchema[CompanyBasicOutputSchema]:
-    query = select(Company)
+    query = get_output_query(Company, output_schema)
 
     if query_params:
         query = filter_and_sort_instances(query_params, query, Company)
@@ -75,6 +87,7 @@ async def get_all_companies(
         table=Company,
         page_params=page_params,
         session=session,
+        query_params=query_params,
     )
 
 
@@ -104,6 +117,7 @@ async def update_single_company(
         await session.execute(statement)
         await session.commit()
         await session.refresh(company_object)
+        await invalidate_cache_tags(COMPANY_CACHE_TAG)
 
     return await get_single_company(session, company_id=company_id)
 
@@ -126,10 +140,10 @@ async def manage_user_company_status(
             "Inactive user cannot be added or removed from the company! "
         )
 
-    if user_object.company and add_user:
+    if user_object.company_id and add_user:
         raise UserAlreadyHasCompanyException
 
-    if not user_object.company and not add_user:
+    if not user_object.company_id and not add_user:
         raise UserHasNoCompanyException
 
     company = company_id if add_user else None
@@ -137,6 +151,8 @@ async def manage_user_company_status(
     session.add(user_object)
     await session.commit()
     await session.refresh(user_object)
+    await invalidate_user_principal(user_object.email)
+    await invalidate_cache_tags(COMPANY_CACHE_TAG)
     return
 
 
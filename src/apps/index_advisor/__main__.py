@@ -0,0 +1,81 @@
+"""
+index advisor report - the recorded filter/sort patterns with the biggest
+total time are explained and the missing composite indexes are recommended,
+with --emit-migration the alembic migration stub creating them is written
+
+usage: python -m src.apps.index_advisor [--top 10] [--emit-migration]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from uuid import uuid4
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from src.apps.index_advisor.services import get_index_advisor_report, get_migration_stub
+from src.dependencies.get_db import get_db
+from src.settings.alembic import *
+
+
+def print_report(reports: list) -> None:
+    for number, report in enumerate(reports, start=1):
+        query_usage = report.query_usage
+        pattern = json.loads(query_usage.pattern)
+        print(
+            f"{number}. {pattern['model']} "
+            f"filters={pattern['filters']} sort={pattern['sort']}"
+        )
+        print(
+            f"   calls={query_usage.calls} "
+            f"avg={query_usage.total_time / max(query_usage.calls, 1):.1f} ms "
+            f"max={query_usage.max_time:.1f} ms "
+            f"total={query_usage.total_time:.1f} ms"
+        )
+        for finding in report.findings:
+            print(f"   EXPLAIN: {finding}")
+        for recommendation in report.recommendations:
+            print(
+                f"   recommended index: {recommendation.name} on "
+                f"{recommendation.table_name} ({', '.join(recommendation.columns)})"
+            )
+
+
+def write_migration_stub(recommendations: list) -> str:
+    script_directory = ScriptDirectory.from_config(Config("alembic.ini"))
+    revision = uuid4().hex[:12]
+    migration_stub = get_migration_stub(
+        recommendations, revision, script_directory.get_current_head()
+    )
+    path = os.path.join(
+        script_directory.versions, f"{revision}_add_index_advisor_indexes.py"
+    )
+    with open(path, "w") as migration_file:
+        migration_file.write(migration_stub)
+    return path
+
+
+async def run(top: int, emit_migration: bool) -> None:
+    async for session in get_db():
+        reports = await get_index_advisor_report(session, top)
+
+    print_report(reports)
+    recommendations = list(
+        dict.fromkeys(
+            recommendation
+            for report in reports
+            for recommendation in report.recommendations
+        )
+    )
+    if emit_migration and recommendations:
+        print(f"migration stub: {write_migration_stub(recommendations)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--emit-migration", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.top, args.emit_migration))
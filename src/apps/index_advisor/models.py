@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, Integer, String, Text
+from sqlalchemy.sql.sqltypes import DateTime
+
+from src.database.db_connection import Base
+
+
+class QueryUsage(Base):
+    __tablename__ = "query_usage"
+    id = Column(String(length=40), primary_key=True, nullable=False)
+    model_name = Column(String(length=100), nullable=False)
+    pattern = Column(Text, nullable=False)
+    calls = Column(Integer, nullable=False, default=0)
+    total_time = Column(Float, nullable=False, default=0)
+    max_time = Column(Float, nullable=False, default=0)
+    sample_statement = Column(Text, nullable=True)
+    sample_parameters = Column(Text, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
@@ -0,0 +1,365 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.event import listens_for
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.index_advisor.models import QueryUsage
+from src.core.utils.filter import QUERY_USAGE_OPTION
+from src.core.utils.model_registry import get_model_fields, get_table_indexes
+from src.database.db_connection import Base
+from src.dependencies.get_db import get_db
+from src.settings.general import settings
+
+logger = logging.getLogger(__name__)
+
+EQUALITY_OPERATIONS = ("eq", "in", "isnull")
+INDEX_MAX_COLUMNS = 4
+INDEX_NAME_MAX_LENGTH = 64
+
+MIGRATION_TEMPLATE = '''"""{message}
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {create_date}
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '{revision}'
+down_revision = '{down_revision}'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+{upgrade}
+
+
+def downgrade() -> None:
+{downgrade}
+'''
+
+
+@dataclass
+class PatternUsage:
+    calls: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    statement: Optional[str] = None
+    parameters: Any = None
+
+
+class QueryUsageRecorder:
+    """
+    the usage of the query patterns (filtered fields with the operations
+    and the sort) is aggregated in memory of the worker
+    and flushed to the query_usage table every QUERY_USAGE_FLUSH_INTERVAL seconds,
+    the last executed statement is kept as the sample for EXPLAIN
+    with the typed placeholders instead of the bound values
+    """
+
+    def __init__(self) -> None:
+        self.usage = dict()
+        self.lock = threading.Lock()
+
+    def record(
+        self, pattern: str, elapsed_time: float, statement: str, parameters: Any
+    ) -> None:
+        with self.lock:
+            pattern_usage = self.usage.setdefault(pattern, PatternUsage())
+            pattern_usage.calls += 1
+            pattern_usage.total_time += elapsed_time
+            pattern_usage.max_time = max(pattern_usage.max_time, elapsed_time)
+            pattern_usage.statement = statement
+            pattern_usage.parameters = parameters
+
+    def pop_usage(self) -> dict:
+        with self.lock:
+            usage, self.usage = self.usage, dict()
+        return usage
+
+
+query_usage_recorder = QueryUsageRecorder()
+
+
+def get_placeholder_value(value: Any) -> Any:
+    """
+    the bound value is replaced with the value of the same type,
+    so the sample statement can be explained without keeping
+    the filtered values (emails, names, ids) of the users
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return type(value)(0)
+    if isinstance(value, date):
+        return type(value).min
+    return ""
+
+
+def get_placeholder_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: get_placeholder_value(value) for key, value in parameters.items()}
+    return [get_placeholder_value(value) for value in parameters or []]
+
+
+@listens_for(Engine, "before_cursor_execute")
+def start_query_usage_timer(conn, cursor, statement, parameters, context, executemany):
+    """
+    the start time is kept by the execution context of the statement,
+    so the failed statement (without after_cursor_execute) leaves nothing
+    on the pooled connection
+    """
+    if context is not None and context.execution_options.get(QUERY_USAGE_OPTION):
+        context._query_usage_started_at = time.perf_counter()
+
+
+@listens_for(Engine, "after_cursor_execute")
+def record_query_usage(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not (
+        pattern := context.execution_options.get(QUERY_USAGE_OPTION)
+    ):
+        return
+    started_at = context._query_usage_started_at
+    query_usage_recorder.record(
+        pattern,
+        (time.perf_counter() - started_at) * 1000,
+        statement,
+        get_placeholder_parameters(parameters),
+    )
+
+
+def get_pattern_id(pattern: str) -> str:
+    return hashlib.sha1(pattern.encode()).hexdigest()
+
+
+async def save_pattern_usage(
+    session: AsyncSession, pattern: str, pattern_usage: PatternUsage
+) -> None:
+    """
+    the counters are incremented by the UPDATE statement,
+    so the usage flushed by many workers at the same time is not lost
+    """
+    pattern_id = get_pattern_id(pattern)
+    sample_values = dict(
+        sample_statement=pattern_usage.statement,
+        sample_parameters=json.dumps(pattern_usage.parameters, default=str),
+        last_seen_at=datetime.utcnow(),
+    )
+    update_statement = (
+        update(QueryUsage)
+        .filter(QueryUsage.id == pattern_id)
+        .values(
+            calls=QueryUsage.calls + pattern_usage.calls,
+            total_time=QueryUsage.total_time + pattern_usage.total_time,
+            max_time=case(
+                (QueryUsage.max_time < pattern_usage.max_time, pattern_usage.max_time),
+                else_=QueryUsage.max_time,
+            ),
+            **sample_values,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if (await session.execute(update_statement)).rowcount:
+        await session.commit()
+        return
+
+    try:
+        session.add(
+            QueryUsage(
+                id=pattern_id,
+                model_name=json.loads(pattern)["model"],
+                pattern=pattern,
+                calls=pattern_usage.calls,
+                total_time=pattern_usage.total_time,
+                max_time=pattern_usage.max_time,
+                **sample_values,
+            )
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        await session.execute(update_statement)
+        await session.commit()
+
+
+async def flush_query_usage(session: AsyncSession) -> int:
+    usage = query_usage_recorder.pop_usage()
+    for pattern, pattern_usage in usage.items():
+        await save_pattern_usage(session, pattern, pattern_usage)
+    return len(usage)
+
+
+async def flush_query_usage_safely() -> None:
+    try:
+        async for session in get_db():
+            await flush_query_usage(session)
+    except Exception:
+        logger.exception("Flushing the query usage failed")
+
+
+async def run_query_usage_flushing() -> None:
+    while True:
+        await asyncio.sleep(settings.QUERY_USAGE_FLUSH_INTERVAL)
+        await flush_query_usage_safely()
+
+
+@dataclass(frozen=True)
+class IndexRecommendation:
+    table_name: str
+    columns: tuple
+
+    @property
+    def name(self) -> str:
+        return f"ix_{self.table_name}_{'_'.join(self.columns)}"[:INDEX_NAME_MAX_LENGTH]
+
+
+@dataclass
+class PatternReport:
+    query_usage: QueryUsage
+    findings: list
+    recommendations: list
+
+
+def get_model_by_name(model_name: str):
+    for mapper in Base.registry.mappers:
+        if mapper.class_.__name__ == model_name:
+            return mapper.class_
+    raise KeyError(model_name)
+
+
+def get_field_column_name(model, field_path: str) -> tuple:
+    *relationship_keys, field = field_path.split("__")
+    for relationship_key in relationship_keys:
+        model = get_model_fields(model).relationships[relationship_key].mapper.class_
+    return model, get_model_fields(model).columns[field].property.columns[0].name
+
+
+def is_index_covered(table, columns: tuple) -> bool:
+    return any(index[: len(columns)] == columns for index in get_table_indexes(table))
+
+
+def get_index_recommendations(pattern: str) -> list[IndexRecommendation]:
+    """
+    composite index columns follow the equality, sort, range rule:
+    the columns compared with equality go first, then the sort columns
+    (of the main model only, the joined tables cannot be sorted by the index)
+    and the first range column at the end
+    """
+    pattern = json.loads(pattern)
+    model = get_model_by_name(pattern["model"])
+    columns_by_model = {model: ([], [])}
+    for field_path, operation in pattern["filters"]:
+        field_model, column_name = get_field_column_name(model, field_path)
+        equality_columns, range_columns = columns_by_model.setdefault(
+            field_model, ([], [])
+        )
+        if operation in EQUALITY_OPERATIONS:
+            equality_columns.append(column_name)
+        else:
+            range_columns.append(column_name)
+
+    sort_columns = []
+    for field_path, _ in pattern["sort"]:
+        field_model, column_name = get_field_column_name(model, field_path)
+        if field_model is not model:
+            break
+        sort_columns.append(column_name)
+
+    recommendations = []
+    for field_model, (equality_columns, range_columns) in columns_by_model.items():
+        columns = equality_columns + (sort_columns if field_model is model else [])
+        columns = tuple(dict.fromkeys(columns + range_columns[:1]))
+        columns = columns[:INDEX_MAX_COLUMNS]
+        if columns and not is_index_covered(field_model.__table__, columns):
+            recommendations.append(
+                IndexRecommendation(field_model.__tablename__, columns)
+            )
+    return recommendations
+
+
+async def explain_query_usage(
+    session: AsyncSession, query_usage: QueryUsage
+) -> list[str]:
+    """
+    the recorded sample statement is explained by MySQL,
+    the full table scans and the filesorts are reported
+    (EXPLAIN output of the other databases is not supported)
+    """
+    connection = await session.connection()
+    if connection.dialect.name != "mysql" or not query_usage.sample_statement:
+        return []
+
+    parameters = json.loads(query_usage.sample_parameters or "[]")
+    explain_rows = await connection.exec_driver_sql(
+        f"EXPLAIN {query_usage.sample_statement}",
+        parameters if isinstance(parameters, dict) else tuple(parameters),
+    )
+    findings = []
+    for row in explain_rows.mappings():
+        if row["type"] == "ALL":
+            findings.append(f"full scan of {row['table']} ({row['rows']} rows)")
+        if "filesort" in (row["Extra"] or ""):
+            findings.append(f"filesort on {row['table']}")
+    return findings
+
+
+async def get_index_advisor_report(
+    session: AsyncSession, top: int = 10
+) -> list[PatternReport]:
+    query_usages = await session.execute(
+        select(QueryUsage).order_by(QueryUsage.total_time.desc()).limit(top)
+    )
+    reports = []
+    for query_usage in query_usages.scalars().all():
+        try:
+            recommendations = get_index_recommendations(query_usage.pattern)
+        except KeyError:
+            reports.append(
+                PatternReport(query_usage, ["pattern does not match the models"], [])
+            )
+            continue
+        findings = await explain_query_usage(session, query_usage)
+        reports.append(PatternReport(query_usage, findings, recommendations))
+    return reports
+
+
+def get_migration_stub(
+    recommendations: list[IndexRecommendation], revision: str, down_revision: str
+) -> str:
+    upgrade = [
+        f"    op.create_index(\n"
+        f"        '{recommendation.name}',\n"
+        f"        '{recommendation.table_name}',\n"
+        f"        {list(recommendation.columns)!r},\n"
+        f"        unique=False,\n"
+        f"    )"
+        for recommendation in recommendations
+    ]
+    downgrade = [
+        f"    op.drop_index('{recommendation.name}', "
+        f"table_name='{recommendation.table_name}')"
+        for recommendation in reversed(recommendations)
+    ]
+    return MIGRATION_TEMPLATE.format(
+        message="add index advisor indexes",
+        revision=revision,
+        down_revision=down_revision,
+        create_date=datetime.now(),
+        upgrade="\n".join(upgrade) or "    pass",
+        downgrade="\n".join(downgrade) or "    pass",
+    )
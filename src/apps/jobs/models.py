@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String
+from sqlalchemy.sql.sqltypes import DateTime
+
+from src.database.db_connection import Base
+
+
+class JobRun(Base):
+    __tablename__ = "job_run"
+    job_name = Column(String(length=100), primary_key=True, nullable=False)
+    locked_by = Column(String(length=100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,105 @@
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.jobs.models import JobRun
+from src.core.utils.orm import if_exists
+from src.settings.general import settings
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def acquire_job_lock(
+    session: AsyncSession, job_name: str, interval: timedelta
+) -> bool:
+    """
+    the job row is claimed with the conditional UPDATE, so only one worker
+    gets the lock when the job is due and not locked by the other worker,
+    the next run is planned JOB_RUN_TOLERANCE seconds earlier than the interval
+    so the schedulers of the other workers and nodes can drift a little,
+    the lock expires after JOB_LOCK_TIMEOUT seconds in case the worker dies
+    """
+    if not await if_exists(JobRun, "job_name", job_name, session):
+        try:
+            session.add(JobRun(job_name=job_name))
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+
+    now = datetime.utcnow()
+    result = await session.execute(
+        update(JobRun)
+        .filter(
+            JobRun.job_name == job_name,
+            or_(JobRun.next_run_at.is_(None), JobRun.next_run_at <= now),
+            or_(JobRun.locked_until.is_(None), JobRun.locked_until < now),
+        )
+        .values(
+            locked_by=WORKER_ID,
+            locked_until=now + timedelta(seconds=settings.JOB_LOCK_TIMEOUT),
+            next_run_at=now + interval - timedelta(seconds=settings.JOB_RUN_TOLERANCE),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def release_job_lock(
+    session: AsyncSession, job_name: str, failed: bool = False, next_run_at=None
+) -> None:
+    """
+    the failed run is not finished, its next_run_at is set back
+    so the job is retried by the next run of the scheduler
+    """
+    values = {"locked_by": None, "locked_until": None}
+    if failed:
+        values["next_run_at"] = next_run_at
+    else:
+        values["last_finished_at"] = datetime.utcnow()
+    await session.execute(
+        update(JobRun)
+        .filter(JobRun.job_name == job_name, JobRun.locked_by == WORKER_ID)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def run_locked_job(
+    session: AsyncSession,
+    job_name: str,
+    interval: timedelta,
+    job: Callable[[AsyncSession], Awaitable],
+) -> bool:
+    """
+    runs the job only if this worker got the job lock,
+    the job which raised keeps its previous next_run_at,
+    returns True if the job was run
+    """
+    next_run_at = await session.scalar(
+        select(JobRun.next_run_at).filter(JobRun.job_name == job_name)
+    )
+    if not await acquire_job_lock(session, job_name, interval):
+        logger.info("job %s skipped, it is locked or not due yet", job_name)
+        return False
+
+    try:
+        await job(session)
+    except Exception:
+        logger.exception("job %s failed, it will be retried", job_name)
+        await session.rollback()
+        await release_job_lock(session, job_name, failed=True, next_run_at=next_run_at)
+        raise
+
+    await session.rollback()
+    await release_job_lock(session, job_name)
+    return True
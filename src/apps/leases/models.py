@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from sqlalchemy import DECIMAL, Boolean, Column, Date
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
@@ -15,6 +15,27 @@ from src.database.db_connection import Base
 
 class Lease(Base):
     __tablename__ = "lease"
+    __sortable_fields__ = (
+        "start_date",
+        "end_date",
+        "rent_amount",
+        "lease_expiration_date",
+        "next_payment_date",
+        "billing_period",
+        "renewal_accepted",
+        "lease_expired",
+    )
+    __table_args__ = (
+        Index(
+            "ix_lease_expired_next_payment_date", "lease_expired", "next_payment_date"
+        ),
+        Index(
+            "ix_lease_expired_lease_expiration_date",
+            "lease_expired",
+            "lease_expiration_date",
+        ),
+        Index("ix_lease_expired_start_date", "lease_expired", "start_date"),
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -23,8 +44,8 @@ class Lease(Base):
         index=True,
         default=generate_uuid,
     )
-    start_date = Column(Date, nullable=False)
-    end_date = Column(Date, nullable=True)
+    start_date = Column(Date, nullable=False, index=True)
+    end_date = Column(Date, nullable=True, index=True)
     rent_amount = Column(DECIMAL, nullable=False)
     initial_deposit_amount = Column(DECIMAL, nullable=False, default=Decimal(0))
     renewal_accepted = Column(Boolean, nullable=False, default=False)
@@ -39,13 +60,20 @@ class Lease(Base):
     )
     next_payment_date = Column(Date, nullable=True, default=default_next_payment_date)
     payment_bank_account = Column(String(length=75), nullable=False)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
     tenant_id = Column(
         String(length=50),
         ForeignKey("user.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
     tenant = relationship(
-        "User", back_populates="tenant_leases", lazy="joined", foreign_keys=[tenant_id]
+        "User", back_populates="tenant_leases", lazy="raise", foreign_keys=[tenant_id]
     )
     owner_id = Column(
         String(length=50),
@@ -53,12 +81,12 @@ class Lease(Base):
         nullable=True,
     )
     owner = relationship(
-        "User", back_populates="owner_leases", lazy="joined", foreign_keys=[owner_id]
+        "User", back_populates="owner_leases", lazy="raise", foreign_keys=[owner_id]
     )
-    property = relationship("Property", back_populates="leases", lazy="selectin")
+    property = relationship("Property", back_populates="leases", lazy="raise")
     property_id = Column(
         String(length=50),
         ForeignKey("property.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
-    payments = relationship("Payment", back_populates="lease", lazy="selectin")
+    payments = relationship("Payment", back_populates="lease", lazy="raise")
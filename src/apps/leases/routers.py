@@ -1,9 +1,10 @@
 from typing import Union
 
-from fastapi import Depends, Request, Response, status
+from fastapi import Depends, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from src.apps.leases.schemas import (
     LeaseBasicOutputSchema,
@@ -16,16 +17,22 @@ from src.apps.leases.services import (
     create_lease,
     discard_single_lease_renewal,
     get_all_leases,
+    get_lease_etag,
+    get_leases_export,
     get_single_lease,
     update_single_lease,
 )
 from src.apps.properties.services import get_single_property
-from src.apps.users.models import User
+from src.apps.users.schemas import UserPrincipalSchema
 from src.core.exceptions import AuthorizationException
+from src.core.export.enums import ExportFormatEnum
+from src.core.export.responses import ExportStreamingResponse
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.permissions import check_if_staff, check_if_staff_or_owner
-from src.dependencies.get_db import get_db
+from src.core.utils.etag import is_etag_matching
+from src.dependencies.get_db import get_db, get_session_factory
 from src.dependencies.user import authenticate_user
 
 lease_router = APIRouter(prefix="/leases", tags=["lease"])
@@ -39,7 +46,7 @@ lease_router = APIRouter(prefix="/leases", tags=["lease"])
 async def post_lease(
     lease: LeaseInputSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> LeaseBasicOutputSchema:
     property = await get_single_property(session, lease.property_id)
     await check_if_staff_or_owner(request_user, "id", property.owner_id)
@@ -55,13 +62,35 @@ async def get_every_lease(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_leases(
-        session,
-        page_params,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_leases(
+            session,
+            page_params,
+            query_params=request.query_params.multi_items(),
+        )
+    )
+
+
+@lease_router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+)
+async def export_leases(
+    request: Request,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> ExportStreamingResponse:
+    await check_if_staff(request_user)
+    return ExportStreamingResponse(
+        get_leases_export(
+            session_factory, export_format, request.query_params.multi_items()
+        ),
+        export_format,
+        "leases",
     )
 
 
@@ -74,14 +103,16 @@ async def get_active_leases(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_leases(
-        session,
-        page_params,
-        get_active=True,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_leases(
+            session,
+            page_params,
+            get_active=True,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -94,13 +125,15 @@ async def get_user_owner_leases(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
-    return await get_all_leases(
-        session,
-        page_params,
-        user_id_owner_leases=request_user.id,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_leases(
+            session,
+            page_params,
+            user_id_owner_leases=request_user.id,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -113,13 +146,15 @@ async def get_user_tenant_leases(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
-    return await get_all_leases(
-        session,
-        page_params,
-        user_id_tenant_leases=request_user.id,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_leases(
+            session,
+            page_params,
+            user_id_tenant_leases=request_user.id,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -132,14 +167,16 @@ async def get_leases_with_renewal_accepted(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_leases(
-        session,
-        page_params,
-        get_with_renewal_accepted=True,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_leases(
+            session,
+            page_params,
+            get_with_renewal_accepted=True,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -149,18 +186,33 @@ async def get_leases_with_renewal_accepted(
     status_code=status.HTTP_200_OK,
 )
 async def get_lease(
+    request: Request,
+    response: Response,
     lease_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[LeaseOutputSchema, LeaseBasicOutputSchema]:
-    lease = await get_single_lease(session, lease_id)
-    if (
+    """
+    the ETag is read before the lease, so the lease changed in the meantime
+    is sent with the older ETag and the next request gets it again
+    """
+    lease_etag = await get_lease_etag(session, lease_id)
+    if not (
         request_user.is_staff
-        or getattr(request_user, "id") == lease.owner_id
-        or getattr(request_user, "id") == lease.tenant_id
+        or getattr(request_user, "id") == lease_etag.owner_id
+        or getattr(request_user, "id") == lease_etag.tenant_id
     ):
-        return lease
-    raise AuthorizationException("You don't have permissions to perform this action! ")
+        raise AuthorizationException(
+            "You don't have permissions to perform this action! "
+        )
+
+    if is_etag_matching(request, lease_etag.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": lease_etag.etag},
+        )
+    response.headers["ETag"] = lease_etag.etag
+    return await get_single_lease(session, lease_id)
 
 
 @lease_router.patch(
@@ -172,7 +224,7 @@ async def update_lease(
     lease_id: str,
     lease_input: LeaseUpdateSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> LeaseOutputSchema:
     lease = await get_single_lease(session, lease_id)
     await check_if_staff_or_owner(request_user, "id", lease.owner_id)
@@ -186,7 +238,7 @@ async def update_lease(
 async def accept_lease_renewal(
     lease_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> JSONResponse:
     lease = await get_single_lease(session, lease_id)
     if (
@@ -209,7 +261,7 @@ async def accept_lease_renewal(
 async def discard_lease_renewal(
     lease_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> JSONResponse:
     lease = await get_single_lease(session, lease_id)
     if (
@@ -30,7 +30,11 @@ class LeaseBaseSchema(BaseModel):
     @validator("end_date")
     def validate_end_date(cls, end_date: Optional[date]) -> Optional[date]:
         print(isinstance(end_date, date), isinstance(end_date, FakeDate))
-        if end_date and (isinstance(end_date, date)) and (not isinstance(end_date, FakeDate)):
+        if (
+            end_date
+            and (isinstance(end_date, date))
+            and (not isinstance(end_date, FakeDate))
+        ):
             if end_date < date.today():
                 raise ValueError("End date must be in the future!")
         return end_date
@@ -87,3 +91,9 @@ class LeaseOutputSchema(LeaseBasicOutputSchema):
 
     class Config:
         orm_mode = True
+
+
+class LeaseETagSchema(BaseModel):
+    etag: str
+    owner_id: Optional[str]
+    tenant_id: Optional[str]
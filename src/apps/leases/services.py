@@ -1,23 +1,27 @@
+import logging
 from datetime import date, datetime, timedelta
-from typing import Union
+from typing import AsyncIterator, Union
 
 from fastapi import BackgroundTasks
 from pydantic import BaseModel
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload, sessionmaker
 
 from src.apps.leases.enums import BillingPeriodEnum
 from src.apps.leases.models import Lease
 from src.apps.leases.schemas import (
     LeaseBasicOutputSchema,
+    LeaseETagSchema,
     LeaseInputSchema,
     LeaseOutputSchema,
     LeaseUpdateSchema,
 )
 from src.apps.payments.models import Payment
-from src.apps.payments.services import create_payment
+from src.apps.payments.services import create_payments
 from src.apps.properties.enums import PropertyStatusEnum
 from src.apps.properties.models import Property
+from src.apps.properties.services import get_occupancy_overlap, sync_property_occupancy
 from src.apps.users.models import User
 from src.core.exceptions import (
     ActiveLeaseException,
@@ -35,11 +39,23 @@ from src.core.exceptions import (
     UserCannotLeaseNotTheirPropertyException,
     UserCannotRentTheirPropertyForThemselvesException,
 )
+from src.core.export.enums import ExportFormatEnum
+from src.core.export.services import stream_export
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.pagination.services import paginate
+from src.core.utils.etag import get_etag
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import (
+    LEASE_CACHE_TAG,
+    PROPERTY_CACHE_TAG,
+    invalidate_cache_tags,
+)
+from src.settings.general import settings
+
+logger = logging.getLogger(__name__)
 
 
 async def create_lease(
@@ -51,15 +67,35 @@ async def create_lease(
     to decouple owner leases and tenant leases from themselves
     """
     lease_data = lease_input.dict()
+    start_date, end_date = lease_data.get("start_date"), lease_data.get("end_date")
+    if (start_date and end_date) and (start_date > end_date):
+        raise IncorrectLeaseDatesException(end_date, start_date)
+
     if property_id := lease_data.get("property_id"):
+        # the property row is locked (SELECT ... FOR UPDATE) until the lease
+        # is committed, so the concurrent creates for the same property
+        # are serialised and every one of them sees the leases created before
         if not (
-            property_object := await if_exists(Property, "id", property_id, session)
+            property_object := await session.scalar(
+                select(Property)
+                .filter(Property.id == property_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
         ):
             raise DoesNotExist(Property.__name__, "id", property_id)
 
-        if not property_object.owner:
+        if not property_object.owner_id:
             raise PropertyWithoutOwnerException
 
+        # any lease of the property overlapping the new one is checked before
+        # the status, the property stays available until the renewed lease starts
+        # (the lease without the end date is open-ended)
+        if await session.scalar(
+            select(get_occupancy_overlap(property_id, start_date, end_date))
+        ):
+            raise ActiveLeaseException
+
         if property_object.property_status != PropertyStatusEnum.AVAILABLE:
             raise PropertyNotAvailableForRentException
 
@@ -85,23 +121,6 @@ async def create_lease(
         if not tenant_object.is_active:
             raise ServiceException("Inactive user cannot be assigned as a tenant! ")
 
-    """
-    check if there are active property leases
-    """
-    statement = select(Lease).where(
-        Lease.property_id == property_id,
-        Lease.lease_expired == False,
-        Lease.lease_expiration_date >= lease_data.get("start_date"),
-    )
-    active_property_lease_check = await session.scalars(statement)
-
-    if active_property_lease_check.unique().all():
-        raise ActiveLeaseException
-
-    start_date, end_date = lease_data.get("start_date"), lease_data.get("end_date")
-    if (start_date and end_date) and (start_date > end_date):
-        raise IncorrectLeaseDatesException(end_date, start_date)
-
     billing_period = lease_data.get("billing_period", "").value
     if billing_period and (billing_period not in BillingPeriodEnum.list_values()):
         raise IncorrectEnumValueException(
@@ -112,9 +131,11 @@ async def create_lease(
     session.add(new_lease)
     property_object.property_status = PropertyStatusEnum.RESERVED
     session.add(property_object)
+    await sync_property_occupancy(session, {property_id})
     await session.commit()
     await session.refresh(new_lease)
     await session.refresh(property_object)
+    await invalidate_cache_tags(LEASE_CACHE_TAG, PROPERTY_CACHE_TAG)
 
     return LeaseBasicOutputSchema.from_orm(new_lease)
 
@@ -122,12 +143,48 @@ async def create_lease(
 async def get_single_lease(
     session: AsyncSession, lease_id: str, output_schema: BaseModel = LeaseOutputSchema
 ) -> Union[LeaseOutputSchema, LeaseBasicOutputSchema]:
-    if not (lease_object := await if_exists(Lease, "id", lease_id, session)):
+    if not (
+        lease_object := await if_exists(
+            Lease, "id", lease_id, session, options=get_load_plan(Lease, output_schema)
+        )
+    ):
         raise DoesNotExist(Lease.__name__, "id", lease_id)
 
     return output_schema.from_orm(lease_object)
 
 
+async def get_lease_etag(session: AsyncSession, lease_id: str) -> LeaseETagSchema:
+    """
+    only the version columns of the lease and of its owner, tenant
+    and property are read (by the primary keys), the relationships
+    are not loaded
+    """
+    owner, tenant = aliased(User), aliased(User)
+    lease_row = (
+        await session.execute(
+            select(
+                Lease.owner_id,
+                Lease.tenant_id,
+                Lease.version,
+                owner.version,
+                tenant.version,
+                Property.version,
+            )
+            .outerjoin(owner, Lease.owner_id == owner.id)
+            .outerjoin(tenant, Lease.tenant_id == tenant.id)
+            .outerjoin(Property, Lease.property_id == Property.id)
+            .filter(Lease.id == lease_id)
+        )
+    ).one_or_none()
+    if lease_row is None:
+        raise DoesNotExist(Lease.__name__, "id", lease_id)
+
+    owner_id, tenant_id, *versions = lease_row
+    return LeaseETagSchema(
+        etag=get_etag(lease_id, *versions), owner_id=owner_id, tenant_id=tenant_id
+    )
+
+
 async def get_all_leases(
     session: AsyncSession,
     page_params: PageParams,
@@ -139,7 +196,7 @@ async def get_all_leases(
     output_schema: BaseModel = LeaseBasicOutputSchema,
     query_params: list[tuple] = None,
 ) -> PagedResponseSchema[LeaseBasicOutputSchema]:
-    query = select(Lease)
+    query = get_output_query(Lease, output_schema)
     if get_with_renewal_accepted:
         query = query.filter(Lease.renewal_accepted == True)
 
@@ -164,6 +221,25 @@ async def get_all_leases(
         table=Lease,
         page_params=page_params,
         session=session,
+        query_params=query_params,
+    )
+
+
+def get_leases_export(
+    session_factory: sessionmaker,
+    export_format: ExportFormatEnum,
+    query_params: list[tuple] = None,
+) -> AsyncIterator[bytes]:
+    """
+    the query is built before the streaming starts,
+    so the invalid filters are raised as the regular error response
+    """
+    query = get_output_query(Lease, LeaseBasicOutputSchema)
+    if query_params:
+        query = filter_and_sort_instances(query_params, query, Lease)
+
+    return stream_export(
+        session_factory, query.order_by(Lease.id), LeaseBasicOutputSchema, export_format
     )
 
 
@@ -197,8 +273,10 @@ async def update_single_lease(
         statement = update(Lease).filter(Lease.id == lease_id).values(**lease_data)
 
         await session.execute(statement)
+        await sync_property_occupancy(session, {lease_object.property_id} - {None})
         await session.commit()
         await session.refresh(lease_object)
+        await invalidate_cache_tags(LEASE_CACHE_TAG, PROPERTY_CACHE_TAG)
 
     return await get_single_lease(
         session, lease_id=lease_id, output_schema=LeaseBasicOutputSchema
@@ -221,6 +299,7 @@ async def manage_lease_renewal_status(
     session.add(lease_object)
     await session.commit()
     await session.refresh(lease_object)
+    await invalidate_cache_tags(LEASE_CACHE_TAG)
     return
 
 
@@ -243,102 +322,178 @@ services for running tasks
 """
 
 
-async def base_manage_lease_renewals_and_expired_statuses(
-    session: AsyncSession, lease: Lease
-) -> None:
+def get_renewed_lease_values(lease_row) -> dict:
     """
-    if lease has renewal_accepted=True, new lease is being created
-    with the adjusted start and end date
+    renewed lease starts the next day and lasts as long as the expired one,
     the rest of the lease details remain the same
     """
-    lease.lease_expired = True
-    if lease.renewal_accepted:
-        old_start_date = lease.start_date
-        old_expiration_date = lease.lease_expiration_date
-
-        date_difference = old_expiration_date - old_start_date + timedelta(days=1)
-        new_lease = Lease(
-            start_date=date.today() + timedelta(days=1),
-            end_date=date.today() + date_difference,
-            rent_amount=lease.rent_amount,
-            initial_deposit_amount=lease.initial_deposit_amount,
-            billing_period=lease.billing_period,
-            payment_bank_account=lease.payment_bank_account,
-            owner_id=lease.owner_id,
-            tenant_id=lease.tenant_id,
-            property_id=lease.property_id,
-        )
-        session.add(new_lease)
-        await session.flush()
-        new_lease.property.property_status = PropertyStatusEnum.RENTED
-        session.add(new_lease.property)
-    lease.property.property_status = PropertyStatusEnum.AVAILABLE
-    session.add(lease)
-    session.add(lease.property)
-
-
-async def manage_lease_renewals_and_expired_statuses(session: AsyncSession) -> None:
+    date_difference = (
+        lease_row.lease_expiration_date - lease_row.start_date + timedelta(days=1)
+    )
+    return {
+        "start_date": date.today() + timedelta(days=1),
+        "end_date": date.today() + date_difference,
+        "rent_amount": lease_row.rent_amount,
+        "initial_deposit_amount": lease_row.initial_deposit_amount,
+        "billing_period": lease_row.billing_period,
+        "payment_bank_account": lease_row.payment_bank_account,
+        "owner_id": lease_row.owner_id,
+        "tenant_id": lease_row.tenant_id,
+        "property_id": lease_row.property_id,
+    }
+
+
+async def manage_lease_renewals_and_expired_statuses(
+    session: AsyncSession, chunk_size: int = settings.LEASE_JOB_CHUNK_SIZE
+) -> int:
     """
-    if lease is not expired and the expiration date is bigger than the current date,
-    the lease is set as expired
+    if lease is not expired and the expiration date is smaller than the current date,
+    the lease is set as expired and its property becomes available,
+    leases with renewal_accepted=True are renewed,
+    leases are processed with the bulk statements in chunks
+    and each chunk is committed separately,
+    returns the number of expired leases
     """
-    statement = select(Lease).filter(
-        Lease.lease_expired == False, Lease.lease_expiration_date < date.today()
+    statement = (
+        select(
+            Lease.id,
+            Lease.start_date,
+            Lease.lease_expiration_date,
+            Lease.renewal_accepted,
+            Lease.rent_amount,
+            Lease.initial_deposit_amount,
+            Lease.billing_period,
+            Lease.payment_bank_account,
+            Lease.owner_id,
+            Lease.tenant_id,
+            Lease.property_id,
+        )
+        .filter(
+            Lease.lease_expired == False, Lease.lease_expiration_date < date.today()
+        )
+        .order_by(Lease.id)
+        .limit(chunk_size)
     )
-    expired_leases = await session.scalars(statement)
-    expired_leases = expired_leases.unique().all()
-    [
-        await base_manage_lease_renewals_and_expired_statuses(session, lease)
-        for lease in expired_leases
-    ]
-    await session.commit()
-
-
-async def base_manage_property_statuses_for_lease_with_the_start_date_being_today(
-    session: AsyncSession, lease: Lease
-) -> None:
-    property = await if_exists(Property, "id", lease.property.id, session)
-    property.property_status = PropertyStatusEnum.RENTED
-    session.add(property)
+    expired_leases_amount = renewed_leases_amount = 0
+    while expired_leases := (await session.execute(statement)).all():
+        await session.execute(
+            update(Lease)
+            .filter(Lease.id.in_([lease.id for lease in expired_leases]))
+            .values(lease_expired=True)
+        )
+        if renewed_leases := [
+            get_renewed_lease_values(lease)
+            for lease in expired_leases
+            if lease.renewal_accepted
+        ]:
+            await session.execute(insert(Lease), renewed_leases)
+        if property_ids := {
+            lease.property_id for lease in expired_leases if lease.property_id
+        }:
+            await session.execute(
+                update(Property)
+                .filter(Property.id.in_(property_ids))
+                .values(property_status=PropertyStatusEnum.AVAILABLE)
+            )
+            await sync_property_occupancy(session, property_ids)
+        await session.commit()
+        await invalidate_cache_tags(LEASE_CACHE_TAG, PROPERTY_CACHE_TAG)
+
+        expired_leases_amount += len(expired_leases)
+        renewed_leases_amount += len(renewed_leases)
+        logger.info(
+            "expired leases processed: %s, renewed: %s",
+            expired_leases_amount,
+            renewed_leases_amount,
+        )
+    return expired_leases_amount
 
 
 async def manage_property_statuses_for_lease_with_the_start_date_being_today(
     session: AsyncSession,
-) -> None:
+) -> int:
     """
     check the leases with the start date being the same as the current date
-    their property status is being changed to RENTED
+    (or up to LEASE_START_CATCH_UP_DAYS earlier, in case of the missed job run)
+    their property status is being changed to RENTED with the single UPDATE,
+    the properties of the leases started before are not touched anymore,
+    so the status set by the owner or admin is kept,
+    returns the number of updated properties
     """
-    statement = select(Lease).filter(
-        Lease.lease_expired == False, Lease.start_date == date.today()
+    today = date.today()
+    leases_with_the_first_day = select(Lease.property_id).filter(
+        Lease.lease_expired == False,
+        Lease.start_date.between(
+            today - timedelta(days=settings.LEASE_START_CATCH_UP_DAYS), today
+        ),
     )
-    leases_with_the_first_day = await session.scalars(statement)
-    leases_with_the_first_day = leases_with_the_first_day.unique().all()
-    [
-        await base_manage_property_statuses_for_lease_with_the_start_date_being_today(
-            session, lease
+    result = await session.execute(
+        update(Property)
+        .filter(
+            Property.id.in_(leases_with_the_first_day),
+            Property.property_status != PropertyStatusEnum.RENTED,
         )
-        for lease in leases_with_the_first_day
-    ]
+        .values(property_status=PropertyStatusEnum.RENTED)
+        .execution_options(synchronize_session=False)
+    )
     await session.commit()
+    await invalidate_cache_tags(PROPERTY_CACHE_TAG)
+    return result.rowcount
 
 
 async def manage_leases_with_incoming_payment_date(
-    session: AsyncSession, background_tasks: BackgroundTasks
-) -> None:
+    session: AsyncSession,
+    background_tasks: BackgroundTasks,
+    chunk_size: int = settings.LEASE_JOB_CHUNK_SIZE,
+) -> int:
     """
     check the leases with the next_payment_date being the same as the current date
     the payment object is being created for the and the tenant gets email with
     the link to payment (with SEND_EMAILS=True in .env)
-    such leases after that have their next_payment_date parameter updated
+    such leases after that have their next_payment_date parameter updated,
+    leases are processed in chunks by the payment generation pipeline,
+    returns the number of created payments
+
+    catch-up - the leases with the overdue next_payment_date (missed job run)
+    are billed too, each pass bills one billing period of the overdue leases
+    and the passes are repeated until no payment is created,
+    the leases whose checkout failed are skipped by the next passes of the run,
+    so Stripe is not retried for them in every pass
     """
-    statement = select(Lease).filter(
-        Lease.lease_expired == False, Lease.next_payment_date == date.today()
+    statement = (
+        select(Lease)
+        .filter(Lease.lease_expired == False, Lease.next_payment_date <= date.today())
+        .options(joinedload(Lease.tenant))
+        .order_by(Lease.id)
+        .limit(chunk_size)
     )
-    leases_with_incoming_payments = await session.scalars(statement)
-    leases_with_incoming_payments = leases_with_incoming_payments.unique().all()
-    [
-        await create_payment(session, lease, background_tasks)
-        for lease in leases_with_incoming_payments
-    ]
-    await session.commit()
+    created_payments_amount = failed_payments_amount = 0
+    failed_lease_ids = set()
+    while True:
+        created_payments_in_pass = 0
+        pass_statement = statement
+        if failed_lease_ids:
+            pass_statement = statement.filter(Lease.id.not_in(failed_lease_ids))
+        chunk_statement = pass_statement
+        while leases := (await session.scalars(chunk_statement)).unique().all():
+            payments = await create_payments(session, leases, background_tasks)
+            failed_payments = [
+                payment for payment in payments if isinstance(payment, Exception)
+            ]
+            failed_lease_ids.update(
+                lease.id
+                for lease, payment in zip(leases, payments)
+                if isinstance(payment, Exception)
+            )
+            created_payments_in_pass += len(payments) - len(failed_payments)
+            failed_payments_amount += len(failed_payments)
+            logger.info(
+                "payments created: %s, failed: %s",
+                created_payments_amount + created_payments_in_pass,
+                failed_payments_amount,
+            )
+            chunk_statement = pass_statement.filter(Lease.id > leases[-1].id)
+
+        created_payments_amount += created_payments_in_pass
+        if not created_payments_in_pass:
+            return created_payments_amount
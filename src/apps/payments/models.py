@@ -1,7 +1,17 @@
 import datetime as dt
 from decimal import Decimal
 
-from sqlalchemy import DECIMAL, Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import (
+    DECIMAL,
+    Boolean,
+    Column,
+    Date,
+    ForeignKey,
+    Integer,
+    String,
+    false,
+    literal_column,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
@@ -13,6 +23,13 @@ from src.database.db_connection import Base
 
 class Payment(Base):
     __tablename__ = "payment"
+    __sortable_fields__ = (
+        "amount",
+        "created_at",
+        "payment_date",
+        "payment_accepted",
+        "waiting_for_payment",
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -22,20 +39,31 @@ class Payment(Base):
     )
     stripe_charge_id = Column(String(length=300), nullable=True)
     amount = Column(DECIMAL, nullable=True)
-    created_at = Column(Date, nullable=True)
-    payment_date = Column(Date, nullable=True)
+    created_at = Column(Date, nullable=True, index=True)
+    payment_date = Column(Date, nullable=True, index=True)
     waiting_for_payment = Column(Boolean, nullable=False, default=True)
     payment_accepted = Column(Boolean, nullable=False, default=False)
     payment_checkout_url = Column(String(length=500), nullable=True)
+    checkout_attempt = Column(Integer, nullable=False, default=1, server_default="1")
+    checkout_failed = Column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
     lease_id = Column(
         String(length=50),
         ForeignKey("lease.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
-    lease = relationship("Lease", back_populates="payments", lazy="joined")
+    lease = relationship("Lease", back_populates="payments", lazy="raise")
     tenant_id = Column(
         String(length=50),
         ForeignKey("user.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
-    tenant = relationship("User", back_populates="payments", lazy="joined")
+    tenant = relationship("User", back_populates="payments", lazy="raise")
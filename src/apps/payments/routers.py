@@ -1,9 +1,10 @@
 from typing import Union
 
 import stripe
-from fastapi import BackgroundTasks, Depends, Request, Response, status
+from fastapi import BackgroundTasks, Depends, Query, Request, Response, status
 from fastapi.routing import APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from src.apps.payments.schemas import (
     PaymentBaseOutputSchema,
@@ -13,20 +14,27 @@ from src.apps.payments.schemas import (
 )
 from src.apps.payments.services import (
     get_all_payments,
+    get_payment_etag,
+    get_payments_export,
     get_publishable_key,
     get_single_payment,
     handle_stripe_webhook_event,
 )
-from src.apps.users.models import User
-from src.core.exceptions import AuthorizationException
+from src.apps.users.schemas import UserPrincipalSchema
+from src.core.export.enums import ExportFormatEnum
+from src.core.export.responses import ExportStreamingResponse
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.permissions import check_if_staff, check_if_staff_or_owner
-from src.dependencies.get_db import get_db
+from src.core.utils.etag import is_etag_matching
+from src.dependencies.get_db import get_db, get_session_factory
 from src.dependencies.user import authenticate_user
 from src.settings.stripe import settings
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 stripe_router = APIRouter(prefix="/stripe", tags=["stripe"])
 payment_router = APIRouter(prefix="/payments", tags=["payment"])
 
@@ -55,14 +63,34 @@ async def get_payments(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[
     PagedResponseSchema[PaymentBaseOutputSchema],
     PagedResponseSchema[PaymentOutputSchema],
 ]:
     await check_if_staff(request_user)
-    return await get_all_payments(
-        session, page_params, request.query_params.multi_items()
+    return PagedJSONResponse(
+        await get_all_payments(session, page_params, request.query_params.multi_items())
+    )
+
+
+@payment_router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+)
+async def export_payments(
+    request: Request,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> ExportStreamingResponse:
+    await check_if_staff(request_user)
+    return ExportStreamingResponse(
+        get_payments_export(
+            session_factory, export_format, request.query_params.multi_items()
+        ),
+        export_format,
+        "payments",
     )
 
 
@@ -78,14 +106,16 @@ async def get_accepted_payments(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[
     PagedResponseSchema[PaymentBaseOutputSchema],
     PagedResponseSchema[PaymentOutputSchema],
 ]:
     await check_if_staff(request_user)
-    return await get_all_payments(
-        session, page_params, request.query_params.multi_items(), get_accepted=True
+    return PagedJSONResponse(
+        await get_all_payments(
+            session, page_params, request.query_params.multi_items(), get_accepted=True
+        )
     )
 
 
@@ -101,14 +131,16 @@ async def get_waiting_payments(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[
     PagedResponseSchema[PaymentBaseOutputSchema],
     PagedResponseSchema[PaymentOutputSchema],
 ]:
     await check_if_staff(request_user)
-    return await get_all_payments(
-        session, page_params, request.query_params.multi_items(), get_waiting=True
+    return PagedJSONResponse(
+        await get_all_payments(
+            session, page_params, request.query_params.multi_items(), get_waiting=True
+        )
     )
 
 
@@ -124,16 +156,18 @@ async def get_user_payments(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[
     PagedResponseSchema[PaymentBaseOutputSchema],
     PagedResponseSchema[PaymentOutputSchema],
 ]:
-    return await get_all_payments(
-        session,
-        page_params,
-        request.query_params.multi_items(),
-        tenant_id=request_user.id,
+    return PagedJSONResponse(
+        await get_all_payments(
+            session,
+            page_params,
+            request.query_params.multi_items(),
+            tenant_id=request_user.id,
+        )
     )
 
 
@@ -143,11 +177,19 @@ async def get_user_payments(
     status_code=status.HTTP_200_OK,
 )
 async def get_payment(
+    request: Request,
+    response: Response,
     payment_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[PaymentOutputSchema, PaymentBaseOutputSchema]:
-    payment = await get_single_payment(session, payment_id)
-    if await check_if_staff_or_owner(request_user, "id", payment.tenant.id):
-        return payment
-    return AuthorizationException("You have no permissions to perform this action! ")
+    payment_etag = await get_payment_etag(session, payment_id)
+    await check_if_staff_or_owner(request_user, "id", payment_etag.tenant_id)
+
+    if is_etag_matching(request, payment_etag.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": payment_etag.etag},
+        )
+    response.headers["ETag"] = payment_etag.etag
+    return await get_single_payment(session, payment_id)
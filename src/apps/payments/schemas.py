@@ -23,6 +23,7 @@ class PaymentBaseOutputSchema(BaseModel):
 
 class PaymentOutputSchema(PaymentBaseOutputSchema):
     payment_checkout_url: Optional[str]
+    checkout_failed: bool
     stripe_charge_id: Optional[str]
     lease: LeaseBasicOutputSchema
 
@@ -50,3 +51,8 @@ class StripePublishableKeySchema(BaseModel):
 class StripeSessionSchema(BaseModel):
     session_id: str
     url: str
+
+
+class PaymentETagSchema(BaseModel):
+    etag: str
+    tenant_id: Optional[str]
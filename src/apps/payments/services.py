@@ -1,11 +1,17 @@
+import asyncio
 import datetime
-from typing import Any, Union
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
+from typing import Any, AsyncIterator, Optional, Union
 
 import stripe
 from fastapi import BackgroundTasks, Request
 from pydantic import BaseModel, BaseSettings
 from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, sessionmaker
 
 from src.apps.emails.services import (
     send_activation_email,
@@ -18,60 +24,131 @@ from src.apps.payments.schemas import (
     PaymentAwaitSchema,
     PaymentBaseOutputSchema,
     PaymentConfirmationSchema,
+    PaymentETagSchema,
     PaymentOutputSchema,
     StripePublishableKeySchema,
     StripeSessionSchema,
 )
 from src.apps.users.models import User
 from src.core.exceptions import DoesNotExist, PaymentAlreadyAccepted
+from src.core.export.enums import ExportFormatEnum
+from src.core.export.services import stream_export
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.pagination.services import paginate
+from src.core.utils.etag import get_etag
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import get_billing_period_time_span_between_payments, if_exists
+from src.core.utils.utils import generate_uuid
 from src.settings.general import settings as general_settings
 from src.settings.stripe import settings as stripe_settings
 
+logger = logging.getLogger(__name__)
 
-async def create_payment(
-    session: AsyncSession, lease: Lease, background_tasks: BackgroundTasks
-) -> PaymentOutputSchema:
+stripe_executor = ThreadPoolExecutor(
+    max_workers=stripe_settings.STRIPE_CONCURRENCY, thread_name_prefix="stripe"
+)
+
+RETRYABLE_STRIPE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.APIError,
+    stripe.error.RateLimitError,
+)
+
+
+def get_lease_next_payment_date(lease: Lease) -> Optional[datetime.date]:
     """
-    payment is created automatically and cannot be created via http request
+    the last payment is due on the lease expiration date,
+    after that the lease has no next payment date
     """
-    new_payment = Payment(
-        created_at=datetime.date.today(), lease_id=lease.id, tenant_id=lease.tenant_id
-    )
-    session.add(new_payment)
-    await session.flush()
-
-    stripe_session = await get_stripe_session_data(session, new_payment.id)
-    new_payment.payment_checkout_url = stripe_session.url
-    session.add(new_payment)
+    if (
+        lease.lease_expiration_date
+        and lease.next_payment_date >= lease.lease_expiration_date
+    ):
+        return None
 
     next_payment_date, _ = get_billing_period_time_span_between_payments(
         lease.next_payment_date, lease.billing_period
     )
-    next_payment_date = min(next_payment_date, lease.lease_expiration_date)
-    lease.next_payment_date = next_payment_date
-    session.add(lease)
+    if lease.lease_expiration_date:
+        return min(next_payment_date, lease.lease_expiration_date)
+    return next_payment_date
 
-    await session.commit()
 
-    if general_settings.SEND_EMAILS:
-        body_schema = PaymentAwaitSchema(
+async def create_payments(
+    session: AsyncSession, leases: list[Lease], background_tasks: BackgroundTasks
+) -> list[Union[Payment, stripe.error.StripeError]]:
+    """
+    payment generation pipeline - the payments are inserted and the leases
+    are updated with a single commit before any checkout session is created,
+    so no Stripe session is left without its payment, then the checkout
+    sessions of all the leases are created concurrently,
+    the payment whose checkout session could not be created is kept
+    as checkout_failed (without the checkout url), its session is created
+    when the tenant requests the checkout of the payment
+    """
+    new_payments = [
+        Payment(
+            id=generate_uuid(),
+            created_at=datetime.date.today(),
             lease_id=lease.id,
-            payment_id=new_payment.id,
             tenant_id=lease.tenant_id,
-            rent_amount=lease.rent_amount,
-            created_at=new_payment.created_at,
-            payment_checkout_url=new_payment.payment_checkout_url,
+            checkout_attempt=1,
         )
+        for lease in leases
+    ]
+    for payment, lease in zip(new_payments, leases):
+        session.add(payment)
+        lease.next_payment_date = get_lease_next_payment_date(lease)
+        session.add(lease)
+    await session.commit()
 
-        await send_awaiting_for_payment_mail(
-            lease.tenant.email, session, background_tasks, body_schema
-        )
-    return PaymentOutputSchema.from_orm(new_payment)
+    stripe_sessions = await create_checkout_sessions(list(zip(new_payments, leases)))
+
+    results = []
+    for payment, stripe_session in zip(new_payments, stripe_sessions):
+        if isinstance(stripe_session, stripe.error.StripeError):
+            payment.checkout_failed = True
+            session.add(payment)
+            results.append(stripe_session)
+            continue
+
+        payment.payment_checkout_url = stripe_session.url
+        session.add(payment)
+        results.append(payment)
+
+    await session.commit()
+
+    if general_settings.SEND_EMAILS:
+        for payment, lease in zip(results, leases):
+            if isinstance(payment, stripe.error.StripeError):
+                continue
+            body_schema = PaymentAwaitSchema(
+                lease_id=lease.id,
+                payment_id=payment.id,
+                tenant_id=lease.tenant_id,
+                rent_amount=lease.rent_amount,
+                created_at=payment.created_at,
+                payment_checkout_url=payment.payment_checkout_url,
+            )
+            await send_awaiting_for_payment_mail(
+                lease.tenant.email, session, background_tasks, body_schema
+            )
+    return results
+
+
+async def create_payment(
+    session: AsyncSession, lease: Lease, background_tasks: BackgroundTasks
+) -> PaymentOutputSchema:
+    """
+    payment is created automatically and cannot be created via http request
+    """
+    [payment] = await create_payments(session, [lease], background_tasks)
+    if isinstance(payment, stripe.error.StripeError):
+        raise payment
+
+    return await get_single_payment(session, payment.id)
 
 
 async def get_single_payment(
@@ -80,12 +157,36 @@ async def get_single_payment(
     as_staff: bool = False,
     output_schema: BaseModel = PaymentOutputSchema,
 ) -> Union[PaymentOutputSchema, PaymentBaseOutputSchema]:
-    if not (payment_object := await if_exists(Payment, "id", payment_id, session)):
+    if not (
+        payment_object := await if_exists(
+            Payment,
+            "id",
+            payment_id,
+            session,
+            options=get_load_plan(Payment, output_schema),
+        )
+    ):
         raise DoesNotExist(Payment.__name__, "id", payment_id)
 
     return output_schema.from_orm(payment_object)
 
 
+async def get_payment_etag(session: AsyncSession, payment_id: str) -> PaymentETagSchema:
+    payment_row = (
+        await session.execute(
+            select(Payment.tenant_id, Payment.version, Lease.version, User.version)
+            .outerjoin(Lease, Payment.lease_id == Lease.id)
+            .outerjoin(User, Payment.tenant_id == User.id)
+            .filter(Payment.id == payment_id)
+        )
+    ).one_or_none()
+    if payment_row is None:
+        raise DoesNotExist(Payment.__name__, "id", payment_id)
+
+    tenant_id, *versions = payment_row
+    return PaymentETagSchema(etag=get_etag(payment_id, *versions), tenant_id=tenant_id)
+
+
 async def get_all_payments(
     session: AsyncSession,
     page_params: PageParams,
@@ -98,7 +199,7 @@ async def get_all_payments(
     PagedResponseSchema[PaymentBaseOutputSchema],
     PagedResponseSchema[PaymentOutputSchema],
 ]:
-    query = select(Payment)
+    query = get_output_query(Payment, output_schema)
 
     if get_accepted:
         query = query.filter(Payment.payment_accepted == True)
@@ -118,6 +219,24 @@ async def get_all_payments(
         table=Payment,
         page_params=page_params,
         session=session,
+        query_params=query_params,
+    )
+
+
+def get_payments_export(
+    session_factory: sessionmaker,
+    export_format: ExportFormatEnum,
+    query_params: list[tuple] = None,
+) -> AsyncIterator[bytes]:
+    query = get_output_query(Payment, PaymentBaseOutputSchema)
+    if query_params:
+        query = filter_and_sort_instances(query_params, query, Payment)
+
+    return stream_export(
+        session_factory,
+        query.order_by(Payment.id),
+        PaymentBaseOutputSchema,
+        export_format,
     )
 
 
@@ -132,12 +251,33 @@ async def get_publishable_key() -> StripePublishableKeySchema:
     )
 
 
+def get_price_data(payment: Payment, rent_amount: Decimal) -> dict[str, Any]:
+    return {
+        "price_data": {
+            "currency": "usd",
+            "product_data": {
+                "name": f"Lease payment #{payment.id}",
+            },
+            "unit_amount": int(rent_amount * 100),
+        },
+        "quantity": 1,
+    }
+
+
 async def create_checkout_session(
     payment_data: dict[str, Any],
     payment: Payment,
     settings: BaseSettings = stripe_settings,
 ):
-    checkout_session = stripe.checkout.Session.create(
+    """
+    the sync Stripe SDK runs on the thread pool, connection errors,
+    rate limits and Stripe server errors are retried with the exponential backoff,
+    the payment id with its checkout attempt is the idempotency key,
+    so the retries do not duplicate the session and the next checkout
+    of the same payment gets the new session
+    """
+    create_session = partial(
+        stripe.checkout.Session.create,
         success_url=settings.PAYMENT_SUCCESS_URL,
         cancel_url=settings.PAYMENT_CANCEL_URL,
         payment_method_types=["card"],
@@ -148,35 +288,88 @@ async def create_checkout_session(
             "lease_id": payment.lease_id,
             "payment_id": payment.id,
         },
+        idempotency_key=f"{payment.id}:{payment.checkout_attempt}",
     )
-    return checkout_session
+    loop = asyncio.get_running_loop()
+    for attempt in range(settings.STRIPE_MAX_RETRIES + 1):
+        try:
+            return await loop.run_in_executor(stripe_executor, create_session)
+        except RETRYABLE_STRIPE_ERRORS:
+            if attempt == settings.STRIPE_MAX_RETRIES:
+                raise
+            await asyncio.sleep(settings.STRIPE_RETRY_BACKOFF * 2**attempt)
+
+
+async def create_checkout_sessions(
+    payments_with_leases: list[tuple[Payment, Lease]],
+    settings: BaseSettings = stripe_settings,
+) -> list[Union[StripeSessionSchema, stripe.error.StripeError]]:
+    """
+    bounded worker pool - STRIPE_CONCURRENCY workers take the payments
+    from the queue, the error is returned in place of the failed session
+    """
+    results = [None] * len(payments_with_leases)
+    queue = asyncio.Queue()
+    for index in range(len(payments_with_leases)):
+        queue.put_nowait(index)
+
+    async def worker() -> None:
+        while not queue.empty():
+            index = queue.get_nowait()
+            payment, lease = payments_with_leases[index]
+            try:
+                checkout_session = await create_checkout_session(
+                    get_price_data(payment, lease.rent_amount), payment, settings
+                )
+                results[index] = StripeSessionSchema(
+                    session_id=checkout_session["id"], url=checkout_session["url"]
+                )
+            except stripe.error.StripeError as err:
+                logger.warning(
+                    "checkout session for lease %s was not created: %s", lease.id, err
+                )
+                results[index] = err
+
+    workers_amount = min(settings.STRIPE_CONCURRENCY, len(payments_with_leases))
+    await asyncio.gather(*(worker() for _ in range(workers_amount)))
+    return results
 
 
 async def get_stripe_session_data(
     session: AsyncSession, payment_id: str
 ) -> StripeSessionSchema:
     """
-    creates stripe checkout session with the payment url
+    creates stripe checkout session with the payment url,
+    the next checkout attempt is committed before the session is created,
+    so every checkout request gets its own session
     """
 
-    if not (payment_object := await if_exists(Payment, "id", payment_id, session)):
+    if not (
+        payment_object := await if_exists(
+            Payment,
+            "id",
+            payment_id,
+            session,
+            options=(joinedload(Payment.lease),),
+        )
+    ):
         raise DoesNotExist(Payment.__name__, "id", payment_id)
 
     if payment_object.payment_accepted or (not payment_object.waiting_for_payment):
         raise PaymentAlreadyAccepted
 
-    price_data = {
-        "price_data": {
-            "currency": "usd",
-            "product_data": {
-                "name": f"Lease payment #{payment_object.id}",
-            },
-            "unit_amount": int(payment_object.lease.rent_amount * 100),
-        },
-        "quantity": 1,
-    }
+    payment_object.checkout_attempt += 1
+    session.add(payment_object)
+    await session.commit()
 
-    stripe_checkout_session = await create_checkout_session(price_data, payment_object)
+    stripe_checkout_session = await create_checkout_session(
+        get_price_data(payment_object, payment_object.lease.rent_amount),
+        payment_object,
+    )
+    payment_object.payment_checkout_url = stripe_checkout_session["url"]
+    payment_object.checkout_failed = False
+    session.add(payment_object)
+    await session.commit()
 
     return StripeSessionSchema(
         session_id=stripe_checkout_session["id"], url=stripe_checkout_session["url"]
@@ -227,7 +420,15 @@ async def fulfill_payment(
     amount = payment_intent["amount"] / 100
     stripe_charge_id = payment_intent["latest_charge"]
 
-    if not (payment_object := await if_exists(Payment, "id", payment_id, session)):
+    if not (
+        payment_object := await if_exists(
+            Payment,
+            "id",
+            payment_id,
+            session,
+            options=(joinedload(Payment.lease), joinedload(Payment.tenant)),
+        )
+    ):
         raise DoesNotExist(Payment.__name__, "id", payment_id)
 
     if payment_object.payment_accepted or (not payment_object.waiting_for_payment):
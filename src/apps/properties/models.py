@@ -2,7 +2,7 @@ import datetime as dt
 
 from sqlalchemy import DECIMAL, Boolean, Column, Date
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
@@ -13,6 +13,24 @@ from src.database.db_connection import Base
 
 class Property(Base):
     __tablename__ = "property"
+    __sortable_fields__ = (
+        "property_type",
+        "property_status",
+        "short_description",
+        "property_value",
+        "square_meter",
+        "rooms_amount",
+        "year_built",
+        "created_at",
+    )
+    __table_args__ = (
+        Index(
+            "ix_property_description_fulltext",
+            "short_description",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ),
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -26,7 +44,7 @@ class Property(Base):
     )
     short_description = Column(String(length=100), nullable=False)
     description = Column(String(length=500), unique=False, nullable=True)
-    property_value = Column(DECIMAL, nullable=False)
+    property_value = Column(DECIMAL, nullable=False, index=True)
     square_meter = Column(DECIMAL, nullable=False)
     rooms_amount = Column(Integer, nullable=True)
     year_built = Column(Integer, nullable=True)
@@ -40,9 +58,47 @@ class Property(Base):
         ForeignKey("user.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
-    owner = relationship("User", back_populates="properties", lazy="selectin")
-    created_at = Column(DateTime, default=dt.datetime.now, nullable=True)
+    owner = relationship("User", back_populates="properties", lazy="raise")
+    created_at = Column(DateTime, default=dt.datetime.now, nullable=True, index=True)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
     address = relationship(
-        "Address", uselist=False, back_populates="property", lazy="subquery"
+        "Address", uselist=False, back_populates="property", lazy="raise"
+    )
+    leases = relationship("Lease", back_populates="property", lazy="raise")
+
+
+class PropertyOccupancy(Base):
+    """
+    availability calendar - the interval of every active lease of the property
+    (open-ended lease has no end date), rebuilt from the leases
+    whenever they are created, updated or expired
+    """
+
+    __tablename__ = "property_occupancy"
+    __table_args__ = (
+        Index(
+            "ix_property_occupancy_property_id_start_date_end_date",
+            "property_id",
+            "start_date",
+            "end_date",
+        ),
+    )
+    lease_id = Column(
+        String(length=50),
+        ForeignKey("lease.id", ondelete="cascade", onupdate="cascade"),
+        primary_key=True,
+        nullable=False,
+    )
+    property_id = Column(
+        String(length=50),
+        ForeignKey("property.id", ondelete="cascade", onupdate="cascade"),
+        nullable=False,
     )
-    leases = relationship("Lease", back_populates="property", lazy="joined")
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
@@ -1,12 +1,14 @@
+from datetime import date
 from typing import Union
 
-from fastapi import Depends, Request, Response, status
+from fastapi import Depends, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.properties.schemas import (
     PropertyBasicOutputSchema,
+    PropertyDistanceOutputSchema,
     PropertyInputSchema,
     PropertyOutputSchema,
     PropertyOwnerIdSchema,
@@ -16,16 +18,29 @@ from src.apps.properties.services import (
     change_property_owner,
     create_property,
     get_all_properties,
+    get_nearby_properties,
+    get_properties_available_between,
     get_single_property,
+    search_properties,
     update_single_property,
 )
-from src.apps.users.models import User
+from src.apps.users.schemas import UserPrincipalSchema
 from src.core.pagination.models import PageParams
-from src.core.pagination.schemas import PagedResponseSchema
+from src.core.pagination.responses import PagedJSONResponse
+from src.core.pagination.schemas import FacetedPagedResponseSchema, PagedResponseSchema
 from src.core.permissions import check_if_staff, check_if_staff_or_owner
+from src.core.utils.response_cache import (
+    ADDRESS_CACHE_TAG,
+    PROPERTY_CACHE_TAG,
+    USER_CACHE_TAG,
+    get_cached_response,
+    get_permission_tier,
+)
 from src.dependencies.get_db import get_db
 from src.dependencies.user import authenticate_user
 
+NEARBY_MAX_RADIUS = 100
+
 property_router = APIRouter(prefix="/properties", tags=["property"])
 
 
@@ -37,7 +52,7 @@ property_router = APIRouter(prefix="/properties", tags=["property"])
 async def post_property(
     property: PropertyInputSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PropertyBasicOutputSchema:
     await check_if_staff(request_user)
     return await create_property(session, property)
@@ -45,39 +60,64 @@ async def post_property(
 
 @property_router.get(
     "/all",
-    response_model=PagedResponseSchema[PropertyBasicOutputSchema],
+    response_model=Union[
+        FacetedPagedResponseSchema[PropertyBasicOutputSchema],
+        PagedResponseSchema[PropertyBasicOutputSchema],
+    ],
     status_code=status.HTTP_200_OK,
 )
 async def get_every_property(
     request: Request,
+    facets: bool = False,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
-) -> PagedResponseSchema[PropertyBasicOutputSchema]:
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> Union[
+    FacetedPagedResponseSchema[PropertyBasicOutputSchema],
+    PagedResponseSchema[PropertyBasicOutputSchema],
+]:
     await check_if_staff(request_user)
-    return await get_all_properties(
-        session,
-        page_params,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_properties(
+            session,
+            page_params,
+            query_params=request.query_params.multi_items(),
+            facets=facets,
+        )
     )
 
 
 @property_router.get(
     "/",
-    response_model=PagedResponseSchema[PropertyBasicOutputSchema],
+    response_model=Union[
+        FacetedPagedResponseSchema[PropertyBasicOutputSchema],
+        PagedResponseSchema[PropertyBasicOutputSchema],
+    ],
     status_code=status.HTTP_200_OK,
 )
 async def get_available_properties(
     request: Request,
+    facets: bool = False,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
-) -> PagedResponseSchema[PropertyBasicOutputSchema]:
-    return await get_all_properties(
-        session,
-        page_params,
-        get_available=True,
-        query_params=request.query_params.multi_items(),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> Union[
+    FacetedPagedResponseSchema[PropertyBasicOutputSchema],
+    PagedResponseSchema[PropertyBasicOutputSchema],
+]:
+    return PagedJSONResponse(
+        await get_cached_response(
+            request,
+            get_permission_tier(request_user),
+            (PROPERTY_CACHE_TAG, ADDRESS_CACHE_TAG),
+            lambda: get_all_properties(
+                session,
+                page_params,
+                get_available=True,
+                query_params=request.query_params.multi_items(),
+                facets=facets,
+            ),
+        )
     )
 
 
@@ -90,14 +130,16 @@ async def get_rented_properties(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[PropertyBasicOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_properties(
-        session,
-        page_params,
-        get_rented=True,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_properties(
+            session,
+            page_params,
+            get_rented=True,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -110,13 +152,87 @@ async def get_user_owner_leases(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[PropertyBasicOutputSchema]:
-    return await get_all_properties(
-        session,
-        page_params,
-        owner_id=request_user.id,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_properties(
+            session,
+            page_params,
+            owner_id=request_user.id,
+            query_params=request.query_params.multi_items(),
+        )
+    )
+
+
+@property_router.get(
+    "/search",
+    response_model=PagedResponseSchema[PropertyBasicOutputSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def search_available_properties(
+    request: Request,
+    q: str = Query(min_length=1, max_length=100),
+    session: AsyncSession = Depends(get_db),
+    page_params: PageParams = Depends(),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> PagedResponseSchema[PropertyBasicOutputSchema]:
+    return PagedJSONResponse(
+        await search_properties(
+            session,
+            page_params,
+            q,
+            query_params=request.query_params.multi_items(),
+        )
+    )
+
+
+@property_router.get(
+    "/available-between",
+    response_model=PagedResponseSchema[PropertyBasicOutputSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_available_between_properties(
+    request: Request,
+    from_date: date = Query(alias="from"),
+    to_date: date = Query(alias="to"),
+    session: AsyncSession = Depends(get_db),
+    page_params: PageParams = Depends(),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> PagedResponseSchema[PropertyBasicOutputSchema]:
+    return PagedJSONResponse(
+        await get_properties_available_between(
+            session,
+            page_params,
+            from_date,
+            to_date,
+            query_params=request.query_params.multi_items(),
+        )
+    )
+
+
+@property_router.get(
+    "/nearby",
+    response_model=PagedResponseSchema[PropertyDistanceOutputSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_available_nearby_properties(
+    request: Request,
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    radius: float = Query(default=5, gt=0, le=NEARBY_MAX_RADIUS),
+    session: AsyncSession = Depends(get_db),
+    page_params: PageParams = Depends(),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+) -> PagedResponseSchema[PropertyDistanceOutputSchema]:
+    return PagedJSONResponse(
+        await get_nearby_properties(
+            session,
+            page_params,
+            latitude,
+            longitude,
+            radius,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -126,16 +242,24 @@ async def get_user_owner_leases(
     status_code=status.HTTP_200_OK,
 )
 async def get_property(
+    request: Request,
     property_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> Union[PropertyOutputSchema, PropertyBasicOutputSchema]:
-    property = await get_single_property(session, property_id)
-    if request_user.is_staff or getattr(request_user, "id") == property.owner_id:
-        return property
-    return await get_single_property(
-        session, property_id, output_schema=PropertyBasicOutputSchema
+    """
+    the full response is cached for every tier,
+    the basic one is projected from it for the users other than the owner
+    """
+    property = await get_cached_response(
+        request,
+        "full",
+        (PROPERTY_CACHE_TAG, ADDRESS_CACHE_TAG, USER_CACHE_TAG),
+        lambda: get_single_property(session, property_id),
     )
+    if request_user.is_staff or getattr(request_user, "id") == property["owner_id"]:
+        return property
+    return PropertyBasicOutputSchema(**property)
 
 
 @property_router.patch(
@@ -147,7 +271,7 @@ async def update_property(
     property_id: str,
     property_input: PropertyUpdateSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PropertyOutputSchema:
     property = await get_single_property(session, property_id)
     await check_if_staff_or_owner(request_user, "id", property.owner_id)
@@ -162,7 +286,7 @@ async def change_single_property_owner(
     property_id: str,
     property_schema: PropertyOwnerIdSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PropertyOutputSchema:
     await check_if_staff(request_user)
     await change_property_owner(session, property_schema, property_id)
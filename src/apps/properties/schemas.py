@@ -51,6 +51,10 @@ class PropertyBasicOutputSchema(PropertyBaseSchema):
         orm_mode = True
 
 
+class PropertyDistanceOutputSchema(PropertyBasicOutputSchema):
+    distance: float
+
+
 class PropertyOutputSchema(PropertyBasicOutputSchema):
     owner_id: Optional[str]
     owner: Optional[UserInfoOutputSchema]
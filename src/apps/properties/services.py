@@ -1,13 +1,18 @@
-from typing import Union
+from collections import Counter
+from datetime import date
+from typing import Optional, Union
 
 from pydantic import BaseModel
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, exists, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.apps.addresses.models import Address
+from src.apps.leases.models import Lease
 from src.apps.properties.enums import PropertyStatusEnum, PropertyTypeEnum
-from src.apps.properties.models import Property
+from src.apps.properties.models import Property, PropertyOccupancy
 from src.apps.properties.schemas import (
     PropertyBasicOutputSchema,
+    PropertyDistanceOutputSchema,
     PropertyInputSchema,
     PropertyOutputSchema,
     PropertyOwnerIdSchema,
@@ -17,16 +22,33 @@ from src.apps.users.models import User
 from src.core.exceptions import (
     AlreadyExists,
     DoesNotExist,
+    IncorrectDateRangeException,
     IncorrectEnumValueException,
+    InvalidCursorException,
     IsOccupied,
     OwnerAlreadyHasTheOwnershipException,
     ServiceException,
 )
 from src.core.pagination.models import PageParams
-from src.core.pagination.schemas import PagedResponseSchema
+from src.core.pagination.schemas import FacetedPagedResponseSchema, PagedResponseSchema
 from src.core.pagination.services import paginate
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.geo import (
+    get_bounding_box,
+    get_geohash_cells,
+    get_haversine_distance,
+)
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import PROPERTY_CACHE_TAG, invalidate_cache_tags
+from src.core.utils.search import get_search_match
+
+SEARCH_QUERY_PARAM = "q"
+FACETS_PARAM = "facets"
+ROOMS_AMOUNT_BUCKETS = ((1, "0-1"), (2, "2"), (3, "3"), (4, "4"))
+ROOMS_AMOUNT_LAST_BUCKET = "5+"
+AVAILABILITY_QUERY_PARAMS = ("from", "to")
+NEARBY_QUERY_PARAMS = ("latitude", "longitude", "radius")
 
 
 async def create_property(
@@ -57,6 +79,7 @@ async def create_property(
     new_property = Property(**property_data)
     session.add(new_property)
     await session.commit()
+    await invalidate_cache_tags(PROPERTY_CACHE_TAG)
 
     return PropertyBasicOutputSchema.from_orm(new_property)
 
@@ -66,12 +89,65 @@ async def get_single_property(
     property_id: str,
     output_schema: BaseModel = PropertyOutputSchema,
 ) -> Union[PropertyOutputSchema, PropertyBasicOutputSchema]:
-    if not (property_object := await if_exists(Property, "id", property_id, session)):
+    if not (
+        property_object := await if_exists(
+            Property,
+            "id",
+            property_id,
+            session,
+            options=get_load_plan(Property, output_schema),
+        )
+    ):
         raise DoesNotExist(Property.__name__, "id", property_id)
 
     return output_schema.from_orm(property_object)
 
 
+def get_rooms_amount_bucket(rooms_amount: Optional[int]) -> Optional[str]:
+    if rooms_amount is None:
+        return None
+    for max_rooms_amount, bucket in ROOMS_AMOUNT_BUCKETS:
+        if rooms_amount <= max_rooms_amount:
+            return bucket
+    return ROOMS_AMOUNT_LAST_BUCKET
+
+
+async def get_property_facets(session: AsyncSession, query) -> dict:
+    """
+    the facets of the filtered properties are counted with the single query
+    grouped by all the facet columns (the rooms amount is bucketed
+    after grouping), the amounts of every facet value are summed up from the groups
+    """
+    facet_columns = {
+        "property_type": Property.property_type,
+        "property_status": Property.property_status,
+        "rooms_amount": Property.rooms_amount,
+        "city": Address.city,
+    }
+    groups = await session.execute(
+        query.with_only_columns(*facet_columns.values(), func.count(Property.id))
+        .outerjoin(Property.address)
+        .group_by(*facet_columns.values())
+        .order_by(None)
+    )
+
+    facets = {facet_name: Counter() for facet_name in facet_columns}
+    for property_type, property_status, rooms_amount, city, amount in groups.all():
+        facet_values = (
+            property_type.value,
+            property_status.value,
+            get_rooms_amount_bucket(rooms_amount),
+            city,
+        )
+        for facet_name, facet_value in zip(facet_columns, facet_values):
+            if facet_value is not None:
+                facets[facet_name][facet_value] += amount
+    return {
+        facet_name: dict(facet_counter.most_common())
+        for facet_name, facet_counter in facets.items()
+    }
+
+
 async def get_all_properties(
     session: AsyncSession,
     page_params: PageParams,
@@ -80,8 +156,12 @@ async def get_all_properties(
     owner_id: str = None,
     output_schema: BaseModel = PropertyBasicOutputSchema,
     query_params: list[tuple] = None,
-) -> PagedResponseSchema[PropertyBasicOutputSchema]:
-    query = select(Property)
+    facets: bool = False,
+) -> Union[
+    PagedResponseSchema[PropertyBasicOutputSchema],
+    FacetedPagedResponseSchema[PropertyBasicOutputSchema],
+]:
+    query = get_output_query(Property, output_schema)
     if get_available:
         query = query.filter(Property.property_status == PropertyStatusEnum.AVAILABLE)
 
@@ -91,6 +171,217 @@ async def get_all_properties(
     if owner_id:
         query = query.filter(Property.owner_id == owner_id)
 
+    query_params = [
+        (key, value) for key, value in query_params or [] if key != FACETS_PARAM
+    ]
+    if query_params:
+        query = filter_and_sort_instances(query_params, query, Property)
+
+    page = await paginate(
+        query=query,
+        response_schema=output_schema,
+        table=Property,
+        page_params=page_params,
+        session=session,
+        query_params=query_params,
+    )
+    if not facets:
+        return page
+
+    return FacetedPagedResponseSchema[output_schema].construct(
+        **dict(page), facets=await get_property_facets(session, query)
+    )
+
+
+async def get_search_ranking(session: AsyncSession, query, search_query: str) -> tuple:
+    """
+    the properties are searched in the descriptions and the address city/country,
+    the predicates of both tables are OR'd, so MySQL can use the FULLTEXT index
+    of each table - their relevances are summed for the ordering only
+    """
+    dialect_name = (await session.connection()).dialect.name
+    property_predicate, property_relevance = get_search_match(
+        dialect_name, (Property.short_description, Property.description), search_query
+    )
+    address_predicate, address_relevance = get_search_match(
+        dialect_name, (Address.city, Address.country), search_query
+    )
+    query = query.outerjoin(Property.address).filter(
+        or_(property_predicate, address_predicate)
+    )
+    relevance = property_relevance + func.coalesce(address_relevance, 0)
+    return query, relevance.desc()
+
+
+async def search_properties(
+    session: AsyncSession,
+    page_params: PageParams,
+    search_query: str,
+    output_schema: BaseModel = PropertyBasicOutputSchema,
+    query_params: list[tuple] = None,
+) -> PagedResponseSchema[PropertyBasicOutputSchema]:
+    """
+    only the available properties are searched, the results are ordered
+    by the relevance (the cursor pagination is not supported
+    as the relevance is not the column), the filters and the sort
+    params are applied on top of the search
+    """
+    if page_params.cursor is not None:
+        raise InvalidCursorException
+
+    query = get_output_query(Property, output_schema).filter(
+        Property.property_status == PropertyStatusEnum.AVAILABLE
+    )
+    query, relevance_order = await get_search_ranking(session, query, search_query)
+    query = query.order_by(relevance_order)
+
+    query_params = [
+        (key, value) for key, value in query_params or [] if key != SEARCH_QUERY_PARAM
+    ]
+    if query_params:
+        query = filter_and_sort_instances(query_params, query, Property)
+
+    return await paginate(
+        query=query,
+        response_schema=output_schema,
+        table=Property,
+        page_params=page_params,
+        session=session,
+        query_params=query_params,
+    )
+
+
+async def get_nearby_properties(
+    session: AsyncSession,
+    page_params: PageParams,
+    latitude: float,
+    longitude: float,
+    radius: float,
+    query_params: list[tuple] = None,
+) -> PagedResponseSchema[PropertyDistanceOutputSchema]:
+    """
+    the available properties placed within the radius (in km) sorted by the distance,
+    the candidates are selected by the bounding box of the circle (the geohash
+    prefixes of the box use the geohash index), the haversine distance
+    is calculated by the database, so only the rows of the page are fetched,
+    the filter params are applied and the sort params are placed before the distance
+    """
+    if page_params.cursor is not None:
+        raise InvalidCursorException
+
+    bounding_box = get_bounding_box(latitude, longitude, radius)
+    distance = get_haversine_distance(
+        latitude, longitude, Address.latitude, Address.longitude
+    )
+    query = (
+        get_output_query(Property, PropertyBasicOutputSchema)
+        .add_columns(func.round(distance, 3).label("distance"))
+        .join(Property.address)
+        .filter(
+            Property.property_status == PropertyStatusEnum.AVAILABLE,
+            Address.latitude.between(
+                bounding_box.min_latitude, bounding_box.max_latitude
+            ),
+            Address.longitude.between(
+                bounding_box.min_longitude, bounding_box.max_longitude
+            ),
+            distance <= radius,
+        )
+    )
+    if geohash_cells := get_geohash_cells(bounding_box):
+        query = query.filter(
+            or_(*[Address.geohash.startswith(cell) for cell in geohash_cells])
+        )
+
+    query_params = [
+        (key, value)
+        for key, value in query_params or []
+        if key not in NEARBY_QUERY_PARAMS
+    ]
+    if query_params:
+        query = filter_and_sort_instances(query_params, query, Property)
+
+    return await paginate(
+        query=query.order_by(distance),
+        response_schema=PropertyDistanceOutputSchema,
+        table=Property,
+        page_params=page_params,
+        session=session,
+        query_params=query_params,
+    )
+
+
+async def sync_property_occupancy(session: AsyncSession, property_ids: set) -> None:
+    """
+    the occupancy intervals of the properties are rebuilt from their active
+    leases, it is called before the lease changes are committed,
+    so the calendar is changed in the same transaction
+    """
+    if not property_ids:
+        return
+    await session.flush()
+    await session.execute(
+        delete(PropertyOccupancy).filter(
+            PropertyOccupancy.property_id.in_(property_ids)
+        )
+    )
+    await session.execute(
+        insert(PropertyOccupancy).from_select(
+            ["lease_id", "property_id", "start_date", "end_date"],
+            select(
+                Lease.id,
+                Lease.property_id,
+                Lease.start_date,
+                Lease.lease_expiration_date,
+            ).filter(Lease.property_id.in_(property_ids), Lease.lease_expired == False),
+        )
+    )
+
+
+def get_occupancy_overlap(property_id, from_date: date, to_date: Optional[date]):
+    """
+    EXISTS of the occupancy interval overlapping the window (both ends included),
+    the window without the end date (open-ended lease) overlaps every interval
+    ending after its start
+    """
+    conditions = [
+        PropertyOccupancy.property_id == property_id,
+        or_(
+            PropertyOccupancy.end_date.is_(None),
+            PropertyOccupancy.end_date >= from_date,
+        ),
+    ]
+    if to_date is not None:
+        conditions.append(PropertyOccupancy.start_date <= to_date)
+    return exists().where(*conditions)
+
+
+async def get_properties_available_between(
+    session: AsyncSession,
+    page_params: PageParams,
+    from_date: date,
+    to_date: date,
+    output_schema: BaseModel = PropertyBasicOutputSchema,
+    query_params: list[tuple] = None,
+) -> PagedResponseSchema[PropertyBasicOutputSchema]:
+    """
+    the properties (except the unavailable ones) without any occupancy interval
+    overlapping the window, the NOT EXISTS subquery is answered
+    with the property_id, start_date, end_date index of the calendar
+    """
+    if from_date > to_date:
+        raise IncorrectDateRangeException(from_date, to_date)
+
+    query = get_output_query(Property, output_schema).filter(
+        Property.property_status != PropertyStatusEnum.UNAVAILABLE,
+        ~get_occupancy_overlap(Property.id, from_date, to_date),
+    )
+
+    query_params = [
+        (key, value)
+        for key, value in query_params or []
+        if key not in AVAILABILITY_QUERY_PARAMS
+    ]
     if query_params:
         query = filter_and_sort_instances(query_params, query, Property)
 
@@ -100,6 +391,7 @@ async def get_all_properties(
         table=Property,
         page_params=page_params,
         session=session,
+        query_params=query_params,
     )
 
 
@@ -133,6 +425,7 @@ async def update_single_property(
     await session.execute(statement)
     await session.commit()
     await session.refresh(property_object)
+    await invalidate_cache_tags(PROPERTY_CACHE_TAG)
 
     return await get_single_property(session, property_id=property_id)
 
@@ -162,4 +455,5 @@ async def change_property_owner(
     session.add(property_object)
     await session.commit()
     await session.refresh(property_object)
+    await invalidate_cache_tags(PROPERTY_CACHE_TAG)
     return
@@ -1,6 +1,14 @@
 import datetime as dt
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    ForeignKey,
+    Integer,
+    String,
+    literal_column,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
@@ -11,6 +19,13 @@ from src.database.db_connection import Base
 
 class User(Base):
     __tablename__ = "user"
+    __sortable_fields__ = (
+        "first_name",
+        "last_name",
+        "email",
+        "birth_date",
+        "created_at",
+    )
     id = Column(
         String(length=50),
         primary_key=True,
@@ -20,7 +35,7 @@ class User(Base):
         default=generate_uuid,
     )
     first_name = Column(String(length=50), nullable=False)
-    last_name = Column(String(length=75), nullable=False)
+    last_name = Column(String(length=75), nullable=False, index=True)
     email = Column(String(length=100), unique=True, nullable=False)
     password = Column(String(length=60), nullable=True)
     birth_date = Column(Date, nullable=False)
@@ -28,18 +43,25 @@ class User(Base):
     is_superuser = Column(Boolean, nullable=False, default=False)
     is_staff = Column(Boolean, nullable=False, default=False)
     phone_number = Column(String(length=50), nullable=False)
-    created_at = Column(DateTime, default=dt.datetime.now, nullable=True)
-    properties = relationship("Property", back_populates="owner", lazy="joined")
+    created_at = Column(DateTime, default=dt.datetime.now, nullable=True, index=True)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
+    properties = relationship("Property", back_populates="owner", lazy="raise")
     company_id = Column(
         String(length=50),
         ForeignKey("company.id", ondelete="SET NULL", onupdate="cascade"),
         nullable=True,
     )
-    company = relationship("Company", back_populates="users", lazy="joined")
+    company = relationship("Company", back_populates="users", lazy="raise")
     owner_leases = relationship(
-        "Lease", back_populates="owner", lazy="joined", foreign_keys="Lease.owner_id"
+        "Lease", back_populates="owner", lazy="raise", foreign_keys="Lease.owner_id"
     )
     tenant_leases = relationship(
-        "Lease", back_populates="tenant", lazy="joined", foreign_keys="Lease.tenant_id"
+        "Lease", back_populates="tenant", lazy="raise", foreign_keys="Lease.tenant_id"
     )
-    payments = relationship("Payment", back_populates="tenant", lazy="joined")
+    payments = relationship("Payment", back_populates="tenant", lazy="raise")
@@ -8,11 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.jwt.schemas import AccessTokenOutputSchema
 from src.apps.leases.services import get_all_leases
-from src.apps.users.models import User
 from src.apps.users.schemas import (
     UserInfoOutputSchema,
     UserLoginInputSchema,
     UserOutputSchema,
+    UserPrincipalSchema,
     UserRegisterSchema,
     UserUpdateSchema,
 )
@@ -28,6 +28,7 @@ from src.apps.users.services.user_services import (
     update_single_user,
 )
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.permissions import check_if_staff, check_if_staff_or_owner
 from src.dependencies.get_db import get_db
@@ -87,9 +88,10 @@ async def login_user(
     response_model=UserOutputSchema,
 )
 async def get_logged_user(
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
+    session: AsyncSession = Depends(get_db),
 ) -> UserOutputSchema:
-    return UserOutputSchema.from_orm(request_user)
+    return await get_single_user(session, request_user.id)
 
 
 @user_router.get(
@@ -101,14 +103,16 @@ async def get_users(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[UserInfoOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_users(
-        session,
-        page_params,
-        output_schema=UserInfoOutputSchema,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_users(
+            session,
+            page_params,
+            output_schema=UserInfoOutputSchema,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -121,14 +125,16 @@ async def get_every_user(
     request: Request,
     session: AsyncSession = Depends(get_db),
     page_params: PageParams = Depends(),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> PagedResponseSchema[UserOutputSchema]:
     await check_if_staff(request_user)
-    return await get_all_users(
-        session,
-        page_params,
-        only_active=False,
-        query_params=request.query_params.multi_items(),
+    return PagedJSONResponse(
+        await get_all_users(
+            session,
+            page_params,
+            only_active=False,
+            query_params=request.query_params.multi_items(),
+        )
     )
 
 
@@ -139,7 +145,7 @@ async def get_every_user(
 async def get_user(
     user_id: str,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> UserOutputSchema:
     await check_if_staff(request_user)
     return await get_single_user(session, user_id)
@@ -154,7 +160,7 @@ async def update_user(
     user_id: str,
     user_input: UserUpdateSchema,
     session: AsyncSession = Depends(get_db),
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
 ) -> UserInfoOutputSchema:
     if await check_if_staff_or_owner(request_user, "id", user_id):
         return await update_single_user(session, user_input, user_id)
@@ -166,7 +172,7 @@ async def update_user(
 )
 async def deactivate_user(
     user_id: str,
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
     session: AsyncSession = Depends(get_db),
 ) -> JSONResponse:
     await check_if_staff(request_user)
@@ -184,7 +190,7 @@ async def deactivate_user(
 )
 async def activate_user(
     user_id: str,
-    request_user: User = Depends(authenticate_user),
+    request_user: UserPrincipalSchema = Depends(authenticate_user),
     session: AsyncSession = Depends(get_db),
 ) -> JSONResponse:
     await check_if_staff(request_user)
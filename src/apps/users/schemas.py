@@ -104,3 +104,15 @@ class UserOutputSchema(UserInputSchema):
 
 class UserIdSchema(BaseModel):
     id: str
+
+
+class UserPrincipalSchema(BaseModel):
+    id: str
+    email: EmailStr
+    company_id: Optional[str]
+    is_active: bool
+    is_staff: bool
+    is_superuser: bool
+
+    class Config:
+        orm_mode = True
@@ -15,6 +15,7 @@ from src.apps.users.schemas import (
     UserPasswordSchema,
     UserUpdateSchema,
 )
+from src.apps.users.services.principal_services import invalidate_user_principal
 from src.core.exceptions import (
     AccountAlreadyActivatedException,
     AccountAlreadyDeactivatedException,
@@ -31,6 +32,7 @@ from src.core.pagination.services import paginate
 from src.core.utils.crypt import hash_user_password, passwd_context
 from src.core.utils.email import confirm_token
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import USER_CACHE_TAG, invalidate_cache_tags
 
 
 async def manage_activation_status(
@@ -52,6 +54,8 @@ async def manage_activation_status(
     session.add(user_object)
 
     await session.commit()
+    await invalidate_user_principal(user_object.email)
+    await invalidate_cache_tags(USER_CACHE_TAG)
 
 
 async def activate_single_user(
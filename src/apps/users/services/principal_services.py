@@ -0,0 +1,48 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.users.models import User
+from src.apps.users.schemas import UserPrincipalSchema
+from src.core.utils.cache import get_cache_backend
+from src.settings.general import settings
+
+principal_cache = get_cache_backend(
+    "principal", settings.PRINCIPAL_CACHE_TTL, settings.PRINCIPAL_CACHE_MAX_SIZE
+)
+
+
+async def get_user_principal(
+    session: AsyncSession, email: str
+) -> Optional[UserPrincipalSchema]:
+    """
+    authenticated user is cached by the JWT subject (email),
+    only the fields needed by the permission checks are stored
+    """
+    if cached_principal := await principal_cache.get(email):
+        return UserPrincipalSchema(**cached_principal)
+
+    statement = select(
+        User.id,
+        User.email,
+        User.company_id,
+        User.is_active,
+        User.is_staff,
+        User.is_superuser,
+    ).filter(User.email == email)
+    user = (await session.execute(statement.limit(1))).mappings().first()
+    if not user:
+        return None
+
+    principal = UserPrincipalSchema(**user)
+    await principal_cache.set(email, principal.dict())
+    return principal
+
+
+async def invalidate_user_principal(email: str) -> None:
+    """
+    called after the commit of any change of the cached fields,
+    in-process cache of the other workers expires after PRINCIPAL_CACHE_TTL
+    """
+    await principal_cache.delete(email)
@@ -17,6 +17,7 @@ from src.apps.users.schemas import (
     UserRegisterSchema,
     UserUpdateSchema,
 )
+from src.apps.users.services.principal_services import invalidate_user_principal
 from src.core.exceptions import (
     AccountAlreadyActivatedException,
     AccountAlreadyDeactivatedException,
@@ -29,9 +30,11 @@ from src.core.exceptions import (
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.pagination.services import paginate
-from src.core.utils.crypt import hash_user_password, passwd_context
+from src.core.utils.crypt import hash_user_password, verify_user_password
 from src.core.utils.filter import filter_and_sort_instances
+from src.core.utils.load_plan import get_load_plan, get_output_query
 from src.core.utils.orm import if_exists
+from src.core.utils.response_cache import USER_CACHE_TAG, invalidate_cache_tags
 from src.settings.general import settings
 
 
@@ -39,14 +42,14 @@ async def create_user_base(
     session: AsyncSession, user_input: UserRegisterSchema
 ) -> User:
     user_data = user_input.dict()
+    if email_check := await if_exists(User, "email", user_data.get("email"), session):
+        raise AlreadyExists(User.__name__, "email", email_check.email)
+
     if user_data.pop("password_repeat"):
         user_data["password"] = await hash_user_password(
             password=user_data.pop("password")
         )
 
-    if email_check := await if_exists(User, "email", user_data.get("email"), session):
-        raise AlreadyExists(User.__name__, "email", email_check.email)
-
     new_user = User(**user_data)
     return new_user
 
@@ -79,7 +82,7 @@ async def authenticate(
     user = await session.scalar(
         select(User).filter(User.email == login_data["email"]).limit(1)
     )
-    if not (user and passwd_context.verify(login_data["password"], user.password)):
+    if not (user and await verify_user_password(login_data["password"], user.password)):
         raise AuthenticationException("Invalid Credentials")
     if not user.is_active:
         raise AccountNotActivatedException("email", login_data["email"])
@@ -99,7 +102,11 @@ async def get_access_token_schema(
 async def get_single_user(
     session: AsyncSession, user_id: str, output_schema: BaseModel = UserOutputSchema
 ) -> BaseModel:
-    if not (user_object := await if_exists(User, "id", user_id, session)):
+    if not (
+        user_object := await if_exists(
+            User, "id", user_id, session, options=get_load_plan(User, output_schema)
+        )
+    ):
         raise DoesNotExist(User.__name__, "id", user_id)
 
     return output_schema.from_orm(user_object)
@@ -114,7 +121,7 @@ async def get_all_users(
 ) -> Union[
     PagedResponseSchema[UserInfoOutputSchema], PagedResponseSchema[UserOutputSchema]
 ]:
-    query = select(User)
+    query = get_output_query(User, output_schema)
     if only_active:
         query = query.filter(User.is_active == True)
 
@@ -127,13 +134,14 @@ async def get_all_users(
         table=User,
         page_params=page_params,
         session=session,
+        query_params=query_params,
     )
 
 
 async def update_single_user(
     session: AsyncSession, user_input: UserUpdateSchema, user_id: str
 ) -> UserInfoOutputSchema:
-    if not (await if_exists(User, "id", user_id, session)):
+    if not (user_object := await if_exists(User, "id", user_id, session)):
         raise DoesNotExist(User.__name__, "id", user_id)
 
     user_data = user_input.dict(exclude_unset=True, exclude_none=True)
@@ -143,6 +151,8 @@ async def update_single_user(
 
         await session.execute(statement)
         await session.commit()
+        await invalidate_user_principal(user_object.email)
+        await invalidate_cache_tags(USER_CACHE_TAG)
 
     return await get_single_user(
         session, user_id=user_id, output_schema=UserInfoOutputSchema
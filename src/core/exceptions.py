@@ -85,6 +85,20 @@ class NoSuchFieldException(ServiceException):
         super().__init__(f"Object {model_name} does not have field={field} ! ")
 
 
+class UnavailableFilterOperationException(ServiceException):
+    def __init__(self, field_name: str, operation: str) -> None:
+        super().__init__(
+            f"The filter operation {operation} is not available for the field {field_name}! "
+        )
+
+
+class IncorrectFilterValueException(ServiceException):
+    def __init__(self, field_name: str, typed_value: any) -> None:
+        super().__init__(
+            f"The value for the filter field {field_name}={typed_value} is incorrect! "
+        )
+
+
 class OwnerAlreadyHasTheOwnershipException(ServiceException):
     def __init__(self) -> None:
         super().__init__("The owner is already assigned to the property ownership! ")
@@ -125,6 +139,13 @@ class AddressAlreadyAssignedException(ServiceException):
         super().__init__(f"{object} already has address assigned! ")
 
 
+class IncorrectCoordinatesException(ServiceException):
+    def __init__(self) -> None:
+        super().__init__(
+            "Both latitude and longitude of the address have to be provided! "
+        )
+
+
 class PropertyNotAvailableForRentException(ServiceException):
     def __init__(self) -> None:
         super().__init__(
@@ -148,6 +169,13 @@ class ActiveLeaseException(ServiceException):
         )
 
 
+class IncorrectDateRangeException(ServiceException):
+    def __init__(self, from_date: date, to_date: date) -> None:
+        super().__init__(
+            f"The start of the date range ({from_date}) is later than its end ({to_date}) ! "
+        )
+
+
 class IncorrectLeaseDatesException(ServiceException):
     def __init__(self, end_date: date, start_date: date) -> None:
         super().__init__(
@@ -183,3 +211,10 @@ class UserCannotRentTheirPropertyForThemselvesException(ServiceException):
 class PaymentAlreadyAccepted(ServiceException):
     def __init__(self) -> None:
         super().__init__("Payment for your rent is already accepted!")
+
+
+class InvalidCursorException(ServiceException):
+    def __init__(self) -> None:
+        super().__init__(
+            "The pagination cursor is invalid or does not match the requested sorting! "
+        )
@@ -0,0 +1,6 @@
+from src.core.utils.enums import BaseEnum
+
+
+class ExportFormatEnum(BaseEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -0,0 +1,28 @@
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from src.core.export.enums import ExportFormatEnum
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormatEnum.CSV: "text/csv",
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+}
+
+
+class ExportStreamingResponse(StreamingResponse):
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        export_format: ExportFormatEnum,
+        filename: str,
+    ) -> None:
+        super().__init__(
+            content,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{filename}.{export_format.value}"'
+                )
+            },
+        )
@@ -0,0 +1,92 @@
+import csv
+import io
+from datetime import date
+from enum import Enum
+from typing import Any, AsyncIterator
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import Select
+
+from src.core.export.enums import ExportFormatEnum
+from src.core.utils.load_plan import is_projected_query
+from src.core.utils.serialization import get_row_builder, orjson_default
+from src.settings.general import settings
+
+
+def get_csv_columns(schema: type[BaseModel], prefix: str = "") -> list[str]:
+    """
+    the fields of the nested schemas are flattened
+    with the relationship path prefix (e.g. tenant__email)
+    """
+    columns = []
+    for name, field in schema.__fields__.items():
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            columns.extend(get_csv_columns(field.type_, f"{prefix}{name}__"))
+        else:
+            columns.append(f"{prefix}{name}")
+    return columns
+
+
+def get_csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def get_csv_row(values: dict, prefix: str = "") -> dict:
+    csv_row = {}
+    for name, value in values.items():
+        if isinstance(value, BaseModel):
+            csv_row.update(get_csv_row(value.__dict__, f"{prefix}{name}__"))
+        else:
+            csv_row[f"{prefix}{name}"] = get_csv_value(value)
+    return csv_row
+
+
+async def stream_query_results(session: AsyncSession, query: Select) -> AsyncIterator:
+    """
+    the rows are fetched with the server-side cursor in chunks
+    of EXPORT_CHUNK_SIZE, only one chunk is kept in memory
+    """
+    result = await session.stream(
+        query.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    )
+    if not is_projected_query(query):
+        result = result.scalars()
+    async for partition in result.partitions():
+        yield partition
+
+
+async def stream_export(
+    session_factory: sessionmaker,
+    query: Select,
+    output_schema: type[BaseModel],
+    export_format: ExportFormatEnum,
+) -> AsyncIterator[bytes]:
+    build_row = get_row_builder(output_schema)
+    csv_columns = get_csv_columns(output_schema)
+    buffer = io.StringIO()
+    csv_writer = csv.DictWriter(buffer, fieldnames=csv_columns)
+
+    if export_format == ExportFormatEnum.CSV:
+        csv_writer.writeheader()
+        yield buffer.getvalue().encode()
+
+    async with session_factory() as session:
+        async for partition in stream_query_results(session, query):
+            rows = [build_row(instance) for instance in partition]
+            if export_format == ExportFormatEnum.NDJSON:
+                yield b"".join(
+                    orjson.dumps(row, default=orjson_default) + b"\n" for row in rows
+                )
+                continue
+
+            buffer.seek(0)
+            buffer.truncate()
+            csv_writer.writerows(get_csv_row(row.__dict__) for row in rows)
+            yield buffer.getvalue().encode()
@@ -21,6 +21,8 @@ class AddressInputSchemaFactory(SchemaFactory):
         apartment_number: str = None,
         property_id: str = None,
         company_id: str = None,
+        latitude: float = None,
+        longitude: float = None,
     ):
         return self.schema_class(
             country=country or self.faker.country(),
@@ -32,6 +34,8 @@ class AddressInputSchemaFactory(SchemaFactory):
             apartment_number=apartment_number or self.faker.building_number(),
             company_id=company_id,
             property_id=property_id,
+            latitude=latitude,
+            longitude=longitude,
         )
 
 
@@ -1,21 +1,40 @@
 import operator
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
 from distutils.util import strtobool
 
-from sqlalchemy import Boolean, Date, Integer, cast
-from sqlalchemy.orm import aliased
-from sqlalchemy.sql.expression import Select
-
-from src.core.exceptions import NoSuchFieldException, UnavailableFilterFieldException
-
-
-class Filter(Select):
-    def __init__(self, model, inst, current_model=None):
-        self.main_model = model
-        self.inst = inst
-        self.current_model = current_model or model
-        self.field = None
-        self.filter_params = None
+from sqlalchemy import Boolean, Date, DateTime
+from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy import Integer, Numeric, String, and_
+
+from src.core.exceptions import (
+    IncorrectEnumValueException,
+    IncorrectFilterValueException,
+    UnavailableFilterOperationException,
+)
+
+COMPARISON_OPERATIONS = ("lt", "gt", "ge", "le", "eq", "ne")
+FILTER_OPERATIONS = COMPARISON_OPERATIONS + (
+    "between",
+    "in",
+    "nin",
+    "startswith",
+    "isnull",
+    "date",
+    "month",
+    "year",
+)
+
+
+class Filter:
+    """
+    compiles a single filter param to the SQL condition,
+    the value is coerced to the type of the column once - when the plan is compiled
+    """
+
+    def __init__(self, column, field: str):
+        self.column = column
+        self.field = field
 
     def __lt__(self, other):
         return self._apply_operator(operator.lt, other)
@@ -32,60 +51,120 @@ class Filter(Select):
     def __eq__(self, other):
         values = other.split(",")
         if len(values) > 1:
-            values = [self._apply_operator_base(value) for value in values]
-            return self.inst.filter(getattr(self.current_model, self.field).in_(values))
+            return self.column.in_(
+                [self._apply_operator_base(value) for value in values]
+            )
         return self._apply_operator(operator.eq, other)
 
     def __ne__(self, other):
         return self._apply_operator(operator.ne, other)
 
-    def _apply_operator_base(self, other):
-        attr_check = getattr(self.current_model, self.field)
-        if isinstance(attr_check.type, Boolean):
-            other = bool(strtobool(other))
-        if isinstance(attr_check.type, Integer):
-            other = int(other)
-        if isinstance(attr_check.type, Date):
-            other = datetime.strptime(other, "%Y-%m-%d").date()
-        else:
-            other = cast(other, attr_check.type)
-        return other
-
-    def _apply_operator(self, op, other):
-        other = self._apply_operator_base(other)
-        return self.inst.filter(op(getattr(self.current_model, self.field), other))
-
-    def set_filter_params(self, query_params: list[tuple]) -> None:
-        from src.core.utils.filter import filter_query_param_values_extractor
-
-        self.filter_params = filter_query_param_values_extractor(query_params)
+    def _filter_between(self, other):
+        values = other.split(",")
+        if len(values) != 2:
+            raise IncorrectFilterValueException(self.field, other)
+        return self.column.between(
+            *[self._apply_operator_base(value) for value in values]
+        )
+
+    def _filter_in(self, other):
+        return self.column.in_(
+            [self._apply_operator_base(value) for value in other.split(",")]
+        )
+
+    def _filter_nin(self, other):
+        return self.column.not_in(
+            [self._apply_operator_base(value) for value in other.split(",")]
+        )
+
+    def _filter_startswith(self, other):
+        """
+        the prefix is passed as the literal LIKE 'prefix%' pattern
+        (not concatenated in SQL), so the index on the column can be used
+        """
+        if not isinstance(self.column.type, String) or isinstance(
+            self.column.type, SQLAlchemyEnum
+        ):
+            raise UnavailableFilterOperationException(self.field, "startswith")
+        escaped = other.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self.column.like(f"{escaped}%", escape="\\")
+
+    def _filter_isnull(self, other):
+        try:
+            is_null = bool(strtobool(other))
+        except ValueError:
+            raise IncorrectFilterValueException(self.field, other)
+        return self.column.is_(None) if is_null else self.column.is_not(None)
 
-    def perform_filter(self, field, operation, value):
-        from src.core.utils.filter import FORBIDDEN_FIELDS, get_model_from_key_name
+    def _filter_date(self, other):
+        try:
+            start = datetime.strptime(other, "%Y-%m-%d").date()
+        except ValueError:
+            raise IncorrectFilterValueException(self.field, other)
+        return self._get_date_range_condition("date", start, start + timedelta(days=1))
 
-        if len(field.split("__")) == 1:
-            self.field = field
-            self.current_model = self.main_model
+    def _filter_month(self, other):
+        try:
+            start = datetime.strptime(other, "%Y-%m").date()
+        except ValueError:
+            raise IncorrectFilterValueException(self.field, other)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return self._get_date_range_condition("month", start, end)
 
-        else:
-            key, self.field = field.split("__")
-            self.current_model = get_model_from_key_name(self.main_model, key)
-            alias = aliased(self.current_model)
-            self.inst = self.inst.join(alias, getattr(self.main_model, key))
+    def _filter_year(self, other):
+        try:
+            start = date(int(other), 1, 1)
+            end = date(start.year + 1, 1, 1)
+        except ValueError:
+            raise IncorrectFilterValueException(self.field, other)
+        return self._get_date_range_condition("year", start, end)
+
+    def _get_date_range_condition(self, operation: str, start: date, end: date):
+        """
+        the date, month and year filters are compared with the range
+        (not with the DATE/MONTH/YEAR function) so the index on the column can be used
+        """
+        if isinstance(self.column.type, DateTime):
+            start, end = datetime.combine(start, time.min), datetime.combine(
+                end, time.min
+            )
+        elif not isinstance(self.column.type, Date):
+            raise UnavailableFilterOperationException(self.field, operation)
+        return and_(self.column >= start, self.column < end)
 
-        if self.field in FORBIDDEN_FIELDS:
-            raise UnavailableFilterFieldException
+    def _apply_operator_base(self, other):
+        column_type = self.column.type
+        try:
+            if isinstance(column_type, SQLAlchemyEnum) and column_type.enum_class:
+                return self._get_enum_member(column_type.enum_class, other)
+            if isinstance(column_type, Boolean):
+                return bool(strtobool(other))
+            if isinstance(column_type, Integer):
+                return int(other)
+            if isinstance(column_type, DateTime):
+                return datetime.fromisoformat(other)
+            if isinstance(column_type, Date):
+                return datetime.strptime(other, "%Y-%m-%d").date()
+            if isinstance(column_type, Numeric):
+                return Decimal(other)
+        except (ValueError, InvalidOperation):
+            raise IncorrectFilterValueException(self.field, other)
+        return other
 
+    def _get_enum_member(self, enum_class, other):
+        if other in enum_class.__members__:
+            return enum_class[other]
         try:
-            inst = getattr(operator, operation)(self, value)
-            result = Filter(self.main_model, inst, self.current_model)
-            return result
-        except AttributeError:
-            raise NoSuchFieldException(
-                model_name=self.current_model.__name__, field=self.field
+            return enum_class(other)
+        except ValueError:
+            raise IncorrectEnumValueException(
+                self.field, other, enum_class.list_values()
             )
 
-    def get_filtered_instances(self):
-        for param in self.filter_params:
-            self.inst = self.perform_filter(*param).inst
-        return self.inst
+    def _apply_operator(self, op, other):
+        return op(self.column, self._apply_operator_base(other))
+
+    def get_condition(self, operation: str, value: str):
+        if operation in COMPARISON_OPERATIONS:
+            return getattr(operator, operation)(self, value)
+        return getattr(self, f"_filter_{operation}")(value)
@@ -0,0 +1,7 @@
+from src.core.utils.enums import BaseEnum
+
+
+class CountModeEnum(BaseEnum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
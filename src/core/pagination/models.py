@@ -1,6 +1,26 @@
-from pydantic import BaseModel, conint
+from typing import Optional
+
+from pydantic import BaseModel, conint, validator
+
+from src.core.pagination.enums import CountModeEnum
 
 
 class PageParams(BaseModel):
     page: conint(ge=1) = 1
     size: conint(ge=1, le=100) = 10
+    cursor: Optional[str] = None
+    count: Optional[CountModeEnum] = None
+
+    @validator("count", always=True)
+    def validate_count(
+        cls, count: Optional[CountModeEnum], values: dict
+    ) -> CountModeEnum:
+        """
+        the cursor pages are not counted by default,
+        the exact count would scan every row of the query for each page
+        """
+        if count is not None:
+            return count
+        if values.get("cursor") is not None:
+            return CountModeEnum.NONE
+        return CountModeEnum.EXACT
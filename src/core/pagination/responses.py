@@ -0,0 +1,19 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from src.core.utils.serialization import orjson_default
+
+
+class PagedJSONResponse(JSONResponse):
+    """
+    the paged response returned by the router is not validated
+    against the response_model again, its results are built by paginate
+    with the fields of the output schema only and serialized with orjson
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
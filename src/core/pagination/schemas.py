@@ -1,13 +1,25 @@
-from typing import Generic, List, TypeVar
+from typing import Dict, Generic, List, Optional, TypeVar
 
 from pydantic.generics import GenericModel
 
+from src.core.pagination.enums import CountModeEnum
+
 T = TypeVar("T")
 
 
 class PagedResponseSchema(GenericModel, Generic[T]):
-    total: int
-    page: int
+    total: Optional[int]
+    count: CountModeEnum = CountModeEnum.EXACT
+    page: Optional[int]
     size: int
     results: List[T]
     has_next_page: bool
+    next_cursor: Optional[str] = None
+
+
+class FacetedPagedResponseSchema(PagedResponseSchema[T], Generic[T]):
+    """
+    facet name -> {facet value: amount of the filtered objects}
+    """
+
+    facets: Dict[str, Dict[str, int]]
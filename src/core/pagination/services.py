@@ -1,8 +1,33 @@
-from sqlalchemy import Table, func, select
+from typing import Optional
+
+from sqlalchemy import Table
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
+from src.core.exceptions import UnavailableSortFieldException
+from src.core.pagination.enums import CountModeEnum
 from src.core.pagination.models import BaseModel, PageParams
 from src.core.pagination.schemas import PagedResponseSchema, T
+from src.core.utils.load_plan import is_projected_query
+from src.core.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    get_keyset_condition,
+    get_row_cursor_values,
+    get_total_amount,
+)
+from src.core.utils.serialization import get_row_builder
+from src.core.utils.sort import get_sort_columns
+
+
+def get_query_results(query, result) -> list:
+    """
+    the projected query returns the rows of the columns,
+    the other ones the ORM instances
+    """
+    if is_projected_query(query):
+        return result.all()
+    return result.scalars().unique().all()
 
 
 async def paginate(
@@ -11,28 +36,108 @@ async def paginate(
     table: Table,
     page_params: PageParams,
     session: AsyncSession,
+    query_params: list[tuple] = None,
 ) -> PagedResponseSchema[T]:
-    total_amount = await session.scalar(
-        select(func.count()).select_from(query.subquery())
-    )
+    total_amount = await get_total_amount(query, page_params.count, session)
+
+    if page_params.cursor is not None:
+        return await paginate_by_cursor(
+            query,
+            response_schema,
+            table,
+            page_params,
+            session,
+            total_amount,
+            query_params=query_params,
+        )
 
+    # without the exact total amount, one extra row
+    # is fetched to check if the next page exists,
+    # id column is the tiebreaker so the rows are not repeated
+    # or skipped between the pages when the sorted values are equal
+    exact_count = page_params.count == CountModeEnum.EXACT
+    limit = page_params.size if exact_count else page_params.size + 1
     instances = await session.execute(
-        query.offset((page_params.page - 1) * page_params.size).limit(page_params.size)
+        query.order_by(table.id.asc())
+        .offset((page_params.page - 1) * page_params.size)
+        .limit(limit)
     )
-    instances = instances.scalars().unique().all()
+    instances = get_query_results(query, instances)
     total_on_page = len(instances)
 
-    next_page_check = (
-        total_amount - ((page_params.page - 1) * page_params.size)
-    ) > page_params.size
+    if exact_count:
+        next_page_check = (
+            total_amount - ((page_params.page - 1) * page_params.size)
+        ) > page_params.size
+    else:
+        next_page_check = total_on_page > page_params.size
 
-    return PagedResponseSchema(
+    build_row = get_row_builder(response_schema)
+    return PagedResponseSchema.construct(
         total=total_amount,
-        total_on_page=total_on_page,
+        count=page_params.count,
         page=page_params.page,
         size=page_params.size,
-        results=[
-            response_schema.from_orm(item) for item in instances[: page_params.size]
-        ],
+        results=[build_row(item) for item in instances[: page_params.size]],
+        has_next_page=next_page_check,
+    )
+
+
+async def paginate_by_cursor(
+    query,
+    response_schema: BaseModel,
+    table: Table,
+    page_params: PageParams,
+    session: AsyncSession,
+    total_amount: Optional[int],
+    query_params: list[tuple] = None,
+) -> PagedResponseSchema[T]:
+    """
+    keyset pagination - instead of skipping the rows with OFFSET
+    the rows placed after the last row of the previous page are fetched
+    (empty cursor value returns the first page), the page number
+    has no meaning for the cursor pages so it is not returned,
+    id column is the tiebreaker so the order of rows is always unique
+    """
+    sort_columns = get_sort_columns(query_params or [], table)
+    if any(column.class_ is not table for column, _ in sort_columns):
+        raise UnavailableSortFieldException
+    sort_columns.append((table.id, "asc"))
+    sort_keys = [f"{column.key}__{sort_order}" for column, sort_order in sort_columns]
+
+    if page_params.cursor:
+        cursor_values = decode_cursor(page_params.cursor, sort_keys, sort_columns)
+        query = query.filter(get_keyset_condition(sort_columns, cursor_values))
+
+    # sort columns are loaded (or selected) even if the load plan
+    # (or the projection) skips them, the cursor is built from their values
+    if is_projected_query(query):
+        selected_keys = {column.key for column in query.selected_columns}
+        query = query.add_columns(
+            *[column for column, _ in sort_columns if column.key not in selected_keys]
+        )
+    else:
+        query = query.options(*[undefer(column) for column, _ in sort_columns])
+    instances = await session.execute(
+        query.order_by(table.id.asc()).limit(page_params.size + 1)
+    )
+    instances = get_query_results(query, instances)
+    next_page_check = len(instances) > page_params.size
+    instances = instances[: page_params.size]
+
+    next_cursor = None
+    if next_page_check:
+        next_cursor = encode_cursor(
+            sort_keys, get_row_cursor_values(instances[-1], sort_columns)
+        )
+
+    build_row = get_row_builder(response_schema)
+    return PagedResponseSchema.construct(
+        total=total_amount,
+        count=page_params.count,
+        page=None,
+        size=page_params.size,
+        results=[build_row(item) for item in instances],
         has_next_page=next_page_check,
+        next_cursor=next_cursor,
     )
@@ -1,10 +1,10 @@
 from typing import Any
 
-from src.apps.users.models import User
+from src.apps.users.schemas import UserPrincipalSchema
 from src.core.exceptions import AuthorizationException
 
 
-async def check_if_superuser(request_user: User) -> bool:
+async def check_if_superuser(request_user: UserPrincipalSchema) -> bool:
     if not request_user.is_superuser:
         raise AuthorizationException(
             "You don't have superuser permissions to perform this action!"
@@ -12,7 +12,7 @@ async def check_if_superuser(request_user: User) -> bool:
     return True
 
 
-async def check_if_staff(request_user: User) -> bool:
+async def check_if_staff(request_user: UserPrincipalSchema) -> bool:
     if not request_user.is_staff:
         raise AuthorizationException(
             "You don't have staff permissions to perform this action!"
@@ -20,7 +20,9 @@ async def check_if_staff(request_user: User) -> bool:
     return True
 
 
-async def check_if_staff_or_has_permission(request_user: User, attribute: str) -> bool:
+async def check_if_staff_or_has_permission(
+    request_user: UserPrincipalSchema, attribute: str
+) -> bool:
     if not (request_user.is_staff or getattr(request_user, attribute) == True):
         raise AuthorizationException(
             "You don't have staff permissions to perform this action!"
@@ -29,7 +31,7 @@ async def check_if_staff_or_has_permission(request_user: User, attribute: str) -
 
 
 async def check_if_staff_or_owner(
-    request_user: User, attribute: str, value: Any
+    request_user: UserPrincipalSchema, attribute: str, value: Any
 ) -> bool:
     if not (request_user.is_staff or getattr(request_user, attribute) == value):
         raise AuthorizationException(
@@ -38,7 +40,9 @@ async def check_if_staff_or_owner(
     return True
 
 
-async def check_if_owner(request_user: User, attribute: str, value: Any) -> bool:
+async def check_if_owner(
+    request_user: UserPrincipalSchema, attribute: str, value: Any
+) -> bool:
     if not (getattr(request_user, attribute) == value):
         raise AuthorizationException(
             "You don't have permissions to access the resource"
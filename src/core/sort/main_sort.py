@@ -1,39 +1,21 @@
-from src.core.exceptions import NoSuchFieldException, UnavailableSortFieldException
-from src.core.utils.constants import FORBIDDEN_FIELDS
-
-
 class Sort:
-    def __init__(self, main_model, inst, current_model=None):
-        self.main_model = main_model
-        self.inst = inst
-        self.current_model = current_model
-        self.sort_params = None
-
-    def set_sort_params(self, query_params: list[tuple]) -> None:
-        from src.core.utils.sort import sort_query_param_values_extractor
+    """
+    compiles the sort param value (field__asc,other_field__desc)
+    to the sort criteria, the fields are resolved by the query plan
+    """
 
-        self.sort_params = sort_query_param_values_extractor(
-            query_params, self.current_model
-        )
+    def __init__(self, sort_value: str):
+        self.sort_value = sort_value
 
-    def get_sorted_instances(self):
-        from src.core.utils.filter import get_model_from_key_name
+    def get_criteria(self) -> list[tuple]:
+        criteria = dict()
+        for criterion in self.sort_value.split(","):
+            field, _, sort_order = criterion.rpartition("__")
+            if sort_order not in ("asc", "desc"):
+                field, sort_order = criterion, "asc"
+            criteria[field] = sort_order
+        return list(criteria.items())
 
-        if self.sort_params:
-            for field, sort_order in self.sort_params.items():
-                if len(field.split("__")) == 1:
-                    self.current_model = self.main_model
-                else:
-                    key, field = field.split("__")
-                    self.current_model = get_model_from_key_name(self.main_model, key)
-                if field in FORBIDDEN_FIELDS:
-                    raise UnavailableSortFieldException
-                try:
-                    field = getattr(self.current_model, field)
-                    statement = field.asc() if sort_order == "asc" else field.desc()
-                    self.inst = self.inst.order_by(statement)
-                except AttributeError:
-                    raise NoSuchFieldException(
-                        model_name=self.current_model.__name__, field=field
-                    )
-        return self.inst
+    @staticmethod
+    def get_order_by(column, sort_order: str):
+        return column.asc() if sort_order == "asc" else column.desc()
@@ -1,5 +1,12 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from fastapi import BackgroundTasks
 
+from src.apps.jobs.services import run_locked_job
 from src.apps.leases.services import (
     manage_lease_renewals_and_expired_statuses,
     manage_leases_with_incoming_payment_date,
@@ -7,25 +14,51 @@ from src.apps.leases.services import (
 )
 from src.dependencies.get_db import get_db
 
+"""
+the jobs are run by the standalone worker: python -m src.core.tasks,
+each job run is guarded by the job lock stored in the database,
+so the job runs once per interval even with many workers or nodes
+"""
+
+LEASE_RENEWALS_INTERVAL = timedelta(days=1)
+PROPERTY_STATUSES_INTERVAL = timedelta(days=1)
+INCOMING_PAYMENTS_INTERVAL = timedelta(hours=12)
+
 
 async def _manage_lease_renewals_and_expired_statuses():
     async for session in get_db():
-        await manage_lease_renewals_and_expired_statuses(session)
+        await run_locked_job(
+            session,
+            "manage_lease_renewals_and_expired_statuses",
+            LEASE_RENEWALS_INTERVAL,
+            manage_lease_renewals_and_expired_statuses,
+        )
 
 
 async def _manage_property_statuses_for_lease_with_the_start_date_being_today():
     async for session in get_db():
-        await manage_property_statuses_for_lease_with_the_start_date_being_today(
-            session
+        await run_locked_job(
+            session,
+            "manage_property_statuses_for_lease_with_the_start_date_being_today",
+            PROPERTY_STATUSES_INTERVAL,
+            manage_property_statuses_for_lease_with_the_start_date_being_today,
         )
 
 
 async def _manage_leases_with_incoming_payment_date():
     async for session in get_db():
-        await manage_leases_with_incoming_payment_date(session, BackgroundTasks())
+        await run_locked_job(
+            session,
+            "manage_leases_with_incoming_payment_date",
+            INCOMING_PAYMENTS_INTERVAL,
+            partial(
+                manage_leases_with_incoming_payment_date,
+                background_tasks=BackgroundTasks(),
+            ),
+        )
 
 
-scheduler = AsyncIOScheduler(job_defaults={"max_instances": 2})
+scheduler = AsyncIOScheduler(job_defaults={"max_instances": 1, "coalesce": True})
 
 
 """
@@ -36,14 +69,30 @@ scheduler.add_job(_manage_property_statuses_for_lease_with_the_start_date_being_
 """
 
 scheduler.add_job(
-    _manage_lease_renewals_and_expired_statuses, "interval", minutes=60 * 24
+    _manage_lease_renewals_and_expired_statuses,
+    "interval",
+    seconds=LEASE_RENEWALS_INTERVAL.total_seconds(),
+    next_run_time=datetime.now(),
 )
 scheduler.add_job(
     _manage_property_statuses_for_lease_with_the_start_date_being_today,
     "interval",
-    minutes=60 * 24,
+    seconds=PROPERTY_STATUSES_INTERVAL.total_seconds(),
+    next_run_time=datetime.now(),
 )
 scheduler.add_job(
-    _manage_leases_with_incoming_payment_date, "interval", minutes=60 * 12
+    _manage_leases_with_incoming_payment_date,
+    "interval",
+    seconds=INCOMING_PAYMENTS_INTERVAL.total_seconds(),
+    next_run_time=datetime.now(),
 )
-scheduler.start()
+
+
+async def run_worker() -> None:
+    scheduler.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
@@ -0,0 +1,102 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from src.settings.general import settings
+
+
+class TTLCache:
+    """
+    in-process LRU cache - entries expire after ttl seconds
+    and the least recently used entry is dropped when the cache is full
+    """
+
+    def __init__(self, ttl: int, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class InMemoryCacheBackend:
+    def __init__(self, ttl: int, max_size: int) -> None:
+        self.cache = TTLCache(ttl, max_size)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: dict) -> None:
+        self.cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    async def clear(self) -> None:
+        self.cache.clear()
+
+
+class RedisCacheBackend:
+    """
+    cache shared by all of the app workers, values are stored as JSON
+    under the keys prefixed with the namespace
+    """
+
+    def __init__(self, redis_client, namespace: str, ttl: int) -> None:
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def get_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = await self.redis_client.get(self.get_key(key))
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: dict) -> None:
+        await self.redis_client.set(self.get_key(key), json.dumps(value), ex=self.ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.redis_client.delete(self.get_key(key))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.redis_client.scan_iter(self.get_key("*"))]
+        if keys:
+            await self.redis_client.delete(*keys)
+
+
+def get_cache_backend(
+    namespace: str, ttl: int, max_size: int
+) -> Union[InMemoryCacheBackend, RedisCacheBackend]:
+    """
+    Redis backend is used when REDIS_URL is set,
+    otherwise each app worker keeps its own in-process cache
+    """
+    if not settings.REDIS_URL:
+        return InMemoryCacheBackend(ttl, max_size)
+
+    import aioredis
+
+    return RedisCacheBackend(aioredis.from_url(settings.REDIS_URL), namespace, ttl)
@@ -1,7 +1,8 @@
 from copy import copy
 
-PAGINATION_PARAMS_HEADERS = ["page", "size"]
+PAGINATION_PARAMS_HEADERS = ["page", "size", "cursor", "count"]
 SORT_PARAMS_HEADER = "sort"
+EXPORT_FORMAT_PARAMS_HEADER = "format"
 FORBIDDEN_FIELDS = [
     "id",
     "password",
@@ -21,4 +22,7 @@ FORBIDDEN_FIELDS = [
 ]
 
 PAGINATION_PARAMS_HEADERS_COPY = copy(PAGINATION_PARAMS_HEADERS)
-PARAM_HEADERS_WITHOUT_FILTERS = PAGINATION_PARAMS_HEADERS_COPY + [SORT_PARAMS_HEADER]
+PARAM_HEADERS_WITHOUT_FILTERS = PAGINATION_PARAMS_HEADERS_COPY + [
+    SORT_PARAMS_HEADER,
+    EXPORT_FORMAT_PARAMS_HEADER,
+]
@@ -1,7 +1,58 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from src.settings.general import settings
+
 passwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+"""
+bcrypt releases the GIL, so the hashing runs on the bounded thread pool
+and the event loop keeps serving the other requests,
+calls over the PASSWORD_HASHING_WORKERS limit wait in the pool queue
+"""
+password_hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+_metrics_lock = threading.Lock()
+_metrics = {"queued": 0, "running": 0, "completed": 0, "max_queued": 0}
+
+
+def get_password_hashing_metrics() -> dict[str, int]:
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def _run_measured(function: Callable, *args) -> Any:
+    with _metrics_lock:
+        _metrics["queued"] -= 1
+        _metrics["running"] += 1
+    try:
+        return function(*args)
+    finally:
+        with _metrics_lock:
+            _metrics["running"] -= 1
+            _metrics["completed"] += 1
+
+
+async def _run_in_hashing_pool(function: Callable, *args) -> Any:
+    with _metrics_lock:
+        _metrics["queued"] += 1
+        _metrics["max_queued"] = max(_metrics["max_queued"], _metrics["queued"])
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_hashing_executor, _run_measured, function, *args
+    )
+
 
 async def hash_user_password(password: str) -> str:
-    return passwd_context.hash(password)
+    return await _run_in_hashing_pool(passwd_context.hash, password)
+
+
+async def verify_user_password(password: str, hashed_password: str) -> bool:
+    return await _run_in_hashing_pool(passwd_context.verify, password, hashed_password)
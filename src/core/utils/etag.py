@@ -0,0 +1,25 @@
+import hashlib
+import json
+
+from fastapi import Request
+
+
+def get_etag(resource_id: str, *versions: int) -> str:
+    """
+    the ETag is built from the version of the resource and the versions
+    of the nested resources of the response, every UPDATE of the row
+    increments its version
+    """
+    versions_key = json.dumps([resource_id, *versions])
+    return f'"{hashlib.sha1(versions_key.encode()).hexdigest()}"'
+
+
+def is_etag_matching(request: Request, etag: str) -> bool:
+    if not (if_none_match := request.headers.get("if-none-match")):
+        return False
+
+    request_etags = {
+        request_etag.strip().removeprefix("W/")
+        for request_etag in if_none_match.split(",")
+    }
+    return "*" in request_etags or etag in request_etags
@@ -0,0 +1,124 @@
+import math
+from typing import NamedTuple
+
+from sqlalchemy import func
+
+EARTH_RADIUS = 6371.0
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+GEOHASH_MAX_CELLS = 16
+
+
+class BoundingBox(NamedTuple):
+    min_latitude: float
+    max_latitude: float
+    min_longitude: float
+    max_longitude: float
+
+
+def encode_geohash(
+    latitude: float, longitude: float, precision: int = GEOHASH_PRECISION
+) -> str:
+    """
+    the bits of the longitude and the latitude are interleaved
+    (starting with the longitude) and every 5 bits are encoded
+    as the base32 character, precision 9 is the cell of ~5 x 5 m
+    """
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bits_amount, is_longitude = [], 0, 0, True
+    while len(geohash) < precision:
+        value, value_range = (
+            (longitude, longitude_range) if is_longitude else (latitude, latitude_range)
+        )
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        is_longitude = not is_longitude
+        bits_amount += 1
+        if bits_amount == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits, bits_amount = 0, 0
+    return "".join(geohash)
+
+
+def get_geohash_cell_size(precision: int) -> tuple[float, float]:
+    latitude_bits = precision * 5 // 2
+    longitude_bits = precision * 5 - latitude_bits
+    return 180 / 2**latitude_bits, 360 / 2**longitude_bits
+
+
+def get_haversine_distance(
+    latitude: float, longitude: float, latitude_column, longitude_column
+):
+    """
+    the SQL expression of the distance (in km) between the point and the columns,
+    the argument of ASIN stays far below 1 for the radius of the nearby search,
+    so it is not clamped
+    """
+    latitude_delta = func.radians(latitude_column - latitude) / 2
+    longitude_delta = func.radians(longitude_column - longitude) / 2
+    a = func.sin(latitude_delta) * func.sin(latitude_delta) + math.cos(
+        math.radians(latitude)
+    ) * func.cos(func.radians(latitude_column)) * func.sin(longitude_delta) * func.sin(
+        longitude_delta
+    )
+    return 2 * EARTH_RADIUS * func.asin(func.sqrt(a))
+
+
+def get_bounding_box(latitude: float, longitude: float, radius: float) -> BoundingBox:
+    """
+    the box contains the whole circle of the radius (in km),
+    the longitude range is not limited when the circle
+    reaches the pole or crosses the antimeridian
+    """
+    angular_radius = radius / EARTH_RADIUS
+    latitude_delta = math.degrees(angular_radius)
+    min_latitude, max_latitude = latitude - latitude_delta, latitude + latitude_delta
+    if min_latitude <= -90 or max_latitude >= 90:
+        return BoundingBox(max(min_latitude, -90), min(max_latitude, 90), -180, 180)
+
+    longitude_delta = math.degrees(
+        math.asin(math.sin(angular_radius) / math.cos(math.radians(latitude)))
+    )
+    min_longitude, max_longitude = (
+        longitude - longitude_delta,
+        longitude + longitude_delta,
+    )
+    if min_longitude < -180 or max_longitude > 180:
+        return BoundingBox(min_latitude, max_latitude, -180, 180)
+    return BoundingBox(min_latitude, max_latitude, min_longitude, max_longitude)
+
+
+def get_geohash_cells(bounding_box: BoundingBox) -> list[str]:
+    """
+    the most precise geohash cells covering the box,
+    limited to GEOHASH_MAX_CELLS prefixes - empty list is returned
+    when the box is too big to be covered with them
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_height, cell_width = get_geohash_cell_size(precision)
+        first_row = math.floor((bounding_box.min_latitude + 90) / cell_height)
+        last_row = math.floor((bounding_box.max_latitude + 90) / cell_height)
+        first_column = math.floor((bounding_box.min_longitude + 180) / cell_width)
+        last_column = math.floor((bounding_box.max_longitude + 180) / cell_width)
+        if (last_row - first_row + 1) * (
+            last_column - first_column + 1
+        ) > GEOHASH_MAX_CELLS:
+            continue
+
+        return sorted(
+            {
+                encode_geohash(
+                    min(-90 + (row + 0.5) * cell_height, 90),
+                    min(-180 + (column + 0.5) * cell_width, 180),
+                    precision,
+                )
+                for row in range(first_row, last_row + 1)
+                for column in range(first_column, last_column + 1)
+            }
+        )
+    return []
@@ -0,0 +1,73 @@
+from functools import lru_cache
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import class_mapper, joinedload, load_only, selectinload
+from sqlalchemy.sql.expression import Select
+
+
+@lru_cache(maxsize=None)
+def get_load_plan(model, output_schema: BaseModel) -> tuple:
+    """
+    relationships are not loaded by default (lazy="raise"),
+    the load plan loads only the columns and the relationships
+    serialised by the output schema - single related objects
+    are joined and collections are loaded with the separate SELECT IN query
+    """
+    mapper = class_mapper(model)
+    columns = []
+    relationship_options = []
+
+    for field_name, field in output_schema.__fields__.items():
+        if field_name in mapper.relationships:
+            relationship = mapper.relationships[field_name]
+            nested_schema = field.type_
+            if not (
+                isinstance(nested_schema, type) and issubclass(nested_schema, BaseModel)
+            ):
+                continue
+            loader = selectinload if relationship.uselist else joinedload
+            relationship_options.append(
+                loader(getattr(model, field_name)).options(
+                    *get_load_plan(relationship.mapper.class_, nested_schema)
+                )
+            )
+            columns.extend(
+                getattr(model, mapper.get_property_by_column(column).key)
+                for column in relationship.local_columns
+                if column in mapper.columns.values()
+            )
+        elif field_name in mapper.column_attrs:
+            columns.append(getattr(model, field_name))
+
+    return (load_only(*columns), *relationship_options)
+
+
+@lru_cache(maxsize=None)
+def get_projected_columns(model, output_schema: BaseModel) -> tuple:
+    """
+    the columns of the model serialised by the output schema,
+    empty when any field of the schema is not the column of the model
+    """
+    mapper = class_mapper(model)
+    if not all(
+        field_name in mapper.column_attrs for field_name in output_schema.__fields__
+    ):
+        return ()
+    return tuple(getattr(model, field_name) for field_name in output_schema.__fields__)
+
+
+def get_output_query(model, output_schema: BaseModel) -> Select:
+    """
+    the schemas using only the columns of the model (e.g. the basic output schemas)
+    select these columns - the rows are built into the schema without creating
+    the ORM instances, the other schemas load the instances with the load plan
+    """
+    if columns := get_projected_columns(model, output_schema):
+        return select(*columns)
+    return select(model).options(*get_load_plan(model, output_schema))
+
+
+def is_projected_query(query: Select) -> bool:
+    first_column = query.column_descriptions[0]
+    return first_column["expr"] is not first_column["entity"]
@@ -0,0 +1,72 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers
+
+from src.database.db_connection import Base
+
+
+class ModelFields(NamedTuple):
+    columns: dict
+    relationships: dict
+    sortable_fields: dict
+
+
+def get_table_indexes(table) -> list[tuple]:
+    """
+    MySQL creates the index for the primary key, unique and foreign key columns,
+    FULLTEXT indexes are skipped - they are not used for filtering and sorting
+    """
+    indexes = [
+        tuple(column.name for column in index.columns)
+        for index in table.indexes
+        if index.dialect_options["mysql"]["prefix"] != "FULLTEXT"
+    ]
+    indexes.append(tuple(column.name for column in table.primary_key.columns))
+    indexes.extend(
+        (column.name,)
+        for column in table.columns
+        if column.unique or column.foreign_keys
+    )
+    return indexes
+
+
+def get_sortable_fields(model) -> dict:
+    """
+    the fields declared in __sortable_fields__ of the model,
+    the field is indexed if it is the first column of any index
+    (the sorted rows can be read from the index without the filesort)
+    """
+    indexed_columns = {
+        index[0] for index in get_table_indexes(model.__table__) if index
+    }
+    return {
+        field: getattr(model, field).property.columns[0].name in indexed_columns
+        for field in getattr(model, "__sortable_fields__", ())
+    }
+
+
+@lru_cache(maxsize=None)
+def get_model_fields(model) -> ModelFields:
+    """
+    columns, relationships and sortable fields of the model are resolved once,
+    the filter and sort plans look up the query param keys here
+    instead of walking the mapper on every request
+    """
+    mapper = inspect(model)
+    return ModelFields(
+        columns={
+            column.key: getattr(model, column.key) for column in mapper.column_attrs
+        },
+        relationships={
+            relationship.key: relationship for relationship in mapper.relationships
+        },
+        sortable_fields=get_sortable_fields(model),
+    )
+
+
+def build_model_registry() -> None:
+    configure_mappers()
+    for mapper in Base.registry.mappers:
+        get_model_fields(mapper.class_)
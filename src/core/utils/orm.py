@@ -3,15 +3,23 @@ from typing import Any
 
 from sqlalchemy import Table, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from src.apps.leases.enums import BillingPeriodEnum
 
 
 async def if_exists(
-    model_class: Table, field: str, value: Any, session: AsyncSession
+    model_class: Table,
+    field: str,
+    value: Any,
+    session: AsyncSession,
+    options: tuple = (),
 ) -> Table:
     return await session.scalar(
-        select(model_class).filter(getattr(model_class, field) == value)
+        select(model_class)
+        .filter(getattr(model_class, field) == value)
+        .options(*options)
     )
 
 
@@ -48,3 +56,15 @@ def get_billing_period_time_span_between_payments(
         time_span_in_days = 365
 
     return next_payment, time_span_in_days
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return f"EXPLAIN {compiler.process(element.statement, **kwargs)}"
@@ -0,0 +1,162 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional
+
+from sqlalchemy import Boolean, Date, DateTime
+from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy import Integer, Numeric, and_, false, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.exceptions import InvalidCursorException
+from src.core.pagination.enums import CountModeEnum
+from src.core.utils.cache import TTLCache
+from src.core.utils.orm import Explain
+from src.settings.general import settings
+
+COUNT_ESTIMATE_CACHE = TTLCache(ttl=settings.COUNT_ESTIMATE_CACHE_TTL, max_size=1024)
+
+
+def _serialize_cursor_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize_cursor_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, SQLAlchemyEnum) and column_type.enum_class:
+        return column_type.enum_class(value)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Boolean):
+        return bool(value)
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort_keys: list[str], values: list[Any]) -> str:
+    """
+    cursor is an opaque token with the sort key and the values
+    of the last returned row, the client only passes it back
+    """
+    payload = {
+        "sort": sort_keys,
+        "values": [_serialize_cursor_value(value) for value in values],
+    }
+    return base64.urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode()
+    ).decode()
+
+
+def decode_cursor(
+    cursor: str, sort_keys: list[str], sort_columns: list[tuple]
+) -> list[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = payload["values"]
+        if payload["sort"] != sort_keys or len(values) != len(sort_columns):
+            raise InvalidCursorException
+        return [
+            _deserialize_cursor_value(column, value)
+            for (column, _), value in zip(sort_columns, values)
+        ]
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise InvalidCursorException
+
+
+def get_row_cursor_values(instance, sort_columns: list[tuple]) -> list[Any]:
+    return [getattr(instance, column.key) for column, _ in sort_columns]
+
+
+def _get_column_after_value_condition(column, sort_order: str, value: Any):
+    """
+    NULL values are placed before the others in ascending order (as MySQL does)
+    """
+    if sort_order == "asc":
+        return column.isnot(None) if value is None else column > value
+    if value is None:
+        return false()
+    return or_(column < value, column.is_(None))
+
+
+def get_keyset_condition(sort_columns: list[tuple], values: list[Any]):
+    """
+    rows placed after the cursor row: the first sort column is bigger
+    or it is equal and the next one is bigger and so on
+    """
+    conditions = []
+    equal_columns = []
+    for (column, sort_order), value in zip(sort_columns, values):
+        conditions.append(
+            and_(
+                *equal_columns,
+                _get_column_after_value_condition(column, sort_order, value),
+            )
+        )
+        equal_columns.append(column.is_(None) if value is None else column == value)
+    return or_(*conditions)
+
+
+async def get_total_amount(
+    query, count_mode: CountModeEnum, session: AsyncSession
+) -> Optional[int]:
+    if count_mode == CountModeEnum.NONE:
+        return None
+
+    count_statement = select(func.count()).select_from(query.subquery())
+    if count_mode == CountModeEnum.ESTIMATE:
+        return await get_estimated_total_amount(count_statement, session)
+    return await session.scalar(count_statement)
+
+
+async def get_estimated_total_amount(count_statement, session: AsyncSession) -> int:
+    """
+    MySQL returns the row estimate from EXPLAIN without scanning the rows,
+    other databases (and the plans without any row estimate) count exactly,
+    in both cases the result is cached for COUNT_ESTIMATE_CACHE_TTL seconds
+    """
+    dialect = (await session.connection()).dialect
+    compiled_statement = count_statement.compile(dialect=dialect)
+    cache_key = f"{compiled_statement}|{compiled_statement.params!r}"
+
+    if (cached_total := COUNT_ESTIMATE_CACHE.get(cache_key)) is not None:
+        return cached_total
+
+    total_amount = None
+    if dialect.name == "mysql":
+        total_amount = await get_explain_rows_estimate(count_statement, session)
+    if total_amount is None:
+        total_amount = await session.scalar(count_statement)
+
+    COUNT_ESTIMATE_CACHE.set(cache_key, total_amount)
+    return total_amount
+
+
+async def get_explain_rows_estimate(statement, session: AsyncSession) -> Optional[int]:
+    """
+    estimated rows of the driving table (the first table of the outer select)
+    are multiplied by the percentage of rows left after the filtering,
+    the tables joined to it are skipped so the one-to-many joins
+    are not multiplied, None is returned when the plan has no row estimate
+    (e.g. "Select tables optimized away")
+    """
+    explain_rows = await session.execute(Explain(statement))
+    for row in explain_rows.mappings():
+        if row["id"] == 1 and row["rows"] is not None:
+            return round(row["rows"] * float(row["filtered"] or 100) / 100)
+    return None
@@ -0,0 +1,212 @@
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import Select
+
+from src.core.exceptions import (
+    NoSuchFieldException,
+    UnavailableFilterFieldException,
+    UnavailableSortFieldException,
+)
+from src.core.filter.main_filter import FILTER_OPERATIONS, Filter
+from src.core.sort.main_sort import Sort
+from src.core.utils.constants import (
+    FORBIDDEN_FIELDS,
+    PARAM_HEADERS_WITHOUT_FILTERS,
+    SORT_PARAMS_HEADER,
+)
+from src.core.utils.model_registry import get_model_fields
+from src.settings.general import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    joins: tuple = ()
+    conditions: tuple = ()
+    sort_columns: tuple = ()
+    order_by: tuple = ()
+    pattern: Optional[str] = None
+
+    def apply(self, query: Select) -> Select:
+        for join_target, is_outer in self.joins:
+            query = query.join(join_target, isouter=is_outer)
+        if self.conditions:
+            query = query.filter(*self.conditions)
+        if self.order_by:
+            query = query.order_by(*self.order_by)
+        return query
+
+
+class QueryPlanCompiler:
+    """
+    resolves the filter and sort keys against the model registry,
+    every relationship path (e.g. property__owner) is joined once
+    (with the alias) no matter how many params use it - the paths used
+    only for sorting are outer joined so the rows without the related
+    object are kept, one-to-many relationships are never joined,
+    they are filtered with the EXISTS subquery so the rows are not multiplied
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.joins = dict()
+        self.conditions = []
+        self.sort_columns = []
+        self.filter_fields = []
+        self.sort_fields = []
+
+    def join(self, path: tuple, relationship_attribute, target_model, is_outer: bool):
+        join_target, alias, was_outer = self.joins.get(path, (None, None, True))
+        if alias is None:
+            alias = aliased(target_model)
+            join_target = relationship_attribute.of_type(alias)
+        self.joins[path] = (join_target, alias, was_outer and is_outer)
+        return alias
+
+    def get_column(self, field_path: str, forbidden_exception, is_outer: bool):
+        """
+        returns the column and the relationships (starting from the first
+        one-to-many relationship) the filter condition is wrapped with
+        """
+        *relationship_keys, field = field_path.split("__")
+        if field in FORBIDDEN_FIELDS:
+            raise forbidden_exception
+
+        model, entity, path = self.model, self.model, tuple()
+        exists_relationships = []
+        for relationship_key in relationship_keys:
+            relationship = get_model_fields(model).relationships.get(relationship_key)
+            if relationship is None:
+                raise NoSuchFieldException(
+                    model_name=model.__name__, field=relationship_key
+                )
+
+            target_model = relationship.mapper.class_
+            if relationship.uselist or exists_relationships:
+                alias = aliased(target_model)
+                exists_relationships.append(
+                    (
+                        getattr(entity, relationship_key).of_type(alias),
+                        relationship.uselist,
+                    )
+                )
+            else:
+                path += (relationship_key,)
+                alias = self.join(
+                    path, getattr(entity, relationship_key), target_model, is_outer
+                )
+            model, entity = target_model, alias
+
+        if field not in get_model_fields(model).columns:
+            raise NoSuchFieldException(model_name=model.__name__, field=field)
+        return model, getattr(entity, field), exists_relationships
+
+    def add_filter(self, key: str, value: str) -> None:
+        field_path, _, operation = key.rpartition("__")
+        if operation not in FILTER_OPERATIONS:
+            field_path, operation = key, "eq"
+
+        _, column, exists_relationships = self.get_column(
+            field_path, UnavailableFilterFieldException, is_outer=False
+        )
+        condition = Filter(column, field_path).get_condition(operation, value)
+        for relationship_attribute, uselist in reversed(exists_relationships):
+            if uselist:
+                condition = relationship_attribute.any(condition)
+            else:
+                condition = relationship_attribute.has(condition)
+        self.conditions.append(condition)
+        self.filter_fields.append((field_path, operation))
+
+    def add_sort(self, sort_value: str) -> None:
+        """
+        only the fields declared as sortable by the model can be used,
+        sorting by the unindexed field (or the field of the joined table)
+        needs the filesort - it is rejected with REJECT_UNINDEXED_SORTS
+        or logged as the slow query
+        """
+        for field_path, sort_order in Sort(sort_value).get_criteria():
+            model, column, exists_relationships = self.get_column(
+                field_path, UnavailableSortFieldException, is_outer=True
+            )
+            sortable_fields = get_model_fields(model).sortable_fields
+            if exists_relationships or column.key not in sortable_fields:
+                raise UnavailableSortFieldException
+
+            if model is not self.model or not sortable_fields[column.key]:
+                if settings.REJECT_UNINDEXED_SORTS:
+                    raise UnavailableSortFieldException
+                logger.warning(
+                    "%s is sorted by the unindexed field %s",
+                    self.model.__name__,
+                    field_path,
+                )
+            self.sort_columns.append((column, sort_order))
+            self.sort_fields.append((field_path, sort_order))
+
+    def get_pattern(self) -> Optional[str]:
+        """
+        the pattern describes the query without the filter values
+        (model, filtered fields with the operations and the sort),
+        it is used to track the usage of the plans
+        """
+        if not (self.filter_fields or self.sort_fields):
+            return None
+        return json.dumps(
+            {
+                "model": self.model.__name__,
+                "filters": sorted(set(self.filter_fields)),
+                "sort": self.sort_fields,
+            }
+        )
+
+    def compile(self) -> QueryPlan:
+        return QueryPlan(
+            joins=tuple(
+                (join_target, is_outer)
+                for join_target, _, is_outer in self.joins.values()
+            ),
+            conditions=tuple(self.conditions),
+            sort_columns=tuple(self.sort_columns),
+            order_by=tuple(
+                Sort.get_order_by(column, sort_order)
+                for column, sort_order in self.sort_columns
+            ),
+            pattern=self.get_pattern(),
+        )
+
+
+@lru_cache(maxsize=settings.QUERY_PLAN_CACHE_SIZE)
+def compile_query_plan(
+    model, filter_params: tuple, sort_value: Optional[str]
+) -> QueryPlan:
+    compiler = QueryPlanCompiler(model)
+    for key, value in filter_params:
+        compiler.add_filter(key, value)
+    if sort_value:
+        compiler.add_sort(sort_value)
+    return compiler.compile()
+
+
+def get_query_plan(model, query_params: list[tuple]) -> QueryPlan:
+    """
+    the filters are sorted, so the same params in a different
+    order share the compiled plan, only the first sort param is used
+    """
+    filter_params = tuple(
+        sorted(
+            (key, value)
+            for key, value in query_params
+            if key not in PARAM_HEADERS_WITHOUT_FILTERS
+        )
+    )
+    sort_value = next(
+        (value for key, value in query_params if key == SORT_PARAMS_HEADER), None
+    )
+    return compile_query_plan(model, filter_params, sort_value)
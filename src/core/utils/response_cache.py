@@ -0,0 +1,98 @@
+import hashlib
+import json
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+import orjson
+from fastapi import Request
+
+from src.apps.users.schemas import UserPrincipalSchema
+from src.core.utils.cache import get_cache_backend
+from src.core.utils.serialization import orjson_default
+from src.settings.general import settings
+
+ADDRESS_CACHE_TAG = "address"
+COMPANY_CACHE_TAG = "company"
+LEASE_CACHE_TAG = "lease"
+PROPERTY_CACHE_TAG = "property"
+USER_CACHE_TAG = "user"
+
+"""
+the tag versions are kept apart from the responses,
+so they are never dropped by the LRU eviction of the responses
+"""
+response_cache = get_cache_backend(
+    "response", settings.RESPONSE_CACHE_TTL, settings.RESPONSE_CACHE_MAX_SIZE
+)
+response_cache_tags = get_cache_backend(
+    "response_tag", settings.RESPONSE_CACHE_TTL, settings.RESPONSE_CACHE_MAX_SIZE
+)
+
+
+def get_permission_tier(request_user: UserPrincipalSchema) -> str:
+    return "staff" if request_user.is_staff else "user"
+
+
+async def get_tag_versions(tags: tuple) -> list[str]:
+    return [
+        (await response_cache_tags.get(tag) or {}).get("version", "") for tag in tags
+    ]
+
+
+async def get_response_cache_key(
+    request: Request, permission_tier: str, tags: tuple
+) -> str:
+    """
+    the key is built from the route, the sorted query params, the permission tier
+    and the current versions of the tags - the responses cached
+    before the tag was invalidated are not used anymore and expire
+    """
+    key = json.dumps(
+        [
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            permission_tier,
+            await get_tag_versions(tags),
+        ]
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def get_json_compatible(response: Any) -> Any:
+    return orjson.loads(orjson.dumps(response, default=orjson_default))
+
+
+async def get_cached_response(
+    request: Request,
+    permission_tier: str,
+    tags: tuple,
+    get_response: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    returns the JSON compatible response from the cache,
+    or gets the response and caches it
+    """
+    if not settings.RESPONSE_CACHE_TTL:
+        return get_json_compatible(await get_response())
+
+    cache_key = await get_response_cache_key(request, permission_tier, tags)
+    if (cached_response := await response_cache.get(cache_key)) is not None:
+        return cached_response["response"]
+
+    response = get_json_compatible(await get_response())
+    await response_cache.set(cache_key, {"response": response})
+    return response
+
+
+async def invalidate_cache_tags(*tags: str) -> None:
+    """
+    called by the services after the commit of the changes,
+    in-process cache of the other workers expires after RESPONSE_CACHE_TTL
+    """
+    for tag in tags:
+        await response_cache_tags.set(tag, {"version": uuid4().hex})
+
+
+async def clear_response_cache() -> None:
+    await response_cache.clear()
+    await response_cache_tags.clear()
@@ -0,0 +1,45 @@
+import re
+
+from sqlalchemy import case, func, literal
+from sqlalchemy.dialects.mysql import match
+
+# MySQL FULLTEXT search skips the words shorter than 3 characters
+# (innodb_ft_min_token_size), the token search does the same
+TOKEN_MIN_LENGTH = 3
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in re.findall(r"\w+", text.lower())
+        if len(token) >= TOKEN_MIN_LENGTH
+    ]
+
+
+def get_token_relevance(columns: tuple, search_query: str):
+    """
+    the amount of the query tokens found in the columns,
+    computed by the database without the FULLTEXT indexes
+    """
+    return sum(
+        (
+            case((func.lower(column).contains(token, autoescape=True), 1), else_=0)
+            for token in set(tokenize(search_query))
+            for column in columns
+        ),
+        literal(0),
+    )
+
+
+def get_search_match(dialect_name: str, columns: tuple, search_query: str) -> tuple:
+    """
+    returns the predicate and the relevance of the search in the columns,
+    on MySQL the predicate is the bare MATCH ... AGAINST,
+    so the FULLTEXT index of the columns can be used
+    """
+    if dialect_name == "mysql":
+        relevance = match(*columns, against=search_query).in_natural_language_mode()
+        return relevance, relevance
+
+    relevance = get_token_relevance(columns, search_query)
+    return relevance > 0, relevance
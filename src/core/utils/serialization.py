@@ -0,0 +1,58 @@
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+
+
+@lru_cache(maxsize=None)
+def get_row_extractor(schema: type[BaseModel]) -> Callable[[Any], dict]:
+    """
+    compiles the function reading the fields of the schema from the ORM instance
+    (or the SQLAlchemy Row) into the dict, the plain fields are read with
+    one attrgetter call and the nested schemas are built the same way
+    """
+    field_names, nested_fields = [], []
+    for name, field in schema.__fields__.items():
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            nested_fields.append(
+                (name, get_row_builder(field.type_), field.shape != SHAPE_SINGLETON)
+            )
+        else:
+            field_names.append(name)
+
+    get_values = attrgetter(*field_names)
+    if len(field_names) == 1:
+        get_values = lambda row: (getattr(row, field_names[0]),)
+
+    def extract(row: Any) -> dict:
+        values = dict(zip(field_names, get_values(row)))
+        for name, build, is_list in nested_fields:
+            value = getattr(row, name)
+            if value is not None:
+                value = [build(item) for item in value] if is_list else build(value)
+            values[name] = value
+        return values
+
+    return extract
+
+
+@lru_cache(maxsize=None)
+def get_row_builder(schema: type[BaseModel]) -> Callable[[Any], BaseModel]:
+    """
+    the values read from the database are not validated again (from_orm validates
+    every row and FastAPI validates it one more time against the response_model),
+    the schema is constructed straight from them
+    """
+    extract = get_row_extractor(schema)
+    return lambda row: schema.construct(**extract(row))
+
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
@@ -1,4 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from src.database.db_connection import async_session
 
@@ -6,3 +7,11 @@ from src.database.db_connection import async_session
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    the body of the streamed response is sent after the session of get_db
+    is closed, the stream opens (and closes) its own session with the factory
+    """
+    return async_session
@@ -1,9 +1,9 @@
 from fastapi import Depends
 from fastapi_jwt_auth import AuthJWT
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.apps.users.models import User
+from src.apps.users.schemas import UserPrincipalSchema
+from src.apps.users.services.principal_services import get_user_principal
 from src.core.exceptions import AccountNotActivatedException, AuthenticationException
 from src.dependencies.get_db import get_db
 from src.settings.jwt_settings import AuthJWTSettings
@@ -11,10 +11,10 @@ from src.settings.jwt_settings import AuthJWTSettings
 
 async def authenticate_user(
     auth_jwt: AuthJWT = Depends(), session: AsyncSession = Depends(get_db)
-) -> User:
+) -> UserPrincipalSchema:
     auth_jwt.jwt_required()
     jwt_subject = auth_jwt.get_jwt_subject()
-    user = await session.scalar(select(User).filter(User.email == jwt_subject).limit(1))
+    user = await get_user_principal(session, jwt_subject)
     if not user:
         raise AuthenticationException("Cannot find user")
     if not user.is_active:
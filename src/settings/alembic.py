@@ -1,5 +1,7 @@
 from src.apps.addresses.models import *
 from src.apps.companies.models import *
+from src.apps.index_advisor.models import *
+from src.apps.jobs.models import *
 from src.apps.leases.models import *
 from src.apps.payments.models import *
 from src.apps.properties.models import *
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseSettings
 
 
@@ -6,6 +8,22 @@ class GeneralSettings(BaseSettings):
     authjwt_secret_key: str
     SECURITY_PASSWORD_SALT: str
     SEND_EMAILS: bool
+    COUNT_ESTIMATE_CACHE_TTL: int = 60
+    PRINCIPAL_CACHE_TTL: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 4096
+    REDIS_URL: Optional[str] = None
+    PASSWORD_HASHING_WORKERS: int = 4
+    LEASE_JOB_CHUNK_SIZE: int = 1000
+    LEASE_START_CATCH_UP_DAYS: int = 3
+    JOB_LOCK_TIMEOUT: int = 60 * 60
+    JOB_RUN_TOLERANCE: int = 60
+    QUERY_PLAN_CACHE_SIZE: int = 1024
+    REJECT_UNINDEXED_SORTS: bool = False
+    QUERY_USAGE_TRACKING: bool = True
+    QUERY_USAGE_FLUSH_INTERVAL: int = 60
+    RESPONSE_CACHE_TTL: int = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 4096
+    EXPORT_CHUNK_SIZE: int = 1000
 
     class Config:
         env_file = ".env"
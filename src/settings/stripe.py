@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseSettings
 
 
@@ -7,6 +9,10 @@ class StripeSettings(BaseSettings):
     WEBHOOK_SECRET: str
     PAYMENT_SUCCESS_URL: str
     PAYMENT_CANCEL_URL: str
+    STRIPE_API_BASE: Optional[str] = None
+    STRIPE_CONCURRENCY: int = 16
+    STRIPE_MAX_RETRIES: int = 3
+    STRIPE_RETRY_BACKOFF: float = 0.5
 
     class Config:
         env_file = ".env"
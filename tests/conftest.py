@@ -1,5 +1,6 @@
 import asyncio
 from asyncio import AbstractEventLoop
+from contextlib import asynccontextmanager
 
 import pytest
 import pytest_asyncio
@@ -10,8 +11,10 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engin
 from sqlalchemy.pool import NullPool
 
 from main import app
+from src.apps.users.services.principal_services import principal_cache
+from src.core.utils.response_cache import clear_response_cache
 from src.database.db_connection import Base
-from src.dependencies.get_db import get_db
+from src.dependencies.get_db import get_db, get_session_factory
 from src.settings.alembic import *
 from src.settings.db_settings import DatabaseSettings
 
@@ -29,6 +32,20 @@ def meta_migration():
     Base.metadata.drop_all(sync_engine)
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_principal_cache() -> None:
+    yield
+
+    await principal_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clear_response_cache_after_test() -> None:
+    yield
+
+    await clear_response_cache()
+
+
 @pytest_asyncio.fixture(scope="session")
 async def async_engine() -> AsyncEngine:
     settings = DatabaseSettings(TESTING=True)
@@ -63,6 +80,15 @@ def async_client(async_session: AsyncSession) -> AsyncClient:
     def override_get_db():
         yield async_session
 
+    @asynccontextmanager
+    async def override_session_factory():
+        yield async_session
+
+    def override_get_session_factory():
+        return override_session_factory
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
     yield AsyncClient(app=app, base_url="http://localhost:8000/api/")
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_session_factory]
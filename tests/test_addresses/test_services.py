@@ -1,11 +1,17 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.apps.addresses.schemas import AddressOutputSchema
+from src.apps.addresses.models import Address
+from src.apps.addresses.schemas import (
+    AddressGeocodingRowSchema,
+    AddressOutputSchema,
+    AddressUpdateSchema,
+)
 from src.apps.addresses.services import (
     create_address,
     get_all_addresses,
     get_single_address,
+    import_address_coordinates,
     update_single_address,
 )
 from src.apps.companies.models import Company
@@ -21,6 +27,7 @@ from src.core.exceptions import (
     AlreadyExists,
     DoesNotExist,
     IncorrectCompanyOrPropertyValueException,
+    IncorrectCoordinatesException,
     IsOccupied,
     ServiceException,
 )
@@ -30,6 +37,7 @@ from src.core.factory.address_factory import (
 )
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils.geo import encode_geohash
 from src.core.utils.orm import if_exists
 from src.core.utils.utils import generate_uuid
 from tests.test_addresses.conftest import (
@@ -141,3 +149,70 @@ async def test_raise_exception_while_updating_nonexistent_address(
     update_data = AddressUpdateSchemaFactory().generate()
     with pytest.raises(DoesNotExist):
         await update_single_address(async_session, update_data, generate_uuid())
+
+
+@pytest.mark.asyncio
+async def test_if_address_geohash_was_set_from_coordinates(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    address = await create_address(
+        async_session,
+        AddressInputSchemaFactory().generate(
+            property_id=db_properties.results[0].id, latitude=50.0614, longitude=19.9366
+        ),
+    )
+    address_object = await if_exists(Address, "id", address.id, async_session)
+    assert address_object.geohash == encode_geohash(50.0614, 19.9366)
+
+    await update_single_address(
+        async_session, AddressUpdateSchema(longitude=21.0122), address.id
+    )
+    await async_session.refresh(address_object)
+    assert address_object.latitude == 50.0614
+    assert address_object.geohash == encode_geohash(50.0614, 21.0122)
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_creating_address_with_latitude_only(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    schema = AddressInputSchemaFactory().generate(
+        property_id=db_properties.results[0].id, latitude=50.0614
+    )
+    with pytest.raises(IncorrectCoordinatesException):
+        await create_address(async_session, schema)
+
+
+@pytest.mark.asyncio
+async def test_if_address_coordinates_were_imported_from_the_most_specific_rows(
+    async_session: AsyncSession,
+    db_addresses: PagedResponseSchema[AddressOutputSchema],
+):
+    address_input = DB_PROPERTIES_ADDRESSES_SCHEMAS[0]
+    geocoding_rows = [
+        AddressGeocodingRowSchema(
+            country=address_input.country,
+            city=address_input.city,
+            postal_code="",
+            latitude=10,
+            longitude=20,
+        ),
+        AddressGeocodingRowSchema(
+            country=address_input.country,
+            city=address_input.city,
+            postal_code=address_input.postal_code,
+            latitude=11,
+            longitude=21,
+        ),
+    ]
+
+    assert await import_address_coordinates(async_session, geocoding_rows) == 1
+    address_object = await if_exists(
+        Address, "property_id", address_input.property_id, async_session
+    )
+    assert (address_object.latitude, address_object.longitude) == (11, 21)
+    assert address_object.geohash == encode_geohash(11, 21)
+
+    assert await import_address_coordinates(async_session, geocoding_rows) == 0
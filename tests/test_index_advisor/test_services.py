@@ -0,0 +1,155 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.index_advisor.models import QueryUsage
+from src.apps.index_advisor.services import (
+    IndexRecommendation,
+    flush_query_usage,
+    get_index_advisor_report,
+    get_index_recommendations,
+    get_migration_stub,
+    get_pattern_id,
+    get_placeholder_parameters,
+    query_usage_recorder,
+)
+from src.apps.leases.models import Lease
+from src.apps.properties.models import Property
+from src.apps.properties.schemas import PropertyOutputSchema
+from src.apps.properties.services import get_all_properties
+from src.core.pagination.models import PageParams
+from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils.filter import QUERY_USAGE_OPTION
+from src.core.utils.orm import if_exists
+from src.core.utils.query_plan import get_query_plan
+from tests.test_properties.conftest import db_properties
+from tests.test_users.conftest import db_staff_user, db_superuser
+
+QUERY_PARAMS = [
+    ("property_status", "AVAILABLE"),
+    ("rooms_amount__ge", "1"),
+    ("sort", "year_built__desc"),
+]
+
+
+@pytest.mark.asyncio
+async def test_if_query_usage_was_recorded_and_flushed(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    query_usage_recorder.pop_usage()
+    pattern = get_query_plan(Property, QUERY_PARAMS).pattern
+
+    for _ in range(2):
+        await get_all_properties(
+            async_session,
+            PageParams(page=1, size=5),
+            output_schema=PropertyOutputSchema,
+            query_params=QUERY_PARAMS,
+        )
+    assert query_usage_recorder.usage[pattern].calls == 2
+
+    assert await flush_query_usage(async_session) == 1
+    assert query_usage_recorder.usage == {}
+
+    await get_all_properties(
+        async_session, PageParams(page=1, size=5), query_params=QUERY_PARAMS
+    )
+    await flush_query_usage(async_session)
+
+    query_usage = await if_exists(
+        QueryUsage, "id", get_pattern_id(pattern), async_session
+    )
+    assert query_usage.model_name == Property.__name__
+    assert query_usage.calls == 3
+    assert query_usage.max_time > 0
+    assert query_usage.sample_statement.startswith("SELECT")
+    assert "AVAILABLE" not in query_usage.sample_parameters
+
+    reports = await get_index_advisor_report(async_session)
+    assert reports[0].query_usage.id == query_usage.id
+    assert reports[0].recommendations == [
+        IndexRecommendation(
+            "property", ("property_status", "year_built", "rooms_amount")
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_shift_the_query_usage_timer(
+    async_session: AsyncSession,
+):
+    query_usage_recorder.pop_usage()
+    pattern = get_query_plan(Property, QUERY_PARAMS).pattern
+    connection = await async_session.connection()
+
+    with pytest.raises(DBAPIError):
+        await connection.execute(
+            text("SELECT * FROM missing_table").execution_options(
+                **{QUERY_USAGE_OPTION: pattern}
+            )
+        )
+    await connection.execute(
+        text("SELECT 1").execution_options(**{QUERY_USAGE_OPTION: pattern})
+    )
+
+    assert QUERY_USAGE_OPTION not in (await connection.get_raw_connection()).info
+    assert query_usage_recorder.usage[pattern].calls == 1
+    assert query_usage_recorder.usage[pattern].total_time < 1000
+    query_usage_recorder.pop_usage()
+
+
+def test_if_bound_values_were_replaced_with_typed_placeholders():
+    parameters = get_placeholder_parameters(
+        ("jan@example.com", 5, 1.5, Decimal("9.99"), date(2024, 1, 2), None, True)
+    )
+    assert parameters == ["", 0, 0.0, Decimal(0), date.min, None, True]
+
+    parameters = get_placeholder_parameters(
+        {"email_1": "jan@example.com", "created_at_1": datetime(2024, 1, 2)}
+    )
+    assert parameters == {"email_1": "", "created_at_1": datetime.min}
+
+
+def test_if_index_was_recommended_with_equality_sort_and_range_columns():
+    pattern = get_query_plan(
+        Property,
+        [
+            ("rooms_amount__between", "1,3"),
+            ("property_type__in", "HOUSE,LAND"),
+            ("owner__first_name__startswith", "Jo"),
+            ("sort", "created_at__desc"),
+        ],
+    ).pattern
+
+    assert get_index_recommendations(pattern) == [
+        IndexRecommendation(
+            "property", ("property_type", "created_at", "rooms_amount")
+        ),
+        IndexRecommendation("user", ("first_name",)),
+    ]
+
+
+def test_if_index_was_not_recommended_for_indexed_pattern():
+    pattern = get_query_plan(
+        Lease, [("lease_expired", "false"), ("next_payment_date__le", "2024-01-01")]
+    ).pattern
+
+    assert get_index_recommendations(pattern) == []
+
+
+def test_if_migration_stub_creates_and_drops_recommended_indexes():
+    recommendation = IndexRecommendation("property", ("property_status", "year_built"))
+
+    migration_stub = get_migration_stub([recommendation], "abc123", "c7a91e3d5b24")
+
+    assert "revision = 'abc123'" in migration_stub
+    assert "down_revision = 'c7a91e3d5b24'" in migration_stub
+    assert "'ix_property_property_status_year_built'" in migration_stub
+    assert "['property_status', 'year_built']" in migration_stub
+    assert "op.drop_index('ix_property_property_status_year_built'" in migration_stub
+    compile(migration_stub, "migration_stub", "exec")
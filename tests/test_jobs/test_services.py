@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.jobs.models import JobRun
+from src.apps.jobs.services import acquire_job_lock, release_job_lock, run_locked_job
+from src.core.utils.orm import if_exists
+from src.settings.general import settings
+
+JOB_INTERVAL = timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_job_lock_cant_be_acquired_second_time(async_session: AsyncSession):
+    assert await acquire_job_lock(async_session, "test_job", JOB_INTERVAL) == True
+    assert await acquire_job_lock(async_session, "test_job", JOB_INTERVAL) == False
+
+
+@pytest.mark.asyncio
+async def test_job_lock_cant_be_acquired_before_the_next_run(
+    async_session: AsyncSession,
+):
+    await acquire_job_lock(async_session, "test_job", JOB_INTERVAL)
+    await release_job_lock(async_session, "test_job")
+
+    assert await acquire_job_lock(async_session, "test_job", JOB_INTERVAL) == False
+
+    with freeze_time(datetime.utcnow() + JOB_INTERVAL):
+        assert await acquire_job_lock(async_session, "test_job", JOB_INTERVAL) == True
+
+
+@pytest.mark.asyncio
+async def test_expired_job_lock_can_be_acquired(async_session: AsyncSession):
+    await acquire_job_lock(async_session, "test_job", timedelta(seconds=0))
+
+    with freeze_time(
+        datetime.utcnow() + timedelta(seconds=settings.JOB_LOCK_TIMEOUT + 1)
+    ):
+        assert (
+            await acquire_job_lock(async_session, "test_job", timedelta(seconds=0))
+            == True
+        )
+
+
+@pytest.mark.asyncio
+async def test_locked_job_is_run_once_per_interval(async_session: AsyncSession):
+    job_sessions = []
+
+    async def job(session: AsyncSession) -> None:
+        job_sessions.append(session)
+
+    assert await run_locked_job(async_session, "test_job", JOB_INTERVAL, job) == True
+    assert await run_locked_job(async_session, "test_job", JOB_INTERVAL, job) == False
+    assert job_sessions == [async_session]
+
+    job_run = await if_exists(JobRun, "job_name", "test_job", async_session)
+    await async_session.refresh(job_run)
+    assert job_run.locked_by is None
+    assert job_run.last_finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_job_keeps_its_next_run(async_session: AsyncSession):
+    async def failing_job(session: AsyncSession) -> None:
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await run_locked_job(async_session, "test_job", JOB_INTERVAL, failing_job)
+
+    job_run = await if_exists(JobRun, "job_name", "test_job", async_session)
+    await async_session.refresh(job_run)
+    assert job_run.locked_by is None
+    assert job_run.next_run_at is None
+    assert job_run.last_finished_at is None
+
+    job_sessions = []
+
+    async def job(session: AsyncSession) -> None:
+        job_sessions.append(session)
+
+    assert await run_locked_job(async_session, "test_job", JOB_INTERVAL, job) == True
+    assert job_sessions == [async_session]
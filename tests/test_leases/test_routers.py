@@ -1,17 +1,29 @@
+import csv
+import io
+
+import orjson
 import pytest
 from fastapi import status
 from fastapi_jwt_auth import AuthJWT
 from httpx import AsyncClient, Response
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
 
+from main import app
 from src.apps.leases.schemas import LeaseOutputSchema
 from src.apps.leases.services import get_all_leases
 from src.apps.properties.schemas import PropertyOutputSchema
-from src.apps.users.schemas import UserIdSchema, UserOutputSchema
+from src.apps.users.models import User
+from src.apps.users.schemas import UserIdSchema, UserOutputSchema, UserPrincipalSchema
 from src.core.factory.lease_factory import (
     LeaseInputSchemaFactory,
     LeaseUpdateSchemaFactory,
 )
 from src.core.pagination.schemas import PagedResponseSchema
+from src.dependencies import get_db
+from src.dependencies.user import authenticate_user
+from src.settings.general import settings
 from tests.test_addresses.conftest import db_addresses
 from tests.test_companies.conftest import db_companies
 from tests.test_leases.conftest import db_leases
@@ -240,6 +252,46 @@ async def test_only_owner_or_tenant_can_get_their_single_lease(
     assert response.status_code == status_code
 
 
+@pytest.mark.asyncio
+async def test_single_lease_was_not_modified_until_lease_or_tenant_update(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    lease = db_leases.results[0]
+    response = await async_client.get(f"leases/{lease.id}", headers=staff_auth_headers)
+    etag = response.headers["ETag"]
+
+    response = await async_client.get(
+        f"leases/{lease.id}", headers={**staff_auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+
+    await async_session.execute(
+        update(User).filter(User.id == lease.tenant_id).values(first_name="Name")
+    )
+    response = await async_client.get(
+        f"leases/{lease.id}", headers={**staff_auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["tenant"]["first_name"] == "Name"
+    etag = response.headers["ETag"]
+
+    await async_client.patch(
+        f"leases/{lease.id}",
+        headers=staff_auth_headers,
+        content=LeaseUpdateSchemaFactory().generate(rent_amount=1234).json(),
+    )
+    response = await async_client.get(
+        f"leases/{lease.id}", headers={**staff_auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
 @pytest.mark.parametrize(
     "user, user_headers, status_code",
     [
@@ -317,3 +369,129 @@ async def test_only_staff_or_owner_can_accept_or_discard_lease_renewal(
     )
 
     assert response.status_code == status_code
+
+
+@pytest.mark.parametrize(
+    "user, user_headers, status_code",
+    [
+        (
+            pytest.lazy_fixture("db_user"),
+            pytest.lazy_fixture("auth_headers"),
+            status.HTTP_403_FORBIDDEN,
+        ),
+        (
+            pytest.lazy_fixture("db_staff_user"),
+            pytest.lazy_fixture("staff_auth_headers"),
+            status.HTTP_200_OK,
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_only_staff_can_export_leases(
+    async_client: AsyncClient,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    user: UserOutputSchema,
+    user_headers: dict[str, str],
+    status_code: int,
+):
+    response = await async_client.get("leases/export", headers=user_headers)
+    assert response.status_code == status_code
+
+
+@pytest.mark.parametrize("export_chunk_size", [1, 1000])
+@pytest.mark.asyncio
+async def test_if_leases_were_exported_as_csv_in_chunks(
+    async_client: AsyncClient,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    export_chunk_size: int,
+):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", export_chunk_size)
+    response = await async_client.get("leases/export", headers=staff_auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert 'filename="leases.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    leases = sorted(db_leases.results, key=lambda lease: lease.id)
+    assert [row["id"] for row in rows] == [lease.id for lease in leases]
+    assert rows[0]["start_date"] == leases[0].start_date.isoformat()
+    assert rows[0]["billing_period"] == leases[0].billing_period.value
+
+
+@pytest.mark.asyncio
+async def test_if_filtered_leases_were_exported_as_ndjson(
+    async_client: AsyncClient,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    lease = db_leases.results[0]
+    response = await async_client.get(
+        "leases/export",
+        params={"format": "ndjson", "tenant__email__eq": lease.tenant.email},
+        headers=staff_auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    leases = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [lease["id"] for lease in leases] == sorted(
+        result.id
+        for result in db_leases.results
+        if result.tenant.email == lease.tenant.email
+    )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_while_exporting_leases_with_unknown_filter_field(
+    async_client: AsyncClient,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    response = await async_client.get(
+        "leases/export", params={"unknown__eq": "1"}, headers=staff_auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_if_lease_export_returned_its_connection_without_get_db_override(
+    async_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    the body is streamed after the teardown of get_db,
+    the stream has to close the session it has opened
+    """
+    monkeypatch.setattr(
+        get_db,
+        "async_session",
+        sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    app.dependency_overrides[authenticate_user] = lambda: UserPrincipalSchema(
+        id="staff",
+        email="staff@mail.com",
+        is_active=True,
+        is_staff=True,
+        is_superuser=False,
+    )
+    connections = []
+    on_checkout = lambda *args: connections.append("checkout")
+    on_checkin = lambda *args: connections.append("checkin")
+    event.listen(async_engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(async_engine.sync_engine.pool, "checkin", on_checkin)
+    try:
+        async with AsyncClient(
+            app=app, base_url="http://localhost:8000/api/"
+        ) as client:
+            response = await client.get("leases/export")
+    finally:
+        event.remove(async_engine.sync_engine.pool, "checkout", on_checkout)
+        event.remove(async_engine.sync_engine.pool, "checkin", on_checkin)
+        del app.dependency_overrides[authenticate_user]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text.splitlines()[0].startswith("start_date,")
+    assert connections == ["checkout", "checkin"]
@@ -1,12 +1,14 @@
+import asyncio
 from datetime import date, timedelta
 
 import pytest
 from freezegun import freeze_time
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from src.apps.leases.enums import BillingPeriodEnum
 from src.apps.leases.models import Lease
-from src.apps.leases.schemas import LeaseOutputSchema
+from src.apps.leases.schemas import LeaseBasicOutputSchema, LeaseOutputSchema
 from src.apps.leases.services import (
     create_lease,
     get_all_leases,
@@ -17,11 +19,12 @@ from src.apps.leases.services import (
     update_single_lease,
 )
 from src.apps.properties.enums import PropertyStatusEnum
-from src.apps.properties.models import Property
+from src.apps.properties.models import Property, PropertyOccupancy
 from src.apps.properties.schemas import PropertyOutputSchema
 from src.apps.properties.services import (
     create_property,
     get_all_properties,
+    get_properties_available_between,
     get_single_property,
     update_single_property,
 )
@@ -32,6 +35,7 @@ from src.core.exceptions import (
     AlreadyExists,
     CantModifyExpiredLeaseException,
     DoesNotExist,
+    IncorrectDateRangeException,
     IncorrectLeaseDatesException,
     IsOccupied,
     PropertyNotAvailableForRentException,
@@ -50,15 +54,24 @@ from src.core.factory.property_factory import (
     PropertyInputSchemaFactory,
     PropertyUpdateSchemaFactory,
 )
+from src.core.factory.user_factory import UserRegisterSchemaFactory
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.utils.orm import if_exists
 from src.core.utils.utils import generate_uuid
+from src.settings.general import settings
 from tests.test_addresses.conftest import db_addresses
 from tests.test_companies.conftest import db_companies
 from tests.test_leases.conftest import db_leases
 from tests.test_properties.conftest import db_properties
-from tests.test_users.conftest import db_staff_user, db_superuser, db_user
+from tests.test_users.conftest import (
+    create_user_without_activation,
+    db_staff_user,
+    db_superuser,
+    db_user,
+)
+
+PARALLEL_LEASE_CREATES_AMOUNT = 100
 
 
 @pytest.mark.asyncio
@@ -293,6 +306,61 @@ async def test_if_only_one_lease_was_returned(
     assert lease.id == db_leases.results[0].id
 
 
+@pytest.mark.asyncio
+async def test_if_leases_were_filtered_by_multi_hop_relationship_path(
+    async_session: AsyncSession,
+    db_staff_user: UserOutputSchema,
+    db_user: UserOutputSchema,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+):
+    leases = await get_all_leases(
+        async_session,
+        PageParams(),
+        query_params=[
+            ("property__owner__email", db_staff_user.email),
+            ("property__owner__last_name", db_staff_user.last_name),
+            ("sort", "property__owner__first_name__asc"),
+        ],
+    )
+    assert leases.total == 1
+    assert leases.results[0].id == db_leases.results[0].id
+
+    leases = await get_all_leases(
+        async_session,
+        PageParams(),
+        query_params=[("property__owner__email", db_user.email)],
+    )
+    assert leases.total == 0
+
+
+@pytest.mark.asyncio
+async def test_if_filtering_by_one_to_many_relationship_does_not_multiply_rows(
+    async_session: AsyncSession,
+    db_superuser: UserOutputSchema,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+    async_session.add(
+        Lease(
+            **{
+                column.key: getattr(lease, column.key)
+                for column in Lease.__table__.columns
+                if column.key != "id"
+            }
+        )
+    )
+    await async_session.commit()
+
+    properties = await get_all_properties(
+        async_session,
+        PageParams(),
+        query_params=[("leases__tenant__email", db_superuser.email)],
+    )
+
+    assert properties.total == 1
+    assert properties.results[0].id == lease.property_id
+
+
 @pytest.mark.asyncio
 async def test_raise_exception_while_getting_nonexistent_lease(
     async_session: AsyncSession,
@@ -451,7 +519,7 @@ async def test_leases_with_lease_expiration_date_higher_than_current_date_will_b
         await manage_lease_renewals_and_expired_statuses(async_session)
         lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
         assert lease.lease_expired == True
-        property = await get_single_property(async_session, lease.property.id)
+        property = await get_single_property(async_session, lease.property_id)
         assert property.property_status == PropertyStatusEnum.AVAILABLE
 
 
@@ -468,21 +536,33 @@ async def test_leases_with_lease_expiration_date_higher_than_current_date_and_re
     assert lease.lease_expired == False
 
     with freeze_time(lease.lease_expiration_date + timedelta(days=1)):
-        await manage_lease_renewals_and_expired_statuses(async_session)
+        assert (
+            await manage_lease_renewals_and_expired_statuses(
+                async_session, chunk_size=1
+            )
+            == 1
+        )
         lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
         await async_session.refresh(lease)
         assert lease.lease_expired == True
 
-        property = await if_exists(Property, "id", lease.property.id, async_session)
+        property = await if_exists(Property, "id", lease.property_id, async_session)
         all_leases = await get_all_leases(
             async_session, PageParams(), output_schema=LeaseOutputSchema
         )
 
         # new lease created as result of previously accepted lease renewal
-        assert (
-            len([lease for lease in all_leases.results if lease.lease_expired == False])
-            == 1
+        renewed_leases = [
+            renewed_lease
+            for renewed_lease in all_leases.results
+            if renewed_lease.lease_expired == False
+        ]
+        assert len(renewed_leases) == 1
+        assert renewed_leases[0].start_date == date.today() + timedelta(days=1)
+        assert renewed_leases[0].end_date - renewed_leases[0].start_date == (
+            lease.lease_expiration_date - lease.start_date
         )
+        assert property.property_status == PropertyStatusEnum.AVAILABLE
 
 
 @pytest.mark.asyncio
@@ -490,14 +570,318 @@ async def test_leases_with_the_first_date_will_have_its_property_status_changed(
     async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
 ):
     lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
-    property = await get_single_property(async_session, lease.property.id)
+    property = await get_single_property(async_session, lease.property_id)
     assert property.property_status == PropertyStatusEnum.RESERVED
 
+    with freeze_time(lease.start_date):
+        assert (
+            await manage_property_statuses_for_lease_with_the_start_date_being_today(
+                async_session
+            )
+            == 1
+        )
+        await async_session.refresh(
+            await if_exists(Property, "id", lease.property_id, async_session)
+        )
+
+        property = await get_single_property(async_session, lease.property_id)
+        assert property.property_status == PropertyStatusEnum.RENTED
+
+
+@pytest.mark.asyncio
+async def test_missed_first_date_of_the_lease_is_caught_up_by_the_next_job_run(
+    async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+
+    with freeze_time(lease.start_date + timedelta(days=2)):
+        assert (
+            await manage_property_statuses_for_lease_with_the_start_date_being_today(
+                async_session
+            )
+            == 1
+        )
+
+    property = await if_exists(Property, "id", lease.property_id, async_session)
+    await async_session.refresh(property)
+    assert property.property_status == PropertyStatusEnum.RENTED
+
+
+@pytest.mark.asyncio
+async def test_manually_set_property_status_is_kept_by_the_first_date_job(
+    async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
     with freeze_time(lease.start_date):
         await manage_property_statuses_for_lease_with_the_start_date_being_today(
             async_session
         )
-        await async_session.refresh(lease.property)
 
-        property = await get_single_property(async_session, lease.property.id)
-        assert property.property_status == PropertyStatusEnum.RENTED
+    await async_session.execute(
+        update(Property)
+        .filter(Property.id == lease.property_id)
+        .values(property_status=PropertyStatusEnum.UNAVAILABLE)
+    )
+    await async_session.commit()
+
+    for days in range(
+        settings.LEASE_START_CATCH_UP_DAYS + 1,
+        settings.LEASE_START_CATCH_UP_DAYS + 4,
+    ):
+        with freeze_time(lease.start_date + timedelta(days=days)):
+            assert (
+                await manage_property_statuses_for_lease_with_the_start_date_being_today(
+                    async_session
+                )
+                == 0
+            )
+
+    property = await if_exists(Property, "id", lease.property_id, async_session)
+    await async_session.refresh(property)
+    assert property.property_status == PropertyStatusEnum.UNAVAILABLE
+
+
+async def get_property_occupancy(async_session: AsyncSession, property_id: str) -> list:
+    occupancy = await async_session.execute(
+        select(
+            PropertyOccupancy.lease_id,
+            PropertyOccupancy.start_date,
+            PropertyOccupancy.end_date,
+        ).filter(PropertyOccupancy.property_id == property_id)
+    )
+    return occupancy.all()
+
+
+@pytest.mark.asyncio
+async def test_if_property_occupancy_was_synced_with_lease_changes(
+    async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+    assert await get_property_occupancy(async_session, lease.property_id) == [
+        (lease.id, lease.start_date, lease.lease_expiration_date)
+    ]
+
+    new_lease_expiration_date = date(2027, 12, 2)
+    await update_single_lease(
+        async_session,
+        LeaseUpdateSchemaFactory().generate(
+            lease_expiration_date=new_lease_expiration_date
+        ),
+        lease.id,
+    )
+    assert await get_property_occupancy(async_session, lease.property_id) == [
+        (lease.id, lease.start_date, new_lease_expiration_date)
+    ]
+
+    lease.renewal_accepted = True
+    async_session.add(lease)
+    await async_session.commit()
+
+    with freeze_time(new_lease_expiration_date + timedelta(days=1)):
+        await manage_lease_renewals_and_expired_statuses(async_session)
+        renewed_lease = await async_session.scalar(
+            select(Lease).filter(Lease.lease_expired == False)
+        )
+        assert await get_property_occupancy(async_session, lease.property_id) == [
+            (renewed_lease.id, renewed_lease.start_date, renewed_lease.end_date)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_if_properties_available_between_dates_were_returned(
+    async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
+):
+    lease = db_leases.results[0]
+
+    available_properties = await get_properties_available_between(
+        async_session,
+        PageParams(),
+        lease.start_date - timedelta(days=10),
+        lease.start_date,
+    )
+    property_ids = [property.id for property in available_properties.results]
+    assert lease.property_id not in property_ids
+    assert len(property_ids) == 1
+
+    available_properties = await get_properties_available_between(
+        async_session,
+        PageParams(),
+        lease.lease_expiration_date + timedelta(days=1),
+        lease.lease_expiration_date + timedelta(days=30),
+    )
+    property_ids = [property.id for property in available_properties.results]
+    assert lease.property_id in property_ids
+    assert len(property_ids) == 2
+
+    with pytest.raises(IncorrectDateRangeException):
+        await get_properties_available_between(
+            async_session,
+            PageParams(),
+            lease.start_date,
+            lease.start_date - timedelta(days=1),
+        )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_creating_lease_overlapping_active_lease(
+    async_session: AsyncSession,
+    db_staff_user: UserOutputSchema,
+    db_user: UserOutputSchema,
+):
+    property_output = await create_property(
+        async_session,
+        PropertyInputSchemaFactory().generate(
+            property_status=PropertyStatusEnum.AVAILABLE, owner_id=db_staff_user.id
+        ),
+    )
+
+    async def create_property_lease(start_day: int, end_day: int = None):
+        lease_input = LeaseInputSchemaFactory().generate(
+            start_date=date.today() + timedelta(days=start_day),
+            property_id=property_output.id,
+            owner_id=db_staff_user.id,
+            tenant_id=db_user.id,
+        )
+        lease_input.end_date = end_day and date.today() + timedelta(days=end_day)
+        return await create_lease(async_session, lease_input)
+
+    await create_property_lease(30, 60)
+
+    with pytest.raises(ActiveLeaseException):
+        await create_property_lease(50, 90)
+    with pytest.raises(ActiveLeaseException):
+        await create_property_lease(1, 30)
+    with pytest.raises(ActiveLeaseException):
+        await create_property_lease(1)
+
+    with pytest.raises(PropertyNotAvailableForRentException):
+        await create_property_lease(61)
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_creating_lease_overlapping_renewed_lease(
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    db_staff_user: UserOutputSchema,
+    db_user: UserOutputSchema,
+):
+    lease = db_leases.results[0]
+    await manage_lease_renewal_status(async_session, lease.id)
+
+    with freeze_time(lease.lease_expiration_date + timedelta(days=1)):
+        await manage_lease_renewals_and_expired_statuses(async_session)
+        renewed_lease = await async_session.scalar(
+            select(Lease).filter(
+                Lease.property_id == lease.property_id, Lease.lease_expired == False
+            )
+        )
+        property = await get_single_property(async_session, lease.property_id)
+        assert property.property_status == PropertyStatusEnum.AVAILABLE
+
+        lease_input = LeaseInputSchemaFactory().generate(
+            start_date=renewed_lease.start_date,
+            property_id=lease.property_id,
+            owner_id=db_staff_user.id,
+            tenant_id=db_user.id,
+        )
+        lease_input.end_date = renewed_lease.start_date + timedelta(days=7)
+        with pytest.raises(ActiveLeaseException):
+            await create_lease(async_session, lease_input)
+
+        lease_input.start_date = renewed_lease.end_date + timedelta(days=1)
+        lease_input.end_date = renewed_lease.end_date + timedelta(days=30)
+        await create_lease(async_session, lease_input)
+        property = await get_single_property(async_session, lease.property_id)
+        assert property.property_status == PropertyStatusEnum.RESERVED
+
+
+@pytest.mark.asyncio
+async def test_parallel_lease_creates_do_not_double_book_the_property(
+    async_engine: AsyncEngine,
+):
+    """
+    the data is committed, so it is visible for the parallel sessions,
+    and removed at the end
+    """
+    if async_engine.dialect.name != "mysql":
+        pytest.skip("SELECT ... FOR UPDATE row locks need MySQL")
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        owner = await create_user_without_activation(
+            session, UserRegisterSchemaFactory().generate(), is_staff=True
+        )
+        tenant = await create_user_without_activation(
+            session, UserRegisterSchemaFactory().generate()
+        )
+        property_output = await create_property(
+            session,
+            PropertyInputSchemaFactory().generate(
+                property_status=PropertyStatusEnum.AVAILABLE, owner_id=owner.id
+            ),
+        )
+
+    async def create_lease_in_own_session() -> LeaseBasicOutputSchema:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await create_lease(
+                session,
+                LeaseInputSchemaFactory().generate(
+                    property_id=property_output.id,
+                    owner_id=owner.id,
+                    tenant_id=tenant.id,
+                ),
+            )
+
+    try:
+        results = await asyncio.gather(
+            *[
+                create_lease_in_own_session()
+                for _ in range(PARALLEL_LEASE_CREATES_AMOUNT)
+            ],
+            return_exceptions=True,
+        )
+        created_leases = [
+            result for result in results if isinstance(result, LeaseBasicOutputSchema)
+        ]
+        assert len(created_leases) == 1
+        assert all(
+            isinstance(
+                result, (ActiveLeaseException, PropertyNotAvailableForRentException)
+            )
+            for result in results
+            if result not in created_leases
+        )
+
+        async with AsyncSession(async_engine) as session:
+            assert (
+                await session.scalar(
+                    select(func.count(Lease.id)).filter(
+                        Lease.property_id == property_output.id
+                    )
+                )
+                == 1
+            )
+            assert (
+                await session.scalar(
+                    select(func.count(PropertyOccupancy.lease_id)).filter(
+                        PropertyOccupancy.property_id == property_output.id
+                    )
+                )
+                == 1
+            )
+    finally:
+        async with AsyncSession(async_engine) as session:
+            await session.execute(
+                delete(PropertyOccupancy).filter(
+                    PropertyOccupancy.property_id == property_output.id
+                )
+            )
+            await session.execute(
+                delete(Lease).filter(Lease.property_id == property_output.id)
+            )
+            await session.execute(
+                delete(Property).filter(Property.id == property_output.id)
+            )
+            await session.execute(
+                delete(User).filter(User.id.in_([owner.id, tenant.id]))
+            )
+            await session.commit()
@@ -2,6 +2,7 @@ from typing import Any
 
 import pytest
 import pytest_asyncio
+import stripe
 from fastapi import BackgroundTasks
 from sqlalchemy.orm import Session
 
@@ -20,6 +21,7 @@ from src.core.utils.orm import if_exists
 from tests.test_addresses.conftest import db_addresses
 from tests.test_companies.conftest import db_companies
 from tests.test_leases.conftest import db_leases
+from tests.test_payments.fake_stripe import FakeStripeServer
 from tests.test_properties.conftest import db_properties
 from tests.test_users.conftest import (
     auth_headers,
@@ -30,6 +32,20 @@ from tests.test_users.conftest import (
     superuser_auth_headers,
 )
 
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_stripe_server() -> FakeStripeServer:
+    server = FakeStripeServer()
+    server.start()
+    api_base, stripe.api_base = stripe.api_base, server.url
+
+    yield server
+
+    stripe.api_base = api_base
+    server.shutdown()
+    server.server_close()
+
+
 """
 one payment object related to the property with the active lease
 """
@@ -0,0 +1,75 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeStripeRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:
+        return
+
+    def send_json(self, status: int, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self) -> None:
+        content_length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(content_length).decode())
+        if self.path != "/v1/checkout/sessions":
+            return self.send_json(404, {"error": {"message": "Unknown path"}})
+
+        if self.server.take_failure():
+            return self.send_json(500, {"error": {"message": "Fake server error"}})
+
+        idempotency_key = self.headers.get("Idempotency-Key")
+        checkout_session = self.server.checkout_sessions.setdefault(
+            idempotency_key,
+            {
+                "id": f"cs_test_{idempotency_key}",
+                "object": "checkout.session",
+                "url": f"https://checkout.stripe.test/pay/{idempotency_key}",
+                "metadata": {
+                    key[len("metadata[") : -1]: value[0]
+                    for key, value in form.items()
+                    if key.startswith("metadata[")
+                },
+            },
+        )
+        self.send_json(200, checkout_session)
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    """
+    local Stripe API replacement, checkout sessions are stored
+    by the idempotency key and the next requests can be set to fail
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), FakeStripeRequestHandler)
+        self.checkout_sessions: dict[str, dict] = {}
+        self.failures_left = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def fail_next_requests(self, amount: int) -> None:
+        with self.lock:
+            self.failures_left = amount
+
+    def take_failure(self) -> bool:
+        with self.lock:
+            if self.failures_left <= 0:
+                return False
+            self.failures_left -= 1
+            return True
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
@@ -1,9 +1,16 @@
+import csv
+import io
+
+import orjson
 import pytest
 from fastapi import status
 from fastapi_jwt_auth import AuthJWT
 from httpx import AsyncClient, Response
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.leases.schemas import LeaseOutputSchema
+from src.apps.payments.models import Payment
 from src.apps.payments.schemas import PaymentOutputSchema
 from src.apps.properties.schemas import PropertyOutputSchema
 from src.apps.users.schemas import UserIdSchema, UserOutputSchema
@@ -156,3 +163,107 @@ async def test_only_staff_user_and_tenant_can_get_the_related_single_payment(
         f"payments/{db_payments.results[0].id}", headers=user_headers
     )
     assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_single_payment_was_not_modified_until_payment_update(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    db_payments: PagedResponseSchema[PaymentOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    payment_id = db_payments.results[0].id
+    response = await async_client.get(
+        f"payments/{payment_id}", headers=staff_auth_headers
+    )
+    etag = response.headers["ETag"]
+
+    response = await async_client.get(
+        f"payments/{payment_id}",
+        headers={**staff_auth_headers, "If-None-Match": f'W/{etag}, "other"'},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await async_session.execute(
+        update(Payment).filter(Payment.id == payment_id).values(payment_accepted=True)
+    )
+    response = await async_client.get(
+        f"payments/{payment_id}", headers={**staff_auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["payment_accepted"] == True
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize(
+    "user, user_headers, status_code",
+    [
+        (
+            pytest.lazy_fixture("db_user"),
+            pytest.lazy_fixture("auth_headers"),
+            status.HTTP_403_FORBIDDEN,
+        ),
+        (
+            pytest.lazy_fixture("db_staff_user"),
+            pytest.lazy_fixture("staff_auth_headers"),
+            status.HTTP_200_OK,
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_only_staff_can_export_payments(
+    async_client: AsyncClient,
+    db_payments: PagedResponseSchema[PaymentOutputSchema],
+    user: UserOutputSchema,
+    user_headers: dict[str, str],
+    status_code: int,
+):
+    response = await async_client.get("payments/export", headers=user_headers)
+    assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_if_payments_were_exported_as_csv_with_filters(
+    async_client: AsyncClient,
+    db_payments: PagedResponseSchema[PaymentOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    payment = db_payments.results[0]
+    response = await async_client.get(
+        "payments/export",
+        params={"tenant__email__eq": payment.tenant.email},
+        headers=staff_auth_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="payments.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == sorted(
+        result.id
+        for result in db_payments.results
+        if result.tenant.email == payment.tenant.email
+    )
+    assert rows[0]["tenant__email"] == payment.tenant.email
+
+
+@pytest.mark.asyncio
+async def test_if_every_payment_was_exported_as_ndjson_line(
+    async_client: AsyncClient,
+    db_payments: PagedResponseSchema[PaymentOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    response = await async_client.get(
+        "payments/export", params={"format": "ndjson"}, headers=staff_auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    payments = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [payment["id"] for payment in payments] == sorted(
+        payment.id for payment in db_payments.results
+    )
+    assert payments[0]["tenant"]["id"]
@@ -1,9 +1,11 @@
 import datetime
 
 import pytest
+import stripe
 from fastapi import BackgroundTasks, status
 from fastapi_jwt_auth import AuthJWT
 from freezegun import freeze_time
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.leases.enums import BillingPeriodEnum
@@ -13,6 +15,7 @@ from src.apps.leases.services import (
     create_lease,
     manage_leases_with_incoming_payment_date,
 )
+from src.apps.payments import services as payments_services
 from src.apps.payments.models import Payment
 from src.apps.payments.schemas import PaymentOutputSchema
 from src.apps.payments.services import (
@@ -21,8 +24,10 @@ from src.apps.payments.services import (
     get_all_payments,
     get_single_payment,
 )
+from src.apps.properties.enums import PropertyStatusEnum
 from src.apps.properties.models import Property
 from src.apps.properties.schemas import PropertyOutputSchema
+from src.apps.properties.services import create_property
 from src.apps.users.models import User
 from src.apps.users.schemas import UserOutputSchema
 from src.core.exceptions import (
@@ -33,10 +38,13 @@ from src.core.exceptions import (
     PaymentAlreadyAccepted,
     ServiceException,
 )
+from src.core.factory.lease_factory import LeaseInputSchemaFactory
+from src.core.factory.property_factory import PropertyInputSchemaFactory
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
 from src.core.utils.orm import get_billing_period_time_span_between_payments, if_exists
 from src.core.utils.utils import generate_uuid
+from src.settings.stripe import settings as stripe_settings
 from tests.test_addresses.conftest import db_addresses
 from tests.test_companies.conftest import db_companies
 from tests.test_leases.conftest import db_leases
@@ -45,6 +53,7 @@ from tests.test_payments.conftest import (
     get_payment_intent_data,
     get_stripe_session_data,
 )
+from tests.test_payments.fake_stripe import FakeStripeServer
 from tests.test_properties.conftest import db_properties
 from tests.test_users.conftest import (
     DB_USER_SCHEMA,
@@ -76,6 +85,32 @@ async def test_if_lease_with_payment_date_being_today_was_managed_correctly_whil
         )
 
 
+@pytest.mark.asyncio
+async def test_if_missed_billing_periods_were_caught_up(
+    async_session: AsyncSession, db_leases: PagedResponseSchema[LeaseOutputSchema]
+):
+    lease_before = db_leases.results[0]
+    _, time_span = get_billing_period_time_span_between_payments(
+        lease_before.next_payment_date, lease_before.billing_period
+    )
+
+    with freeze_time(
+        lease_before.next_payment_date + datetime.timedelta(days=time_span)
+    ):
+        created_payments = await manage_leases_with_incoming_payment_date(
+            async_session, BackgroundTasks()
+        )
+        lease_after = await if_exists(Lease, "id", lease_before.id, async_session)
+        payments = await get_all_payments(async_session, PageParams())
+
+        assert created_payments == payments.total
+        assert created_payments >= 1
+        assert (
+            lease_after.next_payment_date is None
+            or lease_after.next_payment_date > datetime.date.today()
+        )
+
+
 @pytest.mark.asyncio
 async def test_if_single_payment_was_returned(
     async_session: AsyncSession, db_payments: PagedResponseSchema[PaymentOutputSchema]
@@ -192,3 +227,161 @@ async def test_if_payment_was_fulfilled_correctly(
         assert payment_after.waiting_for_payment == False
         assert payment_after.payment_accepted == True
         assert payment_after.payment_date == datetime.date.today()
+
+
+@pytest.mark.asyncio
+async def test_if_checkout_session_was_created_after_retrying_stripe_errors(
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    fake_stripe_server: FakeStripeServer,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(stripe_settings, "STRIPE_RETRY_BACKOFF", 0)
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+    fake_stripe_server.fail_next_requests(stripe_settings.STRIPE_MAX_RETRIES)
+
+    payment = await create_payment(async_session, lease, BackgroundTasks())
+    assert payment.payment_checkout_url.endswith(f"{payment.id}:1")
+
+
+@pytest.mark.asyncio
+async def test_payment_was_marked_as_failed_when_checkout_session_creation_failed(
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    fake_stripe_server: FakeStripeServer,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(stripe_settings, "STRIPE_RETRY_BACKOFF", 0)
+    lease_before = db_leases.results[0]
+    fake_stripe_server.fail_next_requests(stripe_settings.STRIPE_MAX_RETRIES + 1)
+
+    with freeze_time(lease_before.next_payment_date):
+        assert (
+            await manage_leases_with_incoming_payment_date(
+                async_session, BackgroundTasks()
+            )
+            == 0
+        )
+        lease_after = await if_exists(Lease, "id", lease_before.id, async_session)
+        assert lease_after.next_payment_date > lease_before.next_payment_date
+
+        [payment] = (await get_all_payments(async_session, PageParams())).results
+        payment = await get_single_payment(async_session, payment.id)
+        assert payment.checkout_failed == True
+        assert payment.payment_checkout_url is None
+
+        stripe_session = await payments_services.get_stripe_session_data(
+            async_session, payment.id
+        )
+        payment = await get_single_payment(async_session, payment.id)
+        assert payment.checkout_failed == False
+        assert payment.payment_checkout_url == stripe_session.url
+
+
+@pytest.mark.asyncio
+async def test_lease_with_failed_checkout_was_skipped_by_the_next_catch_up_passes(
+    async_session: AsyncSession,
+    db_staff_user: UserOutputSchema,
+    db_user: UserOutputSchema,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    leases = []
+    for _ in range(2):
+        property = await create_property(
+            async_session,
+            PropertyInputSchemaFactory().generate(
+                property_status=PropertyStatusEnum.AVAILABLE,
+                owner_id=db_staff_user.id,
+            ),
+        )
+        lease = await create_lease(
+            async_session,
+            LeaseInputSchemaFactory().generate(
+                start_date=datetime.date.today() + datetime.timedelta(days=1),
+                end_date=datetime.date.today() + datetime.timedelta(days=365),
+                billing_period=BillingPeriodEnum.MONTHLY,
+                property_id=property.id,
+                owner_id=db_staff_user.id,
+                tenant_id=db_user.id,
+            ),
+        )
+        leases.append(await if_exists(Lease, "id", lease.id, async_session))
+    billed_lease, failing_lease = leases
+
+    create_checkout_session = payments_services.create_checkout_session
+    checkout_lease_ids = []
+
+    async def create_checkout_session_failing_for_lease(
+        payment_data, payment, settings=stripe_settings
+    ):
+        checkout_lease_ids.append(payment.lease_id)
+        if payment.lease_id == failing_lease.id:
+            raise stripe.error.APIConnectionError("Fake connection error")
+        return await create_checkout_session(payment_data, payment, settings)
+
+    monkeypatch.setattr(
+        payments_services,
+        "create_checkout_session",
+        create_checkout_session_failing_for_lease,
+    )
+    _, time_span = get_billing_period_time_span_between_payments(
+        billed_lease.next_payment_date, billed_lease.billing_period
+    )
+
+    with freeze_time(
+        billed_lease.next_payment_date + datetime.timedelta(days=2 * time_span)
+    ):
+        assert (
+            await manage_leases_with_incoming_payment_date(
+                async_session, BackgroundTasks()
+            )
+            == 3
+        )
+    assert checkout_lease_ids.count(billed_lease.id) == 3
+    assert checkout_lease_ids.count(failing_lease.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_payment_was_committed_before_its_checkout_session_was_created(
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+    create_checkout_session = payments_services.create_checkout_session
+    committed_payments = []
+
+    async def create_checkout_session_after_commit(payment_data, payment, settings):
+        committed_payments.append(
+            inspect(payment).persistent and not async_session.in_transaction()
+        )
+        return await create_checkout_session(payment_data, payment, settings)
+
+    monkeypatch.setattr(
+        payments_services,
+        "create_checkout_session",
+        create_checkout_session_after_commit,
+    )
+    await create_payment(async_session, lease, BackgroundTasks())
+
+    assert committed_payments == [True]
+
+
+@pytest.mark.asyncio
+async def test_next_checkout_of_the_payment_got_the_new_checkout_session(
+    async_session: AsyncSession,
+    db_leases: PagedResponseSchema[LeaseOutputSchema],
+    fake_stripe_server: FakeStripeServer,
+):
+    lease = await if_exists(Lease, "id", db_leases.results[0].id, async_session)
+    payment = await create_payment(async_session, lease, BackgroundTasks())
+
+    stripe_session = await payments_services.get_stripe_session_data(
+        async_session, payment.id
+    )
+    assert stripe_session.url.endswith(f"{payment.id}:2")
+    assert stripe_session.url != payment.payment_checkout_url
+    assert f"{payment.id}:2" in fake_stripe_server.checkout_sessions
+
+    payment = await get_single_payment(async_session, payment.id)
+    assert payment.payment_checkout_url == stripe_session.url
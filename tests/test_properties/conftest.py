@@ -4,9 +4,13 @@ import pytest
 import pytest_asyncio
 from fastapi import BackgroundTasks
 from fastapi_jwt_auth import AuthJWT
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 
+from src.apps.addresses.models import Address
+from src.apps.addresses.services import create_address
 from src.apps.properties.enums import PropertyStatusEnum
+from src.apps.properties.models import Property
 from src.apps.properties.schemas import PropertyInputSchema, PropertyOutputSchema
 from src.apps.properties.services import (
     change_property_owner,
@@ -14,6 +18,7 @@ from src.apps.properties.services import (
     get_all_properties,
 )
 from src.apps.users.schemas import UserIdSchema, UserOutputSchema
+from src.core.factory.address_factory import AddressInputSchemaFactory
 from src.core.factory.property_factory import PropertyInputSchemaFactory
 from src.core.pagination.models import PageParams
 from src.core.pagination.schemas import PagedResponseSchema
@@ -55,3 +60,61 @@ async def db_properties(
     return await get_all_properties(
         async_session, PageParams(), output_schema=PropertyOutputSchema
     )
+
+
+@pytest_asyncio.fixture
+async def committed_search_properties(
+    async_engine: AsyncEngine,
+) -> dict[str, PropertyOutputSchema]:
+    """
+    InnoDB FULLTEXT search sees the committed rows only, so the searched
+    properties are committed (instead of the rolled back test transaction)
+    and removed at the end
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        properties = {
+            "best_match": await create_property(
+                session,
+                PropertyInputSchemaFactory().generate(
+                    property_status=PropertyStatusEnum.AVAILABLE,
+                    short_description="Penthouse with the panoramic view",
+                    description="Penthouse terrace, penthouse garage",
+                ),
+            ),
+            "match": await create_property(
+                session,
+                PropertyInputSchemaFactory().generate(
+                    property_status=PropertyStatusEnum.AVAILABLE,
+                    short_description="Cosy penthouse",
+                ),
+            ),
+            "unavailable": await create_property(
+                session,
+                PropertyInputSchemaFactory().generate(
+                    property_status=PropertyStatusEnum.UNAVAILABLE,
+                    short_description="Unavailable penthouse",
+                ),
+            ),
+            "city_match": await create_property(
+                session,
+                PropertyInputSchemaFactory().generate(
+                    property_status=PropertyStatusEnum.AVAILABLE, rooms_amount=2
+                ),
+            ),
+        }
+        await create_address(
+            session,
+            AddressInputSchemaFactory().generate(
+                property_id=properties["city_match"].id, city="Zakopane"
+            ),
+        )
+
+    yield properties
+
+    property_ids = [property.id for property in properties.values()]
+    async with AsyncSession(async_engine) as session:
+        await session.execute(
+            delete(Address).filter(Address.property_id.in_(property_ids))
+        )
+        await session.execute(delete(Property).filter(Property.id.in_(property_ids)))
+        await session.commit()
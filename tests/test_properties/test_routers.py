@@ -1,15 +1,24 @@
 import pytest
+from fakeredis.aioredis import FakeRedis
 from fastapi import status
 from fastapi_jwt_auth import AuthJWT
 from httpx import AsyncClient, Response
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.apps.properties import services as properties_services
+from src.apps.properties.enums import PropertyStatusEnum
+from src.apps.properties.models import Property
 from src.apps.properties.schemas import PropertyOutputSchema
-from src.apps.users.schemas import UserIdSchema, UserOutputSchema
+from src.apps.users.schemas import UserIdSchema, UserOutputSchema, UserUpdateSchema
+from src.apps.users.services.user_services import update_single_user
 from src.core.factory.property_factory import (
     PropertyInputSchemaFactory,
     PropertyUpdateSchemaFactory,
 )
 from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils import response_cache
+from src.core.utils.cache import RedisCacheBackend
 from tests.test_properties.conftest import db_properties
 from tests.test_users.conftest import (
     DB_USER_SCHEMA,
@@ -80,6 +89,108 @@ async def test_authenticated_user_can_get_available_properties(
     assert response.json()["total"] == 2
 
 
+@pytest.mark.asyncio
+async def test_authenticated_user_can_get_available_properties_with_facets(
+    async_client: AsyncClient,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+):
+    response = await async_client.get(
+        "properties/", params={"facets": "true"}, headers=auth_headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["facets"]["property_status"] == {"AVAILABLE": 2}
+
+    response = await async_client.get("properties/", headers=auth_headers)
+    assert "facets" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_authenticated_user_can_get_properties_available_between_dates(
+    async_client: AsyncClient,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+):
+    response = await async_client.get(
+        "properties/available-between",
+        params={"from": "2025-01-01", "to": "2025-02-01"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 2
+
+    response = await async_client.get(
+        "properties/available-between",
+        params={"from": "2025-02-01", "to": "2025-01-01"},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_authenticated_user_can_search_available_properties(
+    async_client: AsyncClient,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    FULLTEXT search does not see the rows of the rolled back test transaction,
+    the ranking is replaced with the exact match of the first searched column
+    """
+
+    def get_search_match(dialect_name: str, columns: tuple, search_query: str):
+        relevance = case((columns[0] == search_query, 1), else_=0)
+        return relevance > 0, relevance
+
+    monkeypatch.setattr(properties_services, "get_search_match", get_search_match)
+    property = next(
+        property
+        for property in db_properties.results
+        if property.property_status == PropertyStatusEnum.AVAILABLE
+    )
+    response = await async_client.get(
+        "properties/search",
+        params={"q": property.short_description},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["id"] for result in response.json()["results"]] == [property.id]
+
+    response = await async_client.get("properties/search", headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_authenticated_user_can_get_nearby_properties(
+    async_client: AsyncClient,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+):
+    response = await async_client.get(
+        "properties/nearby",
+        params={"latitude": 50.0, "longitude": 20.0, "radius": 10},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 0
+
+    response = await async_client.get(
+        "properties/nearby",
+        params={"latitude": 91, "longitude": 20.0},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.parametrize(
     "user, user_headers, status_code",
     [
@@ -170,6 +281,108 @@ async def test_authenticated_user_can_get_single_property(
     assert response.status_code == status_code
 
 
+@pytest.mark.parametrize("use_redis", [False, True])
+@pytest.mark.asyncio
+async def test_available_properties_response_was_cached_until_property_update(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+    use_redis: bool,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    if use_redis:
+        redis_client = FakeRedis()
+        monkeypatch.setattr(
+            response_cache,
+            "response_cache",
+            RedisCacheBackend(redis_client, "response", ttl=30),
+        )
+        monkeypatch.setattr(
+            response_cache,
+            "response_cache_tags",
+            RedisCacheBackend(redis_client, "response_tag", ttl=30),
+        )
+
+    first_property, second_property = [
+        property
+        for property in db_properties.results
+        if property.property_status == PropertyStatusEnum.AVAILABLE
+    ]
+    response = await async_client.get("properties/", headers=auth_headers)
+    assert response.json()["total"] == 2
+
+    await async_session.execute(
+        update(Property)
+        .filter(Property.id == first_property.id)
+        .values(property_status=PropertyStatusEnum.UNAVAILABLE)
+    )
+    response = await async_client.get("properties/", headers=auth_headers)
+    assert response.json()["total"] == 2
+
+    response = await async_client.get(
+        "properties/", params={"size": 1}, headers=auth_headers
+    )
+    assert response.json()["total"] == 1
+
+    await async_client.patch(
+        f"properties/{second_property.id}",
+        headers=staff_auth_headers,
+        json={"short_description": "updated"},
+    )
+    response = await async_client.get("properties/", headers=auth_headers)
+    assert response.json()["total"] == 1
+    assert response.json()["results"][0]["short_description"] == "updated"
+
+
+@pytest.mark.asyncio
+async def test_basic_property_was_projected_from_the_cached_full_property(
+    async_client: AsyncClient,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_user: UserOutputSchema,
+    auth_headers: dict[str, str],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    property_id = db_properties.results[0].id
+    staff_response = await async_client.get(
+        f"properties/{property_id}", headers=staff_auth_headers
+    )
+    user_response = await async_client.get(
+        f"properties/{property_id}", headers=auth_headers
+    )
+
+    assert "property_value" in staff_response.json()
+    assert "property_value" not in user_response.json()
+    assert user_response.json()["id"] == property_id
+
+
+@pytest.mark.asyncio
+async def test_cached_property_owner_was_updated_with_the_user(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_staff_user: UserOutputSchema,
+    staff_auth_headers: dict[str, str],
+):
+    property = next(property for property in db_properties.results if property.owner_id)
+    response = await async_client.get(
+        f"properties/{property.id}", headers=staff_auth_headers
+    )
+    assert response.json()["owner"]["first_name"] == property.owner.first_name
+
+    await update_single_user(
+        async_session, UserUpdateSchema(first_name="Renamed"), property.owner_id
+    )
+    response = await async_client.get(
+        f"properties/{property.id}", headers=staff_auth_headers
+    )
+    assert response.json()["owner"]["first_name"] == "Renamed"
+
+
 @pytest.mark.parametrize(
     "user, user_headers, status_code",
     [
@@ -1,13 +1,27 @@
+import json
+
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from src.apps.addresses.models import Address
+from src.apps.addresses.services import create_address
 from src.apps.properties.enums import PropertyStatusEnum, PropertyTypeEnum
-from src.apps.properties.schemas import PropertyOutputSchema, PropertyOwnerIdSchema
+from src.apps.properties.models import Property
+from src.apps.properties.schemas import (
+    PropertyBasicOutputSchema,
+    PropertyOutputSchema,
+    PropertyOwnerIdSchema,
+)
 from src.apps.properties.services import (
     change_property_owner,
     create_property,
     get_all_properties,
+    get_nearby_properties,
     get_single_property,
+    search_properties,
     update_single_property,
 )
 from src.apps.users.models import User
@@ -16,19 +30,34 @@ from src.core.exceptions import (
     AlreadyExists,
     DoesNotExist,
     IncorrectEnumValueException,
+    IncorrectFilterValueException,
+    InvalidCursorException,
     IsOccupied,
     OwnerAlreadyHasTheOwnershipException,
     ServiceException,
+    UnavailableFilterOperationException,
+    UnavailableSortFieldException,
 )
+from src.core.factory.address_factory import AddressInputSchemaFactory
 from src.core.factory.property_factory import (
     PropertyInputSchemaFactory,
     PropertyUpdateSchemaFactory,
 )
+from src.core.pagination.enums import CountModeEnum
 from src.core.pagination.models import PageParams
+from src.core.pagination.responses import PagedJSONResponse
 from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils.load_plan import get_output_query, is_projected_query
 from src.core.utils.orm import if_exists
+from src.core.utils.query_plan import compile_query_plan, get_query_plan
+from src.core.utils.search import get_search_match
 from src.core.utils.utils import generate_uuid
-from tests.test_properties.conftest import DB_PROPERTIES_SCHEMAS, db_properties
+from src.settings.general import settings
+from tests.test_properties.conftest import (
+    DB_PROPERTIES_SCHEMAS,
+    committed_search_properties,
+    db_properties,
+)
 from tests.test_users.conftest import db_staff_user, db_user
 
 
@@ -98,6 +127,223 @@ async def test_if_all_properties_were_returned(
     assert properties.total == db_properties.total
 
 
+@pytest.mark.asyncio
+async def test_if_built_page_was_rendered_as_the_validated_page(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    properties = await get_all_properties(
+        async_session, PageParams(page=1, size=5), output_schema=PropertyOutputSchema
+    )
+    validated_properties = PagedResponseSchema[PropertyOutputSchema].parse_obj(
+        properties.dict()
+    )
+
+    assert json.loads(PagedJSONResponse(properties).body) == jsonable_encoder(
+        validated_properties
+    )
+
+
+@pytest.mark.asyncio
+async def test_if_properties_were_filtered_and_sorted(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    properties = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=5),
+        output_schema=PropertyOutputSchema,
+        query_params=[
+            ("property_status", PropertyStatusEnum.AVAILABLE.value),
+            ("sort", "property_value__desc"),
+        ],
+    )
+    property_values = [property.property_value for property in properties.results]
+
+    assert properties.total == db_properties.total - 1
+    assert property_values == sorted(property_values, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_if_properties_were_filtered_by_owner_fields(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    db_staff_user: UserOutputSchema,
+):
+    properties = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=5),
+        query_params=[
+            ("owner__email", db_staff_user.email),
+            ("owner__is_active__eq", "true"),
+        ],
+    )
+
+    assert properties.total == 1
+    assert properties.results[0].id in [
+        property.id
+        for property in db_properties.results
+        if property.owner_id == db_staff_user.id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_if_properties_were_filtered_with_range_list_prefix_and_null_operators(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    property = db_properties.results[0]
+    values = sorted(property.property_value for property in db_properties.results)
+    properties = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=5),
+        query_params=[
+            ("property_status__in", "AVAILABLE,UNAVAILABLE"),
+            (
+                "property_type__nin",
+                ",".join(
+                    set(PropertyTypeEnum.list_values()) - {property.property_type.value}
+                ),
+            ),
+            ("property_value__between", f"{values[0] - 1},{values[-1] + 1}"),
+            ("short_description__startswith", property.short_description[:5]),
+            ("description__isnull", "false"),
+            ("created_at__date", property.created_at.date().isoformat()),
+            ("created_at__year", str(property.created_at.year)),
+        ],
+    )
+
+    assert property.id in [result.id for result in properties.results]
+
+    properties = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=5),
+        query_params=[("description__isnull", "true")],
+    )
+    assert properties.total == 0
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_filtering_properties_with_unavailable_operation(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    with pytest.raises(UnavailableFilterOperationException):
+        await get_all_properties(
+            async_session,
+            PageParams(page=1, size=5),
+            query_params=[("rooms_amount__startswith", "1")],
+        )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_filtering_properties_by_incorrect_value(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    with pytest.raises(IncorrectFilterValueException):
+        await get_all_properties(
+            async_session,
+            PageParams(page=1, size=5),
+            query_params=[("rooms_amount__gt", "many")],
+        )
+
+
+@pytest.mark.asyncio
+async def test_if_pages_sorted_by_equal_values_do_not_repeat_properties(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    property_ids = []
+    for page in range(1, db_properties.total + 1):
+        properties = await get_all_properties(
+            async_session,
+            PageParams(page=page, size=1),
+            query_params=[("sort", "property_type__asc,property_status__asc")],
+        )
+        property_ids.extend(property.id for property in properties.results)
+
+    assert sorted(property_ids) == sorted(
+        property.id for property in db_properties.results
+    )
+
+
+@pytest.mark.asyncio
+async def test_if_projected_properties_were_returned_page_by_page_with_cursor(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    assert is_projected_query(get_output_query(Property, PropertyBasicOutputSchema))
+    assert not is_projected_query(get_output_query(Property, PropertyOutputSchema))
+
+    query_params = [("sort", "created_at__desc")]
+    properties = await get_all_properties(
+        async_session, PageParams(size=1, cursor=""), query_params=query_params
+    )
+    property_ids = [property.id for property in properties.results]
+    while properties.next_cursor:
+        properties = await get_all_properties(
+            async_session,
+            PageParams(size=1, cursor=properties.next_cursor),
+            query_params=query_params,
+        )
+        property_ids.extend(property.id for property in properties.results)
+
+    assert isinstance(properties.results[0], PropertyBasicOutputSchema)
+    assert sorted(property_ids) == sorted(
+        property.id for property in db_properties.results
+    )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_sorting_properties_by_not_sortable_field(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    with pytest.raises(UnavailableSortFieldException):
+        await get_all_properties(
+            async_session,
+            PageParams(page=1, size=5),
+            query_params=[("sort", "description__asc")],
+        )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_sorting_by_unindexed_field_is_rejected(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "REJECT_UNINDEXED_SORTS", True)
+    compile_query_plan.cache_clear()
+
+    properties = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=5),
+        query_params=[("sort", "property_value__desc")],
+    )
+    assert properties.total == db_properties.total
+
+    with pytest.raises(UnavailableSortFieldException):
+        await get_all_properties(
+            async_session,
+            PageParams(page=1, size=5),
+            query_params=[("sort", "year_built__desc")],
+        )
+
+    compile_query_plan.cache_clear()
+
+
+def test_if_query_plan_was_reused_for_the_same_params():
+    query_plan = get_query_plan(
+        Property, [("page", "1"), ("rooms_amount__ge", "2"), ("year_built", "2000")]
+    )
+
+    assert query_plan is get_query_plan(
+        Property, [("year_built", "2000"), ("rooms_amount__ge", "2"), ("page", "2")]
+    )
+
+
 @pytest.mark.asyncio
 async def test_raise_exception_while_updating_nonexistent_property(
     async_session: AsyncSession,
@@ -182,3 +428,200 @@ async def test_raise_exception_when_changing_owner_of_nonexistent_property_and_o
 
     with pytest.raises(OwnerAlreadyHasTheOwnershipException):
         await change_property_owner(async_session, schema, db_properties.results[1].id)
+
+
+@pytest.mark.asyncio
+async def test_if_properties_were_searched_and_ranked_by_relevance(
+    async_engine: AsyncEngine,
+    committed_search_properties: dict[str, PropertyOutputSchema],
+):
+    async with AsyncSession(async_engine) as session:
+        result = await search_properties(session, PageParams(), "penthouses penthouse")
+
+    assert [property.id for property in result.results] == [
+        committed_search_properties["best_match"].id,
+        committed_search_properties["match"].id,
+    ]
+    assert result.total == 2
+
+
+@pytest.mark.asyncio
+async def test_if_properties_were_searched_by_address_city(
+    async_engine: AsyncEngine,
+    committed_search_properties: dict[str, PropertyOutputSchema],
+):
+    async with AsyncSession(async_engine) as session:
+        result = await search_properties(
+            session,
+            PageParams(),
+            "zakopane",
+            query_params=[("q", "zakopane"), ("rooms_amount__ge", "1")],
+        )
+        assert [property.id for property in result.results] == [
+            committed_search_properties["city_match"].id
+        ]
+
+        result = await search_properties(session, PageParams(), "nonexistentword")
+        assert result.results == []
+
+
+def test_if_mysql_search_predicate_matched_the_fulltext_index_of_every_table():
+    property_predicate, _ = get_search_match(
+        "mysql", (Property.short_description, Property.description), "penthouse"
+    )
+    address_predicate, _ = get_search_match(
+        "mysql", (Address.city, Address.country), "penthouse"
+    )
+
+    assert str(
+        or_(property_predicate, address_predicate).compile(dialect=mysql.dialect())
+    ) == (
+        "MATCH (property.short_description, property.description) "
+        "AGAINST (%s IN NATURAL LANGUAGE MODE) "
+        "OR MATCH (address.city, address.country) "
+        "AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    )
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_searching_properties_with_cursor(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    with pytest.raises(InvalidCursorException):
+        await search_properties(async_session, PageParams(cursor=""), "house")
+
+
+@pytest.mark.asyncio
+async def test_if_nearby_properties_were_sorted_by_distance(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    """
+    0.01 degree of the latitude is ~1.1 km
+    """
+    properties = []
+    for property_status, latitude in [
+        (PropertyStatusEnum.AVAILABLE, 50.03),
+        (PropertyStatusEnum.AVAILABLE, 50.01),
+        (PropertyStatusEnum.AVAILABLE, 50.2),
+        (PropertyStatusEnum.UNAVAILABLE, 50.0),
+    ]:
+        property = await create_property(
+            async_session,
+            PropertyInputSchemaFactory().generate(property_status=property_status),
+        )
+        await create_address(
+            async_session,
+            AddressInputSchemaFactory().generate(
+                property_id=property.id, latitude=latitude, longitude=20.0
+            ),
+        )
+        properties.append(property)
+
+    result = await get_nearby_properties(
+        async_session, PageParams(page=1, size=1), 50.0, 20.0, 5
+    )
+    assert result.total == 2
+    assert result.has_next_page
+    assert [property.id for property in result.results] == [properties[1].id]
+    assert result.results[0].distance == pytest.approx(1.112, abs=0.01)
+
+    result = await get_nearby_properties(
+        async_session, PageParams(page=2, size=1), 50.0, 20.0, 5
+    )
+    assert not result.has_next_page
+    assert [property.id for property in result.results] == [properties[0].id]
+
+    result = await get_nearby_properties(
+        async_session,
+        PageParams(),
+        50.0,
+        20.0,
+        50,
+        query_params=[("latitude", "50.0"), ("rooms_amount__ge", "0")],
+    )
+    assert [property.id for property in result.results] == [
+        property.id for property in properties[1::-1] + properties[2:3]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_if_nearby_properties_kept_the_sort_and_the_count_mode(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    properties = []
+    for rooms_amount, latitude in [(2, 50.01), (4, 50.03), (2, 50.02)]:
+        property = await create_property(
+            async_session,
+            PropertyInputSchemaFactory().generate(
+                property_status=PropertyStatusEnum.AVAILABLE,
+                rooms_amount=rooms_amount,
+            ),
+        )
+        await create_address(
+            async_session,
+            AddressInputSchemaFactory().generate(
+                property_id=property.id, latitude=latitude, longitude=20.0
+            ),
+        )
+        properties.append(property)
+
+    result = await get_nearby_properties(
+        async_session,
+        PageParams(page=1, size=2, count=CountModeEnum.NONE),
+        50.0,
+        20.0,
+        5,
+        query_params=[("sort", "rooms_amount__desc")],
+    )
+    assert result.total is None
+    assert result.has_next_page
+    assert [property.id for property in result.results] == [
+        properties[1].id,
+        properties[0].id,
+    ]
+    assert [property.distance for property in result.results] == [
+        pytest.approx(3.336, abs=0.01),
+        pytest.approx(1.112, abs=0.01),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_if_property_facets_were_counted_with_the_page(
+    async_session: AsyncSession,
+    db_properties: PagedResponseSchema[PropertyOutputSchema],
+):
+    for rooms_amount, city in [(1, "Gdansk"), (3, "Gdansk"), (7, "Sopot")]:
+        property = await create_property(
+            async_session,
+            PropertyInputSchemaFactory().generate(
+                property_status=PropertyStatusEnum.RESERVED,
+                property_type=PropertyTypeEnum.LAND,
+                rooms_amount=rooms_amount,
+            ),
+        )
+        await create_address(
+            async_session,
+            AddressInputSchemaFactory().generate(property_id=property.id, city=city),
+        )
+
+    result = await get_all_properties(
+        async_session,
+        PageParams(page=1, size=2),
+        query_params=[("property_status", "RESERVED"), ("facets", "true")],
+        facets=True,
+    )
+
+    assert result.total == 3
+    assert len(result.results) == 2
+    assert result.facets == {
+        "property_type": {"LAND": 3},
+        "property_status": {"RESERVED": 3},
+        "rooms_amount": {"0-1": 1, "3": 1, "5+": 1},
+        "city": {"Gdansk": 2, "Sopot": 1},
+    }
+
+    result = await get_all_properties(async_session, PageParams(), facets=True)
+    assert sum(result.facets["property_status"].values()) == result.total == 6
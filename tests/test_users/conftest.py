@@ -42,7 +42,7 @@ async def create_user_without_activation(
     await async_session.commit()
     await async_session.refresh(new_user)
 
-    return UserOutputSchema.from_orm(new_user)
+    return await get_single_user(async_session, new_user.id)
 
 
 @pytest_asyncio.fixture
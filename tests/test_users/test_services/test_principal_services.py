@@ -0,0 +1,100 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.companies.schemas import CompanyOutputSchema
+from src.apps.companies.services import add_single_user_to_company
+from src.apps.users.models import User
+from src.apps.users.schemas import UserIdSchema, UserOutputSchema, UserUpdateSchema
+from src.apps.users.services.activation_services import deactivate_single_user
+from src.apps.users.services.principal_services import (
+    get_user_principal,
+    invalidate_user_principal,
+)
+from src.apps.users.services.user_services import update_single_user
+from src.core.pagination.schemas import PagedResponseSchema
+from src.core.utils.cache import RedisCacheBackend
+from tests.test_companies.conftest import db_companies
+from tests.test_users.conftest import db_staff_user, db_user
+
+
+@pytest.mark.asyncio
+async def test_if_user_principal_was_cached_until_invalidation(
+    async_session: AsyncSession, db_user: UserOutputSchema
+):
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.id == db_user.id
+    assert principal.is_staff == False
+
+    await async_session.execute(
+        update(User).filter(User.id == db_user.id).values(is_staff=True)
+    )
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.is_staff == False
+
+    await invalidate_user_principal(db_user.email)
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.is_staff == True
+
+
+@pytest.mark.asyncio
+async def test_if_user_principal_was_invalidated_after_deactivation(
+    async_session: AsyncSession,
+    db_user: UserOutputSchema,
+    db_staff_user: UserOutputSchema,
+):
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.is_active == True
+
+    await deactivate_single_user(async_session, db_user.id, db_staff_user.id)
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.is_active == False
+
+
+@pytest.mark.asyncio
+async def test_if_user_principal_was_invalidated_after_changing_the_company(
+    async_session: AsyncSession,
+    db_user: UserOutputSchema,
+    db_companies: PagedResponseSchema[CompanyOutputSchema],
+):
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.company_id is None
+
+    company_id = db_companies.results[0].id
+    await add_single_user_to_company(
+        async_session, UserIdSchema(id=db_user.id), company_id
+    )
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.company_id == company_id
+
+
+@pytest.mark.asyncio
+async def test_if_user_principal_was_invalidated_after_updating_the_user(
+    async_session: AsyncSession, db_user: UserOutputSchema
+):
+    await get_user_principal(async_session, db_user.email)
+    await async_session.execute(
+        update(User).filter(User.id == db_user.id).values(is_superuser=True)
+    )
+
+    await update_single_user(
+        async_session, UserUpdateSchema(first_name="Name"), db_user.id
+    )
+    principal = await get_user_principal(async_session, db_user.email)
+    assert principal.is_superuser == True
+
+
+@pytest.mark.asyncio
+async def test_if_redis_cache_backend_stores_and_deletes_the_values():
+    cache = RedisCacheBackend(FakeRedis(), "principal", ttl=30)
+
+    await cache.set("user@mail.com", {"id": "1", "is_staff": True})
+    assert await cache.get("user@mail.com") == {"id": "1", "is_staff": True}
+
+    await cache.delete("user@mail.com")
+    assert await cache.get("user@mail.com") is None
+
+    await cache.set("user@mail.com", {"id": "1"})
+    await cache.clear()
+    assert await cache.get("user@mail.com") is None
@@ -1,6 +1,7 @@
 import pytest
 from fastapi import BackgroundTasks, status
 from fastapi_jwt_auth import AuthJWT
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.users.models import User
@@ -19,13 +20,17 @@ from src.core.exceptions import (
     AlreadyExists,
     AuthenticationException,
     DoesNotExist,
+    InvalidCursorException,
 )
 from src.core.factory.user_factory import (
     UserRegisterSchemaFactory,
     UserUpdateSchemaFactory,
 )
+from src.core.pagination.enums import CountModeEnum
 from src.core.pagination.models import PageParams
+from src.core.utils.crypt import get_password_hashing_metrics
 from src.core.utils.orm import if_exists
+from src.core.utils.pagination import COUNT_ESTIMATE_CACHE, get_explain_rows_estimate
 from src.core.utils.utils import generate_uuid
 from tests.test_users.conftest import (
     DB_USER_SCHEMA,
@@ -67,6 +72,23 @@ async def test_raise_exception_when_inactive_user_tries_to_sign_in(
         await authenticate(login_schema, async_session)
 
 
+@pytest.mark.asyncio
+async def test_if_password_was_verified_on_the_hashing_pool(
+    async_session: AsyncSession, db_user: UserOutputSchema
+):
+    completed_before = get_password_hashing_metrics()["completed"]
+    login_schema = UserLoginInputSchema(
+        email=db_user.email, password=DB_USER_SCHEMA.password
+    )
+    user = await authenticate(login_schema, async_session)
+    assert user.id == db_user.id
+
+    metrics = get_password_hashing_metrics()
+    assert metrics["completed"] == completed_before + 1
+    assert metrics["queued"] == 0
+    assert metrics["running"] == 0
+
+
 @pytest.mark.asyncio
 async def test_if_single_user_was_returned(
     async_session: AsyncSession, db_user: UserOutputSchema
@@ -111,6 +133,121 @@ async def test_if_inactive_users_will_be_included_in_retrieving_all_users(
     assert all_users.total == 3
 
 
+@pytest.mark.asyncio
+async def test_if_all_users_were_returned_page_by_page_with_cursor(
+    async_session: AsyncSession,
+    db_user: UserOutputSchema,
+    db_staff_user: UserOutputSchema,
+    db_superuser: UserOutputSchema,
+):
+    query_params = [("sort", "last_name__desc")]
+    users = await get_all_users(
+        async_session, PageParams(size=1, cursor=""), query_params=query_params
+    )
+    users_ids = [user.id for user in users.results]
+    while users.next_cursor:
+        users = await get_all_users(
+            async_session,
+            PageParams(size=1, cursor=users.next_cursor),
+            query_params=query_params,
+        )
+        users_ids.extend([user.id for user in users.results])
+
+    assert len(users_ids) == len(set(users_ids)) == 3
+    assert users.has_next_page is False
+    assert users.total is None
+    assert users.page is None
+
+    users = await get_all_users(
+        async_session,
+        PageParams(size=1, cursor="", count=CountModeEnum.EXACT),
+        query_params=query_params,
+    )
+    assert users.total == 3
+
+
+@pytest.mark.asyncio
+async def test_raise_exception_when_paginating_with_invalid_cursor(
+    async_session: AsyncSession, db_user: UserOutputSchema
+):
+    with pytest.raises(InvalidCursorException):
+        await get_all_users(async_session, PageParams(cursor="invalid"))
+
+
+@pytest.mark.asyncio
+async def test_if_users_total_amount_depends_on_the_count_mode(
+    async_session: AsyncSession,
+    db_user: UserOutputSchema,
+    db_staff_user: UserOutputSchema,
+    db_superuser: UserOutputSchema,
+):
+    users = await get_all_users(
+        async_session, PageParams(size=2, count=CountModeEnum.NONE)
+    )
+    assert users.total is None
+    assert len(users.results) == 2
+    assert users.has_next_page is True
+
+    users = await get_all_users(
+        async_session, PageParams(page=2, size=2, count=CountModeEnum.NONE)
+    )
+    assert len(users.results) == 1
+    assert users.has_next_page is False
+
+    users = await get_all_users(async_session, PageParams(count=CountModeEnum.EXACT))
+    assert users.total == 3
+
+    COUNT_ESTIMATE_CACHE.clear()
+    users = await get_all_users(async_session, PageParams(count=CountModeEnum.ESTIMATE))
+    if (await async_session.connection()).dialect.name == "mysql":
+        assert users.total == pytest.approx(3, abs=2)
+    else:
+        assert users.total == 3
+
+    await create_user_base(async_session, UserRegisterSchemaFactory().generate())
+    cached_users = await get_all_users(
+        async_session, PageParams(count=CountModeEnum.ESTIMATE)
+    )
+    assert cached_users.total == users.total
+    COUNT_ESTIMATE_CACHE.clear()
+
+
+class ExplainSession:
+    """
+    returns the given EXPLAIN rows of the MySQL plan
+    """
+
+    def __init__(self, explain_rows: list[dict]) -> None:
+        self.explain_rows = explain_rows
+
+    async def execute(self, statement) -> "ExplainSession":
+        return self
+
+    def mappings(self) -> list[dict]:
+        return self.explain_rows
+
+
+@pytest.mark.asyncio
+async def test_if_rows_estimate_was_taken_from_the_driving_table():
+    statement = select(User.id)
+    estimate = await get_explain_rows_estimate(
+        statement,
+        ExplainSession(
+            [
+                {"id": 1, "rows": 1000, "filtered": 50.0},
+                {"id": 1, "rows": 12, "filtered": 100.0},
+                {"id": 2, "rows": 7, "filtered": 100.0},
+            ]
+        ),
+    )
+    assert estimate == 500
+
+    estimate = await get_explain_rows_estimate(
+        statement, ExplainSession([{"id": 1, "rows": None, "filtered": None}])
+    )
+    assert estimate is None
+
+
 @pytest.mark.asyncio
 async def test_raise_exception_while_updating_nonexistent_user(
     async_session: AsyncSession, db_user: UserOutputSchema
@@ -119,4 +256,3 @@ async def test_raise_exception_while_updating_nonexistent_user(
 
     with pytest.raises(DoesNotExist):
         await update_single_user(async_session, update_data, generate_uuid())
-